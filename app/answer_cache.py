@@ -0,0 +1,111 @@
+import hashlib
+import re
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from app.sqlite_cache import SQLiteLRUCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    document_hash TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_answers_document_hash ON answers (document_hash);
+CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers (last_used);
+"""
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize case, whitespace and trailing punctuation of a question."""
+    return _WHITESPACE_RE.sub(" ", question).strip().rstrip("?.!").strip().casefold()
+
+
+def answer_cache_key(
+    document_hash: str,
+    question: str,
+    model: str,
+    temperature: float,
+    k: int | str,
+    prompt_version: str,
+) -> str:
+    """Return the cache key for an answer to a question about a document.
+
+    ``k`` is the retrieval depth, or a description such as ``"2-12"`` for
+    adaptive retrieval.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        f"{document_hash}\0{model}\0{temperature}\0{k}\0{prompt_version}\0".encode()
+    )
+    digest.update(normalize_question(question).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnswerCache(SQLiteLRUCache):
+    """On-disk answer store keyed by document, question and generation settings.
+
+    Entries older than ``ttl_seconds`` (if set) are treated as missing; see
+    SQLiteLRUCache for sharing and eviction.
+    """
+
+    table = "answers"
+    schema = _SCHEMA
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 100_000,
+        ttl_seconds: float | None = None,
+    ):
+        super().__init__(path, max_entries)
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Return cached answers for the given keys, skipping missing ones."""
+        oldest = time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+        return self._get_many(keys, "answer", "AND created_at >= ?", (oldest,))
+
+    def put_many(self, document_hash: str, items: dict[str, str]) -> None:
+        """Store answers for a document and evict entries over budget."""
+        now = time.time()
+        self._put_many(
+            ("key", "document_hash", "answer", "created_at", "last_used"),
+            [(key, document_hash, answer, now, now) for key, answer in items.items()],
+        )
+
+    def invalidate(self, document_hash: str | None = None) -> int:
+        """Delete the answers for one document, or all answers if None.
+
+        Returns the number of entries removed.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                if document_hash is None:
+                    cursor = conn.execute("DELETE FROM answers")
+                else:
+                    cursor = conn.execute(
+                        "DELETE FROM answers WHERE document_hash = ?",
+                        (document_hash,),
+                    )
+                return cursor.rowcount
+        finally:
+            conn.close()
+
+    def stats(self) -> dict[str, int | float]:
+        """Return hit/miss counters for this process, hit rate and size."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
@@ -0,0 +1,109 @@
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.numpy_store import top_k
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into case-folded word tokens ("24 hours" -> "24", "hours")."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class _Postings:
+    """Document numbers and term frequencies of one term, as packed arrays."""
+
+    __slots__ = ("doc_ids", "term_frequencies")
+
+    def __init__(self):
+        self.doc_ids = array("I")
+        self.term_frequencies = array("H")
+
+
+class BM25Index:
+    """In-memory Okapi BM25 index over an inverted index of packed arrays.
+
+    Adding documents is linear in their length and thread-safe. A query only
+    touches the postings of its own terms, so it costs microseconds to a
+    millisecond for per-request indexes of thousands of chunks.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, _Postings] = {}
+        self._lengths = array("I")
+        self._total_length = 0
+        self._documents: list[Document] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, documents: list[Document]) -> None:
+        """Index documents; their order of addition is their number."""
+        counted = [Counter(tokenize(doc.page_content)) for doc in documents]
+        with self._lock:
+            for doc, counts in zip(documents, counted, strict=True):
+                number = len(self._documents)
+                for term, frequency in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = _Postings()
+                    postings.doc_ids.append(number)
+                    postings.term_frequencies.append(min(frequency, 65535))
+                length = sum(counts.values())
+                self._lengths.append(length)
+                self._total_length += length
+                self._documents.append(doc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._lengths = array("I")
+            self._total_length = 0
+            self._documents = []
+
+    def search(self, query: str, k: int = 4) -> list[tuple[Document, float]]:
+        """Return up to ``k`` documents sharing a term with ``query``, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._documents)
+            if not count or not terms:
+                return []
+            lengths = np.array(self._lengths, dtype=np.float32)
+            average_length = self._total_length / count or 1.0
+            matched = [
+                (
+                    np.array(postings.doc_ids, dtype=np.intp),
+                    np.array(postings.term_frequencies, dtype=np.float32),
+                )
+                for term in terms
+                if (postings := self._postings.get(term)) is not None
+            ]
+            documents = self._documents[:count]
+        if not matched:
+            return []
+
+        norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        scores = np.zeros(count, dtype=np.float32)
+        for doc_ids, frequencies in matched:
+            frequency = len(doc_ids)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            scores[doc_ids] += (
+                idf * frequencies * (self.k1 + 1) / (frequencies + norms[doc_ids])
+            )
+        best = top_k(scores[np.newaxis, :], k)[0]
+        return [(documents[i], float(scores[i])) for i in best if scores[i] > 0]
+
+    def search_many(
+        self, queries: list[str], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        return [self.search(query, k) for query in queries]
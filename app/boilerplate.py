@@ -0,0 +1,150 @@
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+
+from langchain_core.documents import Document
+
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_line(line: str) -> str:
+    """Normalize a line for matching: case, whitespace and numbers are ignored.
+
+    Numbers become "#" so running page numbers ("Page 3 of 56") match.
+    """
+    return _DIGITS_RE.sub("#", _SPACE_RE.sub(" ", line).strip().casefold())
+
+
+@dataclass
+class BoilerplateStats:
+    """What boilerplate stripping removed from a document."""
+
+    pages: int = 0
+    pages_dropped: int = 0
+    lines_removed: int = 0
+    chars_removed: int = 0
+    # Estimated by the caller, which knows how pages are chunked.
+    chunks_removed: int = 0
+
+    def add(self, other: "BoilerplateStats") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BoilerplateStripper:
+    """Remove page headers, footers and page numbers repeated across pages.
+
+    A line is boilerplate when it is among the first or last ``edge_lines``
+    non-blank lines of at least ``min_fraction`` of the pages seen so far (and
+    of at least ``min_pages`` pages), at the same edge. Only occurrences at
+    that edge are removed, so a phrase that also appears in the body text is
+    kept there, and lines longer than ``max_line_chars`` are never removed.
+    Pages left with fewer than ``min_page_chars`` characters are dropped,
+    except the only page of a document.
+
+    Pages are fed one at a time. The first ``sample_pages`` are held back
+    until there is enough evidence to judge them; later pages are judged
+    against every page seen up to and including them.
+    """
+
+    def __init__(
+        self,
+        min_fraction: float = 0.6,
+        min_pages: int = 3,
+        edge_lines: int = 3,
+        min_page_chars: int = 50,
+        max_line_chars: int = 200,
+        sample_pages: int = 8,
+    ):
+        self.min_fraction = min_fraction
+        self.min_pages = min_pages
+        self.edge_lines = edge_lines
+        self.min_page_chars = min_page_chars
+        self.max_line_chars = max_line_chars
+        self.sample_pages = sample_pages
+        self.stats = BoilerplateStats()
+        self._counts: Counter[tuple[str, str]] = Counter()
+        self._pending: list[Document] = []
+
+    def _edges(self, lines: list[str]) -> list[tuple[int, str]]:
+        """Return the indices of a page's edge lines with "top" or "bottom".
+
+        On short pages a line can be at both edges and is listed twice.
+        """
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        return [(i, "top") for i in content[: self.edge_lines]] + [
+            (i, "bottom") for i in content[-self.edge_lines :]
+        ]
+
+    def _is_boilerplate(self, edge: str, line: str) -> bool:
+        if len(line) > self.max_line_chars:
+            return False
+        count = self._counts[edge, normalize_line(line)]
+        return count >= max(self.min_pages, self.min_fraction * self.stats.pages)
+
+    def _count(self, page: Document) -> None:
+        lines = page.page_content.splitlines()
+        self._counts.update(
+            {(edge, normalize_line(lines[i])) for i, edge in self._edges(lines)}
+        )
+        self.stats.pages += 1
+
+    def _strip(self, page: Document) -> tuple[Document, Document | None]:
+        lines = page.page_content.splitlines()
+        removed = {
+            i for i, edge in self._edges(lines) if self._is_boilerplate(edge, lines[i])
+        }
+        self.stats.lines_removed += len(removed)
+        if removed:
+            text = "\n".join(line for i, line in enumerate(lines) if i not in removed)
+        else:
+            text = page.page_content
+        if len(text.strip()) < self.min_page_chars and self.stats.pages > 1:
+            self.stats.pages_dropped += 1
+            self.stats.chars_removed += len(page.page_content)
+            return page, None
+        if not removed:
+            return page, page
+        self.stats.chars_removed += len(page.page_content) - len(text)
+        return page, Document(page_content=text, metadata=page.metadata, id=page.id)
+
+    def feed(self, page: Document) -> list[tuple[Document, Document | None]]:
+        """Add a page; return ``(original, stripped)`` pairs ready to index.
+
+        ``stripped`` is None for dropped pages and ``original`` itself for
+        pages with nothing to strip.
+        """
+        self._count(page)
+        if self.stats.pages <= self.sample_pages:
+            self._pending.append(page)
+            return []
+        ready = self.flush()
+        ready.append(self._strip(page))
+        return ready
+
+    def flush(self) -> list[tuple[Document, Document | None]]:
+        """Return the pages still held back, after the last one was fed."""
+        pending, self._pending = self._pending, []
+        return [self._strip(page) for page in pending]
+
+
+def strip_boilerplate(
+    documents: Iterable[Document], stripper: BoilerplateStripper | None = None
+) -> Iterator[Document]:
+    """Yield the documents without boilerplate, dropping near-empty pages.
+
+    Pass a ``stripper`` to configure it or to read its stats afterwards.
+    """
+    stripper = stripper or BoilerplateStripper()
+    for document in documents:
+        for _, stripped in stripper.feed(document):
+            if stripped is not None:
+                yield stripped
+    for _, stripped in stripper.flush():
+        if stripped is not None:
+            yield stripped
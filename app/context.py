@@ -0,0 +1,161 @@
+import functools
+import logging
+import re
+from collections.abc import Callable
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in characters, for estimating without a tokenizer.
+CHARS_PER_TOKEN = 4
+# Chunks of one page this many characters apart or closer are joined.
+MERGE_MAX_GAP = 5
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens in a string at ``CHARS_PER_TOKEN`` characters each."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@functools.cache
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Return a function counting ``model`` tokens in a string.
+
+    Uses the model's tiktoken encoding. tiktoken downloads encodings on first
+    use, so when that is not possible this falls back to an estimate of
+    ``CHARS_PER_TOKEN`` characters per token.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(
+            f"No tiktoken encoding for {model!r} ({type(e).__name__}); "
+            f"estimating {CHARS_PER_TOKEN} characters per token"
+        )
+        return estimate_tokens
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class _Span:
+    """Contiguous text of one page, built from one or more chunks."""
+
+    def __init__(self, doc: Document, rank: int):
+        self.doc = doc
+        self.rank = rank
+        self.text = doc.page_content
+        self.start = doc.metadata.get("start_index")
+
+    @property
+    def key(self) -> tuple | None:
+        if self.start is None or self.start < 0:
+            return None
+        return self.doc.metadata.get("source"), self.doc.metadata.get("page")
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+    def absorb(self, other: "_Span") -> None:
+        """Append a later span of the same page, dropping the overlap."""
+        overlap = self.end - other.start
+        if overlap >= 0:
+            self.text += other.text[overlap:]
+        else:
+            self.text += " " + other.text
+        self.rank = min(self.rank, other.rank)
+
+
+def merge_spans(docs: list[Document]) -> list[_Span]:
+    """Merge overlapping or adjacent chunks of the same page.
+
+    Chunks need a ``start_index`` (chunk_documents adds it) plus ``source`` and
+    ``page`` metadata to be merged; others are kept as they are. The result is
+    ordered by the best retrieval rank within each span.
+    """
+    spans = [_Span(doc, rank) for rank, doc in enumerate(docs)]
+    positioned = sorted(
+        (span for span in spans if span.key is not None),
+        key=lambda span: (str(span.key), span.start),
+    )
+    merged: list[_Span] = [span for span in spans if span.key is None]
+    current = None
+    for span in positioned:
+        if (
+            current is not None
+            and span.key == current.key
+            and span.start <= current.end + MERGE_MAX_GAP
+        ):
+            if span.end > current.end:
+                current.absorb(span)
+            current.rank = min(current.rank, span.rank)
+            continue
+        current = span
+        merged.append(span)
+    return sorted(merged, key=lambda span: span.rank)
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def drop_duplicates(spans: list[_Span], max_similarity: float = 0.9) -> list[_Span]:
+    """Drop spans contained in, or nearly the same as, a better-ranked span.
+
+    Near duplicates have a word-trigram Jaccard similarity of at least
+    ``max_similarity``.
+    """
+    kept: list[tuple[_Span, str, set]] = []
+    for span in spans:
+        normalized = " ".join(_WORD_RE.findall(span.text.casefold()))
+        shingles = _shingles(span.text)
+        if any(
+            normalized in kept_text
+            or len(shingles & kept_shingles) / len(shingles | kept_shingles)
+            >= max_similarity
+            for _, kept_text, kept_shingles in kept
+        ):
+            continue
+        kept.append((span, normalized, shingles))
+    return [span for span, _, _ in kept]
+
+
+def assemble_context(
+    docs: list[Document],
+    max_tokens: int = 0,
+    count_tokens: Callable[[str], int] | None = None,
+    max_similarity: float = 0.9,
+) -> str:
+    """Build the prompt context from retrieved documents.
+
+    Overlapping and adjacent chunks of a page are merged back into one span,
+    contained and near-duplicate spans are dropped, and spans are added in
+    retrieval order while they fit in ``max_tokens`` (0 for no limit). The
+    best span is always included, cut to the budget if needed.
+    """
+    spans = drop_duplicates(merge_spans(docs), max_similarity)
+    if not max_tokens or not spans:
+        return "\n\n".join(span.text for span in spans)
+
+    count_tokens = count_tokens or estimate_tokens
+    parts: list[str] = []
+    used = 0
+    for span in spans:
+        tokens = count_tokens(span.text)
+        if used + tokens <= max_tokens:
+            parts.append(span.text)
+            used += tokens
+    if not parts:
+        text = spans[0].text
+        parts.append(text[: len(text) * max_tokens // count_tokens(text)])
+    return "\n\n".join(parts)
@@ -1,22 +1,256 @@
+import hashlib
+import io
 import json
+import logging
+import math
+import os
+import signal
+import sys
 import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
+import pypdf
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders.parsers.pdf import (
+    PyPDFParser,
+    _purge_metadata,
+)
 from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+logger = logging.getLogger(__name__)
 
-def load_pdf(file_path: str) -> list[Document]:
-    """Load a PDF file and return documents."""
+# Size of each read when streaming an upload to disk.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Uploads up to this size are kept in memory instead of being written to disk.
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+
+# Pages handed to each worker task by parallel PDF extraction.
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+# Pages whose text extraction takes longer than this are skipped (0 = no limit).
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PDF_PAGE_TIMEOUT_SECONDS", "30"))
+# Page ranges in flight at once when PDF pages are streamed lazily.
+PDF_MAX_PENDING_TASKS = int(os.getenv("PDF_MAX_PENDING_TASKS", "8"))
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+@dataclass
+class SavedUpload:
+    """An upload persisted by save_upload.
+
+    Small uploads keep their bytes in ``content`` and ``path`` is only a name
+    carrying the file type; larger ones are written to a temporary file at
+    ``path`` and ``content`` is None. Pass both to the loaders as
+    ``load_document(upload.path, upload.content)``.
+    """
+
+    path: str
+    content: bytes | None
+    sha256: str
+    size: int
+
+    @property
+    def in_memory(self) -> bool:
+        return self.content is not None
+
+    def cleanup(self) -> None:
+        """Remove the temporary file backing this upload, if any."""
+        if not self.in_memory and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _read_json(file_path: str, content: bytes | None = None):
+    if content is not None:
+        return json.loads(content.decode("utf-8"))
+    with open(file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _PageTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _page_time_limit(seconds: float | None) -> Iterator[None]:
+    """Raise _PageTimeout if the block runs longer than ``seconds``.
+
+    Relies on SIGALRM, so it is only enforced in the main thread of a process
+    on platforms that support it (as in process pool workers on Linux/macOS).
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "SIGALRM")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def _on_alarm(signum, frame):
+        raise _PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _open_pdf(file_path: str, content: bytes | None) -> pypdf.PdfReader:
+    return pypdf.PdfReader(io.BytesIO(content) if content is not None else file_path)
+
+
+def _extract_pdf_pages(
+    file_path: str,
+    content: bytes | None,
+    page_numbers: range,
+    page_timeout: float | None,
+) -> list[tuple[int, str | None]]:
+    """Extract the text of a range of pages; runs inside a pool worker.
+
+    Pages that exceed ``page_timeout`` are returned with None as their text.
+    """
+    reader = _open_pdf(file_path, content)
+    pages = []
+    for page_number in page_numbers:
+        try:
+            with _page_time_limit(page_timeout):
+                text = reader.pages[page_number].extract_text(extraction_mode="plain")
+        except _PageTimeout:
+            text = None
+        pages.append((page_number, None if text is None else text.strip()))
+    return pages
+
+
+def _iter_pdf_pages_with_executor(
+    file_path: str,
+    content: bytes | None,
+    executor: Executor,
+    page_timeout: float | None,
+    pages_per_task: int,
+    max_pending_tasks: int,
+) -> Iterator[Document]:
+    reader = _open_pdf(file_path, content)
+    total_pages = len(reader.pages)
+    # Same document metadata as PyPDFParser, so both paths are interchangeable.
+    doc_metadata = _purge_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": file_path, "total_pages": total_pages}
+    )
+    page_labels = reader.page_labels
+
+    def _documents(future: Future) -> Iterator[Document]:
+        for page_number, text in future.result():
+            if text is None:
+                logger.warning(
+                    f"Skipped page {page_number} of {file_path}: text extraction "
+                    f"exceeded {page_timeout}s"
+                )
+                continue
+            yield Document(
+                page_content=text,
+                metadata=doc_metadata
+                | {"page": page_number, "page_label": page_labels[page_number]},
+            )
+
+    # Keep a bounded window of ranges in flight so extracted text does not pile
+    # up when the consumer is slower than the workers.
+    pending: deque[Future] = deque()
+    for start in range(0, total_pages, pages_per_task):
+        page_range = range(start, min(start + pages_per_task, total_pages))
+        pending.append(
+            executor.submit(
+                _extract_pdf_pages, file_path, content, page_range, page_timeout
+            )
+        )
+        if len(pending) >= max_pending_tasks:
+            yield from _documents(pending.popleft())
+    while pending:
+        yield from _documents(pending.popleft())
+
+
+def lazy_load_pdf(
+    file_path: str,
+    content: bytes | None = None,
+    executor: Executor | None = None,
+    page_timeout: float | None = PDF_PAGE_TIMEOUT_SECONDS,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    max_pending_tasks: int = PDF_MAX_PENDING_TASKS,
+) -> Iterator[Document]:
+    """Yield the pages of a PDF one at a time, in page order.
+
+    When ``content`` is given the PDF is parsed from memory and ``file_path``
+    is only used as the source metadata.
+
+    With an ``executor`` (ideally a process pool), page text extraction is
+    split into ranges of ``pages_per_task`` pages that run in parallel, with at
+    most ``max_pending_tasks`` ranges in flight. Pages whose extraction exceeds
+    ``page_timeout`` seconds are skipped with a warning.
+    """
+    if executor is not None:
+        yield from _iter_pdf_pages_with_executor(
+            file_path,
+            content,
+            executor,
+            page_timeout,
+            pages_per_task,
+            max_pending_tasks,
+        )
+    elif content is not None:
+        yield from PyPDFParser().lazy_parse(Blob.from_data(content, path=file_path))
+    else:
+        yield from PyPDFLoader(file_path).lazy_load()
+
+
+def load_pdf(
+    file_path: str,
+    content: bytes | None = None,
+    executor: Executor | None = None,
+    page_timeout: float | None = PDF_PAGE_TIMEOUT_SECONDS,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+) -> list[Document]:
+    """Load a PDF file and return documents.
+
+    When ``content`` is given the PDF is parsed from memory and ``file_path``
+    is only used as the source metadata.
+
+    With an ``executor`` (ideally a process pool), page text extraction is
+    split into ranges of ``pages_per_task`` pages that run in parallel and are
+    reassembled in page order. Pages whose extraction exceeds ``page_timeout``
+    seconds are skipped with a warning.
+    """
+    if executor is not None:
+        return list(
+            lazy_load_pdf(
+                file_path,
+                content,
+                executor=executor,
+                page_timeout=page_timeout,
+                pages_per_task=pages_per_task,
+                max_pending_tasks=sys.maxsize,
+            )
+        )
+    if content is not None:
+        return PyPDFParser().parse(Blob.from_data(content, path=file_path))
     loader = PyPDFLoader(file_path)
     return loader.load()
 
 
-def load_json_document(file_path: str) -> list[Document]:
-    """Load a JSON file as a document source."""
-    with open(file_path, encoding="utf-8") as f:
-        data = json.load(f)
+def load_json_document(file_path: str, content: bytes | None = None) -> list[Document]:
+    """Load a JSON file (or its in-memory ``content``) as a document source."""
+    data = _read_json(file_path, content)
 
     if isinstance(data, list):
         content = "\n\n".join(
@@ -31,41 +265,78 @@ def load_json_document(file_path: str) -> list[Document]:
     return [Document(page_content=content, metadata={"source": file_path})]
 
 
-def load_document(file_path: str) -> list[Document]:
-    """Load a document from file path. Supports PDF and JSON."""
+def load_document(file_path: str, content: bytes | None = None) -> list[Document]:
+    """Load a document from file path. Supports PDF and JSON.
+
+    When ``content`` is given it is parsed from memory; ``file_path`` then only
+    determines the document type and source metadata.
+    """
     path = Path(file_path)
     suffix = path.suffix.lower()
 
     if suffix == ".pdf":
-        return load_pdf(file_path)
+        return load_pdf(file_path, content)
     elif suffix == ".json":
-        return load_json_document(file_path)
+        return load_json_document(file_path, content)
     else:
         raise ValueError(f"Unsupported document type: {suffix}")
 
 
+def lazy_load_document(
+    file_path: str,
+    content: bytes | None = None,
+    executor: Executor | None = None,
+) -> Iterator[Document]:
+    """Yield a document's pages one at a time. Supports PDF and JSON.
+
+    PDF pages are extracted in parallel when an ``executor`` is given.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".pdf":
+        return lazy_load_pdf(file_path, content, executor=executor)
+    return iter(load_document(file_path, content))
+
+
 def chunk_documents(
     documents: list[Document],
     chunk_size: int = 1000,
     chunk_overlap: int = 200,
 ) -> list[Document]:
-    """Split documents into chunks for embedding."""
+    """Split documents into chunks for embedding.
+
+    Each chunk records its offset in the page as ``start_index``, so
+    overlapping chunks can be merged back together when building prompts.
+    """
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         length_function=len,
         separators=["\n\n", "\n", " ", ""],
+        add_start_index=True,
     )
     return text_splitter.split_documents(documents)
 
 
-def load_questions_json(file_path: str) -> list[str]:
+def estimate_chunk_count(
+    text: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> int:
+    """Estimate how many chunks chunk_documents would split ``text`` into.
+
+    Assumes chunks are filled up to ``chunk_size``, so it can undercount
+    text the splitter breaks early at separators.
+    """
+    length = len(text.strip())
+    if length <= chunk_size:
+        return 1 if length else 0
+    return math.ceil((length - chunk_overlap) / (chunk_size - chunk_overlap))
+
+
+def load_questions_json(file_path: str, content: bytes | None = None) -> list[str]:
     """Load questions from a JSON file.
 
     Expects a list of strings or objects with 'question' key.
     """
-    with open(file_path, encoding="utf-8") as f:
-        data = json.load(f)
+    data = _read_json(file_path, content)
 
     questions = []
     if isinstance(data, list):
@@ -77,7 +348,7 @@ def load_questions_json(file_path: str) -> list[str]:
     return questions
 
 
-def load_questions(file_path: str) -> list[str]:
+def load_questions(file_path: str, content: bytes | None = None) -> list[str]:
     """Load questions from a JSON file.
 
     Per interview spec: Questions file must be JSON format.
@@ -88,12 +359,70 @@ def load_questions(file_path: str) -> list[str]:
     if suffix != ".json":
         raise ValueError(f"Questions file must be JSON, got: {suffix}")
 
-    return load_questions_json(file_path)
+    return load_questions_json(file_path, content)
+
+
+async def save_upload(
+    upload_file,
+    suffix: str = "",
+    max_bytes: int | None = None,
+    spool_bytes: int = UPLOAD_SPOOL_BYTES,
+) -> SavedUpload:
+    """Stream an upload to memory or a temporary file, hashing it on the way.
+
+    The upload is read in fixed-size chunks, so large files are never held in
+    memory. Uploads up to ``spool_bytes`` stay in memory; larger ones are
+    written to disk. The SHA-256 of the content is computed in the same pass.
+    Raises UploadTooLargeError as soon as more than ``max_bytes`` are seen.
+    """
+    declared_size = getattr(upload_file, "size", None)
+    if max_bytes is not None and declared_size and declared_size > max_bytes:
+        raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    size = 0
+    tmp = None
+    if spool_bytes <= 0:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+
+    try:
+        while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+            digest.update(chunk)
+            if tmp is None and size <= spool_bytes:
+                buffer += chunk
+                continue
+            if tmp is None:
+                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                tmp.write(buffer)
+                buffer.clear()
+            tmp.write(chunk)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+        raise
+
+    if tmp is not None:
+        tmp.close()
+        return SavedUpload(
+            path=tmp.name, content=None, sha256=digest.hexdigest(), size=size
+        )
+
+    name = Path(getattr(upload_file, "filename", None) or "upload").name
+    if suffix and not name.lower().endswith(suffix.lower()):
+        name += suffix
+    return SavedUpload(
+        path=name, content=bytes(buffer), sha256=digest.hexdigest(), size=size
+    )
 
 
-async def save_upload_file_temp(upload_file, suffix: str = "") -> str:
+async def save_upload_file_temp(
+    upload_file, suffix: str = "", max_bytes: int | None = None
+) -> str:
     """Save an uploaded file to a temporary location and return the path."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await upload_file.read()
-        tmp.write(content)
-        return tmp.name
+    saved = await save_upload(upload_file, suffix, max_bytes=max_bytes, spool_bytes=0)
+    return saved.path
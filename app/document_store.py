@@ -0,0 +1,156 @@
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.documents import Document
+
+from app.hybrid_store import HybridVectorStore
+from app.numpy_store import NumpyVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Bytes per stored embedding value (float32).
+EMBEDDING_BYTES_PER_VALUE = 4
+
+
+def embedding_dimensions(vector_store: Any) -> int:
+    """Return the width of the vectors a store holds, or 0 if it holds none.
+
+    Read from a stored vector, so it reflects the model and any shortened
+    EMBEDDING_DIMENSIONS actually used. Lexical-only stores hold no vectors,
+    and stores that cannot return them (no Chroma-style ``get``) count as 0.
+    """
+    if isinstance(vector_store, HybridVectorStore):
+        vector_store = vector_store.dense
+    if vector_store is None:
+        return 0
+    if isinstance(vector_store, NumpyVectorStore):
+        return vector_store.dimensions
+    get = getattr(vector_store, "get", None)
+    if get is None:
+        return 0
+    stored = get(limit=1, include=["embeddings"])["embeddings"]
+    return len(stored[0]) if stored is not None and len(stored) else 0
+
+
+def estimate_index_bytes(chunks: list[Document], dimensions: int) -> int:
+    """Estimate the memory held by an index of ``dimensions``-wide vectors."""
+    text_bytes = sum(len(chunk.page_content.encode("utf-8")) for chunk in chunks)
+    return text_bytes + EMBEDDING_BYTES_PER_VALUE * dimensions * len(chunks)
+
+
+def release_vector_store(vector_store: Any) -> None:
+    """Free the resources held by a vector store, if it supports it."""
+    delete_collection = getattr(vector_store, "delete_collection", None)
+    if delete_collection is None:
+        return
+    try:
+        delete_collection()
+    except Exception:
+        logger.exception("Failed to release vector store")
+
+
+@dataclass
+class IndexedDocument:
+    """A document that has been ingested and indexed once for repeated Q&A."""
+
+    document_id: str
+    filename: str
+    vector_store: Any
+    num_pages: int
+    num_chunks: int
+    size_bytes: int
+    created_at: float = field(default_factory=time.time)
+    last_accessed: float = field(default_factory=time.time)
+
+    def to_dict(self, ttl_seconds: float) -> dict:
+        return {
+            "document_id": self.document_id,
+            "filename": self.filename,
+            "pages": self.num_pages,
+            "chunks": self.num_chunks,
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at,
+            "expires_at": self.last_accessed + ttl_seconds,
+        }
+
+
+class DocumentRegistry:
+    """In-process registry of indexed documents keyed by content hash.
+
+    Entries expire ``ttl_seconds`` after their last access. When the estimated
+    size of all indexes exceeds ``max_bytes`` the least recently used entries
+    are evicted.
+
+    Removed vector stores are freed with ``release``, which by default runs
+    in the calling thread. Registries used from an event loop should pass
+    one that hands the store to a thread, since Chroma deletes block.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 512 * 1024**2,
+        release: Callable[[Any], None] = release_vector_store,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.release = release
+        self._documents: OrderedDict[str, IndexedDocument] = OrderedDict()
+
+    def __len__(self) -> int:
+        self.purge_expired()
+        return len(self._documents)
+
+    def __contains__(self, document_id: str) -> bool:
+        self.purge_expired()
+        return document_id in self._documents
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(doc.size_bytes for doc in self._documents.values())
+
+    def get(self, document_id: str) -> IndexedDocument | None:
+        """Return an indexed document and refresh its TTL, or None."""
+        self.purge_expired()
+        document = self._documents.get(document_id)
+        if document is not None:
+            document.last_accessed = time.time()
+            self._documents.move_to_end(document_id)
+        return document
+
+    def add(self, document: IndexedDocument) -> None:
+        """Register an indexed document, evicting old entries over budget."""
+        previous = self._documents.pop(document.document_id, None)
+        if previous is not None and previous.vector_store is not document.vector_store:
+            self.release(previous.vector_store)
+        self._documents[document.document_id] = document
+        self.purge_expired()
+        while self.total_bytes > self.max_bytes and len(self._documents) > 1:
+            document_id, _ = next(iter(self._documents.items()))
+            logger.info(f"Evicting document {document_id} to stay within budget")
+            self.delete(document_id)
+
+    def delete(self, document_id: str) -> bool:
+        """Remove an indexed document. Returns False if it was not registered."""
+        document = self._documents.pop(document_id, None)
+        if document is None:
+            return False
+        self.release(document.vector_store)
+        return True
+
+    def purge_expired(self) -> int:
+        """Drop entries whose TTL has elapsed and return how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            document_id
+            for document_id, document in self._documents.items()
+            if document.last_accessed < cutoff
+        ]
+        for document_id in expired:
+            logger.info(f"Document {document_id} expired")
+            self.delete(document_id)
+        return len(expired)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import time
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from app.sqlite_cache import SQLiteLRUCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def embedding_cache_key(text: str, model: str, dimensions: int | None = None) -> str:
+    """Return the content-addressed cache key for a text and embedding model."""
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{dimensions or ''}\0".encode())
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _pack_vector(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """On-disk embedding store keyed by content hash.
+
+    Vectors are stored as float32 blobs; see SQLiteLRUCache for sharing and
+    eviction.
+    """
+
+    table = "embeddings"
+    schema = _SCHEMA
+
+    def __init__(self, path: str | Path, max_entries: int = 200_000):
+        super().__init__(path, max_entries)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, list[float]]:
+        """Return cached vectors for the given keys, skipping missing ones."""
+        found = self._get_many(keys, "vector")
+        return {key: _unpack_vector(blob) for key, blob in found.items()}
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        """Store vectors and evict the least recently used entries over budget."""
+        now = time.time()
+        self._put_many(
+            ("key", "vector", "last_used"),
+            [(key, _pack_vector(vec), now) for key, vec in items.items()],
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters for this process and the current size."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, "entries": len(self)}
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends cache misses to the underlying model.
+
+    ``dimensions`` defaults to the wrapped model's ``dimensions`` attribute
+    (as on OpenAIEmbeddings), so vectors of another size are never served.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        model: str,
+        dimensions: int | None = None,
+    ):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+        if dimensions is None:
+            dimensions = getattr(embeddings, "dimensions", None)
+        self.dimensions = dimensions
+
+    def _key(self, text: str) -> str:
+        return embedding_cache_key(text, self.model, self.dimensions)
+
+    def _split(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]]]:
+        """Return the texts missing from the cache and the cached vectors."""
+        cached = self.cache.get_many(self._key(text) for text in texts)
+        missing = list(
+            dict.fromkeys(text for text in texts if self._key(text) not in cached)
+        )
+        return missing, cached
+
+    def _merge(
+        self,
+        texts: list[str],
+        cached: dict[str, list[float]],
+        missing: list[str],
+        new_vectors: list[list[float]],
+    ) -> list[list[float]]:
+        # Round fresh vectors to float32 so results match later cache hits.
+        fresh = {
+            self._key(text): _unpack_vector(_pack_vector(vector))
+            for text, vector in zip(missing, new_vectors, strict=True)
+        }
+        self.cache.put_many(fresh)
+        cached.update(fresh)
+        return [cached[self._key(text)] for text in texts]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        missing, cached = self._split(texts)
+        new_vectors = self.embeddings.embed_documents(missing) if missing else []
+        return self._merge(texts, cached, missing, new_vectors)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        missing, cached = await asyncio.to_thread(self._split, texts)
+        new_vectors = await self.embeddings.aembed_documents(missing) if missing else []
+        return await asyncio.to_thread(self._merge, texts, cached, missing, new_vectors)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+T = TypeVar("T")
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+class RequestHedger:
+    """Fires a duplicate call when the first is slower than recent calls.
+
+    Once ``min_samples`` latencies have been observed, a call still running
+    after the ``percentile``-th percentile of the last ``window`` latencies
+    gets a second, identical call. Whichever succeeds first wins and the other
+    is cancelled. Hedges are capped at ``max_hedge_ratio`` of all calls so a
+    slow provider cannot double the spend.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_hedge_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 500,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError(f"percentile must be in (0, 100), got: {percentile}")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError(
+                f"max_hedge_ratio must be in [0, 1], got: {max_hedge_ratio}"
+            )
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a call is hedged, or None while warming up."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return _percentile(sorted(self._latencies), self.percentile)
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_hedge_ratio * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await ``call()``, hedging it with a second ``call()`` if it is slow."""
+        started = time.perf_counter()
+        delay = self.hedge_delay()
+        with self._lock:
+            self.requests += 1
+        primary = asyncio.ensure_future(call())
+        tasks = [primary]
+        try:
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and self._reserve_hedge():
+                    tasks.append(asyncio.ensure_future(call()))
+            # The first success wins; a failure only counts once both failed.
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded or not pending:
+                    break
+            winner = succeeded[0] if succeeded else next(iter(done))
+            result = winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+            self.hedge_wins += winner is not primary
+        return result
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Return hedge counts and recent end-to-end latency percentiles."""
+        delay = self.hedge_delay()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests, hedged, wins = self.requests, self.hedged, self.hedge_wins
+        return {
+            "requests": requests,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_rate": hedged / requests if requests else 0.0,
+            "hedge_delay_seconds": delay,
+            "latency_p50_seconds": _percentile(latencies, 50) if latencies else None,
+            "latency_p99_seconds": _percentile(latencies, 99) if latencies else None,
+        }
+
+
+class HedgedRunnable(Runnable):
+    """Runs ``ainvoke`` of the wrapped runnable through a RequestHedger.
+
+    Sync and streaming calls go to the wrapped runnable unhedged: a stream
+    that has started producing tokens is not worth duplicating.
+    """
+
+    def __init__(self, bound: Runnable, hedger: RequestHedger):
+        self.bound = bound
+        self.hedger = hedger
+
+    def invoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        return self.bound.invoke(input, config, **kwargs)
+
+    async def ainvoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        return await self.hedger.run(
+            lambda: self.bound.ainvoke(input, config, **kwargs)
+        )
+
+    async def astream(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        async for chunk in self.bound.astream(input, config, **kwargs):
+            yield chunk
@@ -0,0 +1,133 @@
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from app.bm25 import BM25Index
+from app.numpy_store import NumpyVectorStore
+from app.retrieval import reciprocal_rank_fusion
+
+
+def document_key(doc: Document) -> str:
+    """Identify a chunk across indexes by its text.
+
+    Not every vector store returns ids from its searches (Chroma's batched
+    query path here does not), and chunks with the same text are one chunk
+    to the prompt anyway.
+    """
+    return doc.page_content
+
+
+class HybridVectorStore(VectorStore):
+    """A BM25 index kept alongside an optional dense vector store.
+
+    Every added chunk goes into both indexes under the same id. Without a
+    dense store (lexical-only retrieval) nothing is ever embedded. Searches
+    fuse the BM25 and vector rankings with reciprocal rank fusion; batched
+    retrieval in app.rag_chain searches the two halves itself.
+    """
+
+    def __init__(self, dense: VectorStore | None = None, rrf_k: int = 60):
+        self.dense = dense
+        self.lexical = BM25Index()
+        self.rrf_k = rrf_k
+
+    @property
+    def embeddings(self) -> Embeddings | None:
+        return self.dense.embeddings if self.dense is not None else None
+
+    def __len__(self) -> int:
+        return len(self.lexical)
+
+    @staticmethod
+    def _prepare(
+        texts: Iterable[str], metadatas: list[dict] | None, ids: list[str] | None
+    ) -> tuple[list[str], list[str], list[Document]]:
+        texts = list(texts)
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        documents = [
+            Document(page_content=text, metadata=metadata or {}, id=doc_id)
+            for text, metadata, doc_id in zip(
+                texts, metadatas or [{} for _ in texts], ids, strict=True
+            )
+        ]
+        return texts, ids, documents
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts, ids, documents = self._prepare(texts, metadatas, ids)
+        if not texts:
+            return []
+        if self.dense is not None:
+            self.dense.add_texts(texts, metadatas, ids=ids)
+        self.lexical.add(documents)
+        return ids
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts, ids, documents = self._prepare(texts, metadatas, ids)
+        if not texts:
+            return []
+        if self.dense is not None:
+            await self.dense.aadd_texts(texts, metadatas, ids=ids)
+        self.lexical.add(documents)
+        return ids
+
+    def fuse(
+        self, dense_docs: list[Document], lexical_docs: list[Document], k: int
+    ) -> list[Document]:
+        """Merge two rankings of the same chunks into the top ``k``."""
+        by_key = {document_key(doc): doc for doc in lexical_docs}
+        by_key.update((document_key(doc), doc) for doc in dense_docs)
+        fused = reciprocal_rank_fusion(
+            [
+                [document_key(doc) for doc in dense_docs],
+                [document_key(doc) for doc in lexical_docs],
+            ],
+            k=self.rrf_k,
+        )
+        return [by_key[key] for key, _ in fused[:k]]
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        lexical_docs = [doc for doc, _ in self.lexical.search(query, k)]
+        if self.dense is None:
+            return lexical_docs
+        return self.fuse(self.dense.similarity_search(query, k), lexical_docs, k)
+
+    def delete_collection(self) -> None:
+        if self.dense is not None:
+            self.dense.delete_collection()
+        self.lexical.clear()
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings | None = None,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "HybridVectorStore":
+        """Build a hybrid store over a NumPy index, or lexical-only without
+        ``embedding``."""
+        store = cls(NumpyVectorStore(embedding) if embedding is not None else None)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,221 @@
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Iterator
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.documents import Document
+
+from app.boilerplate import BoilerplateStats, BoilerplateStripper
+from app.document_loader import (
+    chunk_documents,
+    estimate_chunk_count,
+    lazy_load_document,
+)
+from app.document_store import embedding_dimensions, estimate_index_bytes
+from app.rag_chain import create_empty_vector_store
+from app.runtime import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+# Chunks embedded and inserted into the index per call.
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+# Embedding batches in flight at once.
+INGEST_EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "2"))
+# Capacity of the queues between stages (pages, then chunk batches).
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+# Lines at the top or bottom of at least this fraction of PDF pages (headers,
+# footers, page numbers) are stripped before chunking (0 = keep everything).
+BOILERPLATE_MIN_FRACTION = float(os.getenv("BOILERPLATE_MIN_FRACTION", "0.6"))
+# Pages with fewer characters left after stripping are dropped.
+BOILERPLATE_MIN_PAGE_CHARS = int(os.getenv("BOILERPLATE_MIN_PAGE_CHARS", "50"))
+
+_DONE = object()
+
+# Boilerplate removed by all ingests in this worker, reported at /metrics.
+boilerplate_totals = BoilerplateStats()
+
+
+@dataclass
+class IngestResult:
+    """Outcome of a streaming ingest; the pages and chunks are not retained."""
+
+    vector_store: Any
+    num_pages: int = 0
+    num_chunks: int = 0
+    size_bytes: int = 0
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    boilerplate: BoilerplateStats | None = None
+
+
+async def aiter_in_thread(
+    make_iterator: Callable[[], Iterator], maxsize: int = INGEST_QUEUE_SIZE
+) -> AsyncGenerator:
+    """Consume a blocking iterator from a dedicated thread as an async iterator.
+
+    Items pass through a bounded queue, so the producer blocks (backpressure)
+    when the consumer falls behind by more than ``maxsize`` items. The
+    producer gets its own thread rather than one from the shared thread pool:
+    while blocked it would otherwise hold a pool thread the consumer's own
+    stages (e.g. indexing) need in order to drain the queue.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    stop = threading.Event()
+
+    def _put(item) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def _produce() -> None:
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    return
+                _put((item, None))
+        except BaseException as e:
+            _put((_DONE, e))
+        else:
+            _put((_DONE, None))
+
+    producer = threading.Thread(target=_produce, name="ingest-pages", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue so its thread can exit.
+        while producer.is_alive():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+async def ingest_documents_streaming(
+    pages: AsyncGenerator[Document, None],
+    vector_store,
+    batch_size: int = INGEST_EMBED_BATCH_SIZE,
+    embed_concurrency: int = INGEST_EMBED_CONCURRENCY,
+    queue_size: int = INGEST_QUEUE_SIZE,
+    on_progress: Callable[[str, int], None] | None = None,
+    stripper: BoilerplateStripper | None = None,
+) -> IngestResult:
+    """Chunk pages and insert them into ``vector_store`` as they arrive.
+
+    Pages are split as soon as they are produced and chunks are embedded and
+    indexed in batches of ``batch_size`` while later pages are still being
+    parsed. A bounded queue between the chunking and indexing stages applies
+    backpressure, so memory stays flat regardless of document size.
+    ``on_progress`` is called with ("pages"|"chunks", count) as work completes.
+    With a ``stripper``, page boilerplate is removed before chunking and what
+    it removed is reported in ``IngestResult.boilerplate``.
+    """
+    result = IngestResult(vector_store=vector_store)
+    batches: asyncio.Queue = asyncio.Queue(queue_size)
+    started = time.perf_counter()
+    batch: list[Document] = []
+    dimensions: int | None = None
+
+    async def _add_page(original: Document, page: Document | None) -> None:
+        nonlocal batch
+        chunks = chunk_documents([page]) if page is not None else []
+        if page is not original:
+            # Estimated: chunking the original page again would double the work.
+            removed = estimate_chunk_count(original.page_content) - len(chunks)
+            stripper.stats.chunks_removed += max(0, removed)
+        batch.extend(chunks)
+        while len(batch) >= batch_size:
+            await batches.put(batch[:batch_size])
+            batch = batch[batch_size:]
+
+    async def _chunk_stage() -> None:
+        async with contextlib.aclosing(pages):
+            async for page in pages:
+                result.num_pages += 1
+                if on_progress:
+                    on_progress("pages", result.num_pages)
+                ready = stripper.feed(page) if stripper else [(page, page)]
+                for original, stripped in ready:
+                    await _add_page(original, stripped)
+        if stripper:
+            for original, stripped in stripper.flush():
+                await _add_page(original, stripped)
+            result.boilerplate = stripper.stats
+        if batch:
+            await batches.put(batch)
+        result.stage_seconds["parse_chunk"] = time.perf_counter() - started
+        for _ in range(embed_concurrency):
+            await batches.put(_DONE)
+
+    async def _index_stage() -> None:
+        nonlocal dimensions
+        while (batch := await batches.get()) is not _DONE:
+            await run_in_thread(vector_store.add_documents, batch)
+            if dimensions is None:
+                dimensions = await run_in_thread(embedding_dimensions, vector_store)
+            result.num_chunks += len(batch)
+            result.size_bytes += estimate_index_bytes(batch, dimensions)
+            if on_progress:
+                on_progress("chunks", result.num_chunks)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_chunk_stage())
+            for _ in range(embed_concurrency):
+                group.create_task(_index_stage())
+    except ExceptionGroup as e:
+        # Surface the first stage failure as-is (e.g. an unsupported file type).
+        raise e.exceptions[0] from e
+
+    result.stage_seconds["total"] = time.perf_counter() - started
+    logger.info(
+        f"Streamed {result.num_pages} pages into {result.num_chunks} chunks "
+        f"in {result.stage_seconds['total']:.2f}s"
+    )
+    return result
+
+
+async def ingest_file_streaming(
+    file_path: str,
+    content: bytes | None = None,
+    executor: Executor | None = None,
+    on_progress: Callable[[str, int], None] | None = None,
+) -> IngestResult:
+    """Stream a PDF or JSON document into a new vector store.
+
+    Pages are parsed in a worker thread (in parallel across ``executor`` for
+    PDFs) and fed through ingest_documents_streaming as they are produced.
+    PDF pages have their boilerplate stripped (see BOILERPLATE_MIN_FRACTION).
+    """
+    pages = aiter_in_thread(
+        functools.partial(lazy_load_document, file_path, content, executor=executor)
+    )
+    stripper = None
+    if BOILERPLATE_MIN_FRACTION > 0 and Path(file_path).suffix.lower() == ".pdf":
+        stripper = BoilerplateStripper(
+            min_fraction=BOILERPLATE_MIN_FRACTION,
+            min_page_chars=BOILERPLATE_MIN_PAGE_CHARS,
+        )
+    vector_store = await run_in_thread(create_empty_vector_store)
+    try:
+        result = await ingest_documents_streaming(
+            pages, vector_store, on_progress=on_progress, stripper=stripper
+        )
+    except BaseException:
+        await run_in_thread(vector_store.delete_collection)
+        raise
+    if result.boilerplate is not None:
+        boilerplate_totals.add(result.boilerplate)
+    return result
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """A background Q&A run with progress and (partial) answers."""
+
+    job_id: str
+    questions_total: int
+    status: str = QUEUED
+    progress: dict[str, int] = field(default_factory=dict)
+    answers: dict[str, str] = field(default_factory=dict)
+    reused: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def record_progress(self, stage: str, count: int) -> None:
+        """Record the running total for an ingest stage ("pages"/"chunks")."""
+        self.progress[stage] = count
+
+    def record_answer(self, question: str, answer: str) -> None:
+        """Record one finished answer as a partial result."""
+        self.answers[question] = answer
+
+    def record_reused(self, question: str, earlier_question: str) -> None:
+        """Record that an answer was reused from a paraphrased earlier question."""
+        self.reused[question] = earlier_question
+
+    def to_dict(self, include_answers: bool = True) -> dict:
+        data = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": {
+                "pages": self.progress.get("pages", 0),
+                "chunks": self.progress.get("chunks", 0),
+                "questions_answered": len(self.answers),
+                "questions_total": self.questions_total,
+            },
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_answers:
+            data["answers"] = self.answers
+            data["reused"] = self.reused
+        return data
+
+
+class JobManager:
+    """Runs jobs as background tasks with bounded concurrency.
+
+    Jobs are owned by the manager rather than by the request that submitted
+    them, so they keep running when the client disconnects. At most
+    ``max_concurrent_jobs`` run at once; the rest wait in submission order.
+    Finished jobs are kept for ``retention_seconds`` so their results can be
+    fetched.
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 2, retention_seconds: float = 3600):
+        if max_concurrent_jobs < 1:
+            raise ValueError(
+                f"max_concurrent_jobs must be at least 1, got: {max_concurrent_jobs}"
+            )
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.retention_seconds = retention_seconds
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def submit(
+        self,
+        run: Callable[[Job], Awaitable[None]],
+        questions_total: int,
+        cleanup: Callable[[], None] | None = None,
+    ) -> Job:
+        """Start ``run(job)`` in the background and return the job immediately.
+
+        ``cleanup`` is called once the job has finished, however it ended.
+        """
+        self.purge_finished()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        job = Job(job_id=uuid.uuid4().hex, questions_total=questions_total)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, run))
+        job.task.add_done_callback(lambda task: self._finish(job, task, cleanup))
+        logger.info(f"Submitted job {job.job_id}")
+        return job
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[None]]) -> None:
+        async with self._semaphore:
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                await run(job)
+            except Exception as e:
+                job.status = FAILED
+                job.error = f"{type(e).__name__}: {e}"
+                logger.exception(f"Job {job.job_id} failed")
+                return
+            job.status = SUCCEEDED
+
+    @staticmethod
+    def _finish(
+        job: Job, task: asyncio.Task, cleanup: Callable[[], None] | None
+    ) -> None:
+        # Runs however the task ended, including cancellation before it started.
+        if task.cancelled():
+            job.status = CANCELLED
+            logger.info(f"Job {job.job_id} cancelled")
+        job.finished_at = time.time()
+        if cleanup is not None:
+            cleanup()
+
+    def get(self, job_id: str) -> Job | None:
+        self.purge_finished()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Request cancellation of a queued or running job."""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished and job.task is not None:
+            job.task.cancel()
+        return job
+
+    def purge_finished(self) -> int:
+        """Drop finished jobs older than the retention period."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    async def shutdown(self) -> None:
+        """Cancel unfinished jobs and wait for them to stop."""
+        tasks = [
+            job.task for job in self._jobs.values() if job.task and not job.finished
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._semaphore = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
@@ -1,15 +1,54 @@
+import asyncio
+import json
 import logging
 import os
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.document_loader import (
-    chunk_documents,
-    load_document,
+    SavedUpload,
+    UploadTooLargeError,
     load_questions,
-    save_upload_file_temp,
+    save_upload,
+)
+from app.document_store import (
+    DocumentRegistry,
+    IndexedDocument,
+    release_vector_store,
+)
+from app.ingest_pipeline import (
+    IngestResult,
+    boilerplate_totals,
+    ingest_file_streaming,
+)
+from app.jobs import Job, JobManager
+from app.rag_chain import (
+    ANSWER_ERROR_PREFIX,
+    NOT_FOUND_ANSWER,
+    answer_questions_with_reuse,
+    get_answer_cache,
+    get_embedding_cache,
+    get_request_hedger,
+    get_semantic_answer_index,
+    lookup_cached_answers,
+    store_answers,
+)
+from app.runtime import (
+    INGEST_PROCESS_WORKERS,
+    EventLoopLagMonitor,
+    close_http_clients,
+    get_process_pool,
+    get_rate_limiter,
+    get_thread_pool,
+    open_http_clients,
+    run_in_thread,
+    shutdown_pools,
 )
-from app.rag_chain import answer_questions, create_qa_chain, create_vector_store
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,7 +56,181 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Zania Q&A API")
+# Lifecycle of documents registered through POST /documents.
+DOCUMENT_TTL_SECONDS = float(os.getenv("DOCUMENT_TTL_SECONDS", "3600"))
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(512 * 1024**2)))
+
+# Maximum size of a single uploaded file.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024**2)))
+# Requests carry up to two files plus multipart overhead.
+MAX_REQUEST_BYTES = 2 * MAX_UPLOAD_BYTES + 1024**2
+
+# Background Q&A jobs (POST /jobs): how many run at once, and how long
+# finished jobs' results stay available.
+JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", "2"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+loop_lag_monitor = EventLoopLagMonitor()
+job_manager = JobManager(
+    max_concurrent_jobs=JOB_MAX_CONCURRENCY,
+    retention_seconds=JOB_RETENTION_SECONDS,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_lag_monitor.start()
+    open_http_clients()
+    yield
+    await job_manager.shutdown()
+    await loop_lag_monitor.stop()
+    await close_http_clients()
+    shutdown_pools()
+
+
+app = FastAPI(title="Zania Q&A API", lifespan=lifespan)
+
+
+def _release_in_thread(vector_store: Any) -> None:
+    """Free a vector store in the thread pool instead of on the event loop."""
+    get_thread_pool().submit(release_vector_store, vector_store)
+
+
+document_registry = DocumentRegistry(
+    ttl_seconds=DOCUMENT_TTL_SECONDS,
+    max_bytes=DOCUMENT_MAX_BYTES,
+    release=_release_in_thread,
+)
+
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    """Reject oversized requests before their body is read."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > MAX_REQUEST_BYTES:
+            return JSONResponse(
+                status_code=413, content={"detail": "Request body too large"}
+            )
+    return await call_next(request)
+
+
+async def _save_upload_or_413(upload_file: UploadFile) -> SavedUpload:
+    suffix = os.path.splitext(upload_file.filename or "")[1]
+    try:
+        return await save_upload(upload_file, suffix=suffix, max_bytes=MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+
+
+def _load_questions_or_400(questions_upload: SavedUpload) -> list[str]:
+    logger.info("Loading questions from file")
+    questions = load_questions(questions_upload.path, questions_upload.content)
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions found in file")
+    logger.info(f"Loaded {len(questions)} questions")
+    return questions
+
+
+async def _ingest_document(
+    document_upload: SavedUpload,
+    on_progress: Callable[[str, int], None] | None = None,
+) -> IngestResult:
+    """Parse, chunk and index a document as a streaming pipeline.
+
+    Pages are extracted in the process pool, and chunks are embedded and
+    indexed in the thread pool while later pages are still being parsed, so the
+    event loop stays responsive.
+    """
+    logger.info("Ingesting document")
+    executor = get_process_pool() if INGEST_PROCESS_WORKERS > 0 else None
+    result = await ingest_file_streaming(
+        document_upload.path,
+        document_upload.content,
+        executor=executor,
+        on_progress=on_progress,
+    )
+    if result.num_chunks == 0:
+        await run_in_thread(result.vector_store.delete_collection)
+        raise HTTPException(status_code=400, detail="No content found in document")
+    logger.info(
+        f"Indexed {result.num_pages} page(s) as {result.num_chunks} chunks "
+        f"in {result.stage_seconds['total']:.2f}s"
+    )
+    if result.boilerplate is not None:
+        stats = result.boilerplate
+        logger.info(
+            f"Stripped boilerplate: {stats.lines_removed} line(s), "
+            f"{stats.chars_removed} chars, {stats.chunks_removed} chunk(s), "
+            f"{stats.pages_dropped} near-empty page(s) dropped"
+        )
+    return result
+
+
+async def _answer(
+    vector_store,
+    questions: list[str],
+    document_hash: str,
+    on_answer: Callable[[str, str], None] | None = None,
+    on_token: Callable[[str, str], None] | None = None,
+    on_reused: Callable[[str, str], None] | None = None,
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Answer questions; also return which answers reused a paraphrase's."""
+    logger.info("Answering questions")
+    answers, reused = await answer_questions_with_reuse(
+        vector_store,
+        questions,
+        document_hash,
+        on_answer=on_answer,
+        on_token=on_token,
+        on_reused=on_reused,
+    )
+    logger.info(f"Generated {len(answers) - len(reused)} answers")
+    await store_answers(document_hash, answers)
+    return answers, reused
+
+
+def _ordered(questions: list[str], answers: dict[str, str]) -> dict[str, str]:
+    return {question: answers[question] for question in dict.fromkeys(questions)}
+
+
+async def _answer_document(
+    questions: list[str],
+    document_upload: SavedUpload,
+    on_progress: Callable[[str, int], None] | None = None,
+    on_answer: Callable[[str, str], None] | None = None,
+    on_token: Callable[[str, str], None] | None = None,
+    on_reused: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Answer questions about an uploaded document with a temporary index.
+
+    Cached answers are served first; the document is only parsed and indexed
+    if some answers are not cached, and its index is deleted afterwards.
+    ``on_reused`` is told which answers were reused from a paraphrase.
+    """
+    document_hash = document_upload.sha256
+    answers = await lookup_cached_answers(document_hash, questions)
+    logger.info(f"{len(answers)} answer(s) served from the answer cache")
+    if on_answer:
+        for question, answer in answers.items():
+            on_answer(question, answer)
+
+    remaining = [q for q in dict.fromkeys(questions) if q not in answers]
+    if remaining:
+        result = await _ingest_document(document_upload, on_progress)
+        try:
+            new_answers, _ = await _answer(
+                result.vector_store,
+                remaining,
+                document_hash,
+                on_answer,
+                on_token,
+                on_reused,
+            )
+            answers.update(new_answers)
+        finally:
+            await run_in_thread(result.vector_store.delete_collection)
+    return _ordered(questions, answers)
 
 
 @app.get("/")
@@ -25,6 +238,26 @@ async def root():
     return {"message": "Zania Q&A API is running"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict:
+    """Return runtime metrics for this worker."""
+    embedding_cache = get_embedding_cache()
+    answer_cache = get_answer_cache()
+    semantic_index = get_semantic_answer_index()
+    rate_limiter = get_rate_limiter()
+    hedger = get_request_hedger()
+    return {
+        "event_loop_lag": loop_lag_monitor.stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "answer_cache": answer_cache.stats() if answer_cache else None,
+        "semantic_answer_reuse": semantic_index.stats() if semantic_index else None,
+        "openai_rate_limiter": rate_limiter.stats() if rate_limiter else None,
+        "llm_hedging": hedger.stats() if hedger else None,
+        "boilerplate_removed": boilerplate_totals.to_dict(),
+        "registered_documents": len(document_registry),
+    }
+
+
 @app.post("/qa")
 async def process_qa(
     questions_file: UploadFile,
@@ -38,52 +271,328 @@ async def process_qa(
     """
     logger.info("Starting Q&A processing")
 
-    questions_suffix = os.path.splitext(questions_file.filename or "")[1]
-    document_suffix = os.path.splitext(document_file.filename or "")[1]
-
     logger.info("Saving uploaded files to temporary storage")
-    questions_path = await save_upload_file_temp(
-        questions_file, suffix=questions_suffix
+    questions_upload = await _save_upload_or_413(questions_file)
+    try:
+        document_upload = await _save_upload_or_413(document_file)
+    except BaseException:
+        questions_upload.cleanup()
+        raise
+    logger.info(
+        f"Files saved: questions={questions_upload.path}, "
+        f"document={document_upload.path} ({document_upload.size} bytes)"
     )
-    document_path = await save_upload_file_temp(document_file, suffix=document_suffix)
-    logger.info(f"Files saved: questions={questions_path}, document={document_path}")
 
     try:
-        logger.info("Loading questions from file")
-        questions = load_questions(questions_path)
-        if not questions:
-            raise HTTPException(status_code=400, detail="No questions found in file")
-        logger.info(f"Loaded {len(questions)} questions")
-
-        logger.info("Loading document content")
-        documents = load_document(document_path)
-        if not documents:
-            raise HTTPException(status_code=400, detail="No content found in document")
-        logger.info(f"Loaded {len(documents)} document(s)")
-
-        logger.info("Chunking documents")
-        chunks = chunk_documents(documents)
-        logger.info(f"Created {len(chunks)} chunks")
-
-        logger.info("Creating vector store")
-        vector_store = create_vector_store(chunks)
-        logger.info("Vector store created successfully")
-
-        logger.info("Creating QA chain")
-        qa_chain = create_qa_chain(vector_store)
-        logger.info("QA chain created successfully")
-
-        logger.info("Answering questions")
-        answers = await answer_questions(qa_chain, questions)
-        logger.info(f"Generated {len(answers)} answers")
+        questions = _load_questions_or_400(questions_upload)
+        answers = await _answer_document(questions, document_upload)
 
         logger.info("Q&A processing completed successfully")
         return answers  # Direct dict: {"question": "answer", ...}
 
     finally:
         logger.info("Cleaning up temporary files")
-        if os.path.exists(questions_path):
-            os.unlink(questions_path)
-        if os.path.exists(document_path):
-            os.unlink(document_path)
+        questions_upload.cleanup()
+        document_upload.cleanup()
         logger.info("Cleanup completed")
+
+
+def _ndjson_record(record: dict) -> str:
+    return json.dumps(record) + "\n"
+
+
+def _sse_record(record: dict) -> str:
+    return f"event: {record['type']}\ndata: {json.dumps(record)}\n\n"
+
+
+@app.post("/qa/stream")
+async def process_qa_stream(
+    request: Request,
+    questions_file: UploadFile,
+    document_file: UploadFile,
+    tokens: bool = False,
+) -> StreamingResponse:
+    """
+    Process a Q&A request, streaming each answer as soon as it is ready.
+
+    Takes the same files as ``POST /qa``. Emits one ``answer`` record
+    (question, answer, input index, whether nothing relevant was found,
+    whether the answer was reused from a paraphrased earlier question, and
+    seconds since the request started) per entry of the questions file in
+    completion order, then a ``summary`` record with counts and timings, or
+    an ``error`` record if processing fails. A question listed twice is
+    answered once, with a record for each of its input indexes. The body is
+    NDJSON, or Server-Sent Events when the client sends
+    ``Accept: text/event-stream``.
+
+    With ``?tokens=true`` generated answers are also streamed as ``token``
+    records (index of the question's first occurrence in the input, and text
+    delta) while the model produces them, so the answers to several questions
+    interleave on one connection. Cached and reused answers only get their
+    ``answer`` record.
+    """
+    started = time.perf_counter()
+    questions_upload = await _save_upload_or_413(questions_file)
+    try:
+        questions = _load_questions_or_400(questions_upload)
+    finally:
+        questions_upload.cleanup()
+    document_upload = await _save_upload_or_413(document_file)
+
+    positions: dict[str, list[int]] = {}
+    for i, question in enumerate(questions):
+        positions.setdefault(question, []).append(i)
+    records: asyncio.Queue[dict | None] = asyncio.Queue()
+    progress: dict[str, int] = {}
+    reused: set[str] = set()
+    failed = 0
+
+    def _on_answer(question: str, answer: str) -> None:
+        nonlocal failed
+        indexes = positions[question]
+        failed += answer.startswith(ANSWER_ERROR_PREFIX) * len(indexes)
+        elapsed = time.perf_counter() - started
+        for index in indexes:
+            records.put_nowait(
+                {
+                    "type": "answer",
+                    "index": index,
+                    "question": question,
+                    "answer": answer,
+                    "not_found": answer == NOT_FOUND_ANSWER,
+                    "reused": question in reused,
+                    "elapsed_seconds": elapsed,
+                }
+            )
+
+    def _on_token(question: str, delta: str) -> None:
+        records.put_nowait(
+            {"type": "token", "index": positions[question][0], "delta": delta}
+        )
+
+    def _on_progress(stage: str, count: int) -> None:
+        progress[stage] = count
+
+    def _on_reused(question: str, earlier_question: str) -> None:
+        reused.add(question)
+
+    async def _produce() -> None:
+        try:
+            await _answer_document(
+                questions,
+                document_upload,
+                _on_progress,
+                _on_answer,
+                _on_token if tokens else None,
+                _on_reused,
+            )
+        except Exception as e:
+            logger.exception("Streaming Q&A failed")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            records.put_nowait({"type": "error", "detail": detail})
+        finally:
+            records.put_nowait(None)
+
+    producer = asyncio.create_task(_produce())
+    # Also runs when the producer is cancelled before it started.
+    producer.add_done_callback(lambda _: document_upload.cleanup())
+    encode = (
+        _sse_record
+        if "text/event-stream" in request.headers.get("accept", "")
+        else _ndjson_record
+    )
+
+    async def _stream():
+        first_answer_seconds = None
+        answered = 0
+        try:
+            while (record := await records.get()) is not None:
+                if record["type"] == "answer":
+                    answered += 1
+                    if first_answer_seconds is None:
+                        first_answer_seconds = record["elapsed_seconds"]
+                yield encode(record)
+            yield encode(
+                {
+                    "type": "summary",
+                    "questions": len(questions),
+                    "answered": answered,
+                    "failed": failed,
+                    "pages": progress.get("pages", 0),
+                    "chunks": progress.get("chunks", 0),
+                    "first_answer_seconds": first_answer_seconds,
+                    "total_seconds": time.perf_counter() - started,
+                }
+            )
+        finally:
+            # Stop work nobody is listening to any more.
+            producer.cancel()
+
+    media_type = (
+        "text/event-stream" if encode is _sse_record else "application/x-ndjson"
+    )
+    return StreamingResponse(_stream(), media_type=media_type)
+
+
+@app.post("/documents")
+async def register_document(document_file: UploadFile) -> dict:
+    """
+    Register a document for repeated Q&A.
+
+    Upload a document file (PDF or JSON) once. It is parsed, chunked and indexed,
+    and the returned ``document_id`` (derived from the content hash) can be used
+    with ``POST /documents/{document_id}/qa`` without paying the ingest cost
+    again. Uploading the same content again returns the existing index.
+    """
+    document_upload = await _save_upload_or_413(document_file)
+
+    try:
+        document_id = document_upload.sha256
+        existing = document_registry.get(document_id)
+        if existing is not None:
+            logger.info(f"Document {document_id} already registered")
+            return existing.to_dict(document_registry.ttl_seconds)
+
+        logger.info(f"Registering document {document_id}")
+        result = await _ingest_document(document_upload)
+        indexed = IndexedDocument(
+            document_id=document_id,
+            filename=document_file.filename or "",
+            vector_store=result.vector_store,
+            num_pages=result.num_pages,
+            num_chunks=result.num_chunks,
+            size_bytes=result.size_bytes,
+        )
+        document_registry.add(indexed)
+        return indexed.to_dict(document_registry.ttl_seconds)
+
+    finally:
+        document_upload.cleanup()
+
+
+@app.get("/documents/{document_id}")
+async def get_document(document_id: str) -> dict:
+    """Return metadata for a registered document."""
+    document = document_registry.get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document.to_dict(document_registry.ttl_seconds)
+
+
+@app.delete("/documents/{document_id}")
+async def delete_document(document_id: str) -> dict:
+    """Delete a registered document and free its index."""
+    if not document_registry.delete(document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"document_id": document_id, "deleted": True}
+
+
+@app.post("/documents/{document_id}/qa")
+async def process_document_qa(document_id: str, questions_file: UploadFile) -> dict:
+    """
+    Answer a questions file (JSON) against a registered document.
+
+    Returns the document id, a dict pairing each question with its answer,
+    ``reused``: for answers served from a paraphrased earlier question, the
+    question whose answer was reused, and ``not_found``: the questions no
+    retrieved chunk was relevant to, answered without the LLM.
+    """
+    document = document_registry.get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    questions_upload = await _save_upload_or_413(questions_file)
+    try:
+        questions = _load_questions_or_400(questions_upload)
+        answers = await lookup_cached_answers(document_id, questions)
+        remaining = [q for q in dict.fromkeys(questions) if q not in answers]
+        reused = {}
+        if remaining:
+            new_answers, reused = await _answer(
+                document.vector_store, remaining, document_id
+            )
+            answers.update(new_answers)
+        return {
+            "document_id": document_id,
+            "answers": _ordered(questions, answers),
+            "reused": reused,
+            "not_found": [q for q, a in answers.items() if a == NOT_FOUND_ANSWER],
+        }
+
+    finally:
+        questions_upload.cleanup()
+
+
+@app.delete("/answer-cache")
+async def invalidate_answer_cache(document_id: str | None = None) -> dict:
+    """
+    Invalidate cached answers.
+
+    Removes the cached and reusable answers for ``document_id`` (a document
+    content hash), or every cached answer when it is omitted.
+    """
+    answer_cache = get_answer_cache()
+    semantic_index = get_semantic_answer_index()
+    if answer_cache is None and semantic_index is None:
+        raise HTTPException(status_code=404, detail="Answer cache is not enabled")
+    deleted = 0
+    if answer_cache is not None:
+        deleted = await run_in_thread(answer_cache.invalidate, document_id)
+    if semantic_index is not None:
+        semantic_index.invalidate(document_id)
+    logger.info(f"Invalidated {deleted} cached answer(s)")
+    return {"document_id": document_id, "deleted": deleted}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_qa_job(
+    questions_file: UploadFile,
+    document_file: UploadFile,
+) -> dict:
+    """
+    Start a background Q&A job.
+
+    Takes the same files as ``POST /qa`` but returns a ``job_id`` immediately.
+    The job keeps running if the client disconnects; poll
+    ``GET /jobs/{job_id}`` for progress and answers.
+    """
+    questions_upload = await _save_upload_or_413(questions_file)
+    try:
+        questions = _load_questions_or_400(questions_upload)
+    finally:
+        questions_upload.cleanup()
+    document_upload = await _save_upload_or_413(document_file)
+
+    async def _run(job: Job) -> None:
+        job.answers = await _answer_document(
+            questions,
+            document_upload,
+            on_progress=job.record_progress,
+            on_answer=job.record_answer,
+            on_reused=job.record_reused,
+        )
+
+    job = job_manager.submit(
+        _run,
+        questions_total=len(set(questions)),
+        cleanup=document_upload.cleanup,
+    )
+    return job.to_dict(include_answers=False)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> dict:
+    """Return a job's status, per-stage progress and answers so far."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str) -> dict:
+    """Cancel a queued or running job; answers so far are kept."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_answers=False)
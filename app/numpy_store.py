@@ -0,0 +1,243 @@
+import threading
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Return row-wise L2-normalized float32 copies of ``vectors``."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the ``k`` highest scores per row, best first.
+
+    Uses argpartition so only the selected ``k`` columns are sorted.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class NumpyVectorStore(VectorStore):
+    """In-memory exact-search vector store backed by one NumPy matrix.
+
+    Embeddings are L2-normalized float32 rows of a single contiguous matrix
+    (grown by doubling), so cosine top-k is one matrix product plus
+    argpartition. There is no client, HNSW index or metadata database to set
+    up, which for per-request indexes of a few thousand chunks costs far more
+    than the search itself. Adds are thread-safe; searches work on a snapshot
+    and may run concurrently with them.
+    """
+
+    def __init__(self, embedding: Embeddings, dtype=np.float32):
+        self._embedding = embedding
+        self._dtype = dtype
+        self._matrix: np.ndarray | None = None
+        self._size = 0
+        self._ids: list[str] = []
+        self._documents: list[Document] = []
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dimensions(self) -> int:
+        """Width of the stored vectors (0 before anything is added)."""
+        return 0 if self._matrix is None else self._matrix.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for the embedding matrix."""
+        return 0 if self._matrix is None else self._matrix.nbytes
+
+    def _append(
+        self,
+        vectors: list[list[float]],
+        texts: list[str],
+        metadatas: list[dict] | None,
+        ids: list[str] | None,
+    ) -> list[str]:
+        rows = normalize_rows(vectors).astype(self._dtype, copy=False)
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        with self._lock:
+            needed = self._size + len(rows)
+            if self._matrix is None or needed > len(self._matrix):
+                capacity = max(
+                    needed, 2 * (0 if self._matrix is None else len(self._matrix))
+                )
+                matrix = np.empty((capacity, rows.shape[1]), dtype=self._dtype)
+                if self._size:
+                    matrix[: self._size] = self._matrix[: self._size]
+                self._matrix = matrix
+            self._matrix[self._size : needed] = rows
+            self._size = needed
+            self._ids.extend(ids)
+            self._documents.extend(
+                Document(page_content=text, metadata=metadata or {}, id=doc_id)
+                for text, metadata, doc_id in zip(texts, metadatas, ids, strict=True)
+            )
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding.embed_documents(texts)
+        return self._append(vectors, texts, metadatas, ids)
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = await self._embedding.aembed_documents(texts)
+        return self._append(vectors, texts, metadatas, ids)
+
+    def _snapshot(self) -> tuple[np.ndarray, list[Document]]:
+        with self._lock:
+            if self._matrix is None:
+                return np.empty((0, 0), dtype=self._dtype), []
+            return self._matrix[: self._size], self._documents[: self._size]
+
+    def similarity_search_by_vectors_with_scores(
+        self, embeddings: list[list[float]], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """Return the top-k documents and cosine similarities for each vector."""
+        matrix, documents = self._snapshot()
+        if not documents or not len(embeddings):
+            return [[] for _ in embeddings]
+        queries = normalize_rows(embeddings).astype(self._dtype, copy=False)
+        scores = queries @ matrix.T
+        indices = top_k(scores, k)
+        return [
+            [(documents[i], float(row_scores[i])) for i in row_indices]
+            for row_indices, row_scores in zip(indices, scores, strict=True)
+        ]
+
+    def similarity_search_by_vectors(
+        self, embeddings: list[list[float]], k: int = 4
+    ) -> list[list[Document]]:
+        """Return the top-k documents for each vector with one matrix product."""
+        return [
+            [doc for doc, _ in results]
+            for results in self.similarity_search_by_vectors_with_scores(embeddings, k)
+        ]
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return self.similarity_search_by_vectors([embedding], k)[0]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        embedding = self._embedding.embed_query(query)
+        return self.similarity_search_by_vectors_with_scores([embedding], k)[0]
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        embedding = await self._embedding.aembed_query(query)
+        return self.similarity_search_by_vectors_with_scores([embedding], k)[0]
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities in [-1, 1].
+        return lambda score: score
+
+    def get_by_ids(self, ids: list[str], /) -> list[Document]:
+        wanted = set(ids)
+        _, documents = self._snapshot()
+        return [doc for doc in documents if doc.id in wanted]
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Delete documents by id, or everything when ``ids`` is None."""
+        with self._lock:
+            if ids is None:
+                keep = []
+            else:
+                drop = set(ids)
+                keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in drop]
+            self._matrix = self._matrix[keep].copy() if keep else None
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._size = len(keep)
+        return True
+
+    def delete_collection(self) -> None:
+        """Drop every document and free the matrix (mirrors Chroma)."""
+        self.delete()
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    @classmethod
+    async def afrom_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding)
+        await store.aadd_texts(texts, metadatas, ids=ids)
+        return store
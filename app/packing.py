@@ -0,0 +1,95 @@
+import json
+import re
+
+from langchain_core.documents import Document
+
+from app.context import estimate_tokens
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+def group_by_context(
+    contexts: dict[str, list[Document]],
+    max_questions: int = 8,
+    max_context_tokens: int = 6000,
+    min_overlap: float = 0.5,
+) -> list[list[str]]:
+    """Group questions whose retrieved chunks largely overlap.
+
+    Each question joins the group already holding the largest share (at
+    least ``min_overlap``) of its chunks, as long as the group stays within
+    ``max_questions`` and the group's distinct chunks plus its questions stay
+    within ``max_context_tokens``; otherwise it starts a new group. Groups and
+    the questions in them keep the input order.
+    """
+    groups: list[tuple[list[str], dict[str, int]]] = []
+    group_tokens: list[int] = []
+    for question, docs in contexts.items():
+        chunks = {doc.page_content: estimate_tokens(doc.page_content) for doc in docs}
+        best, best_overlap = None, min_overlap
+        for i, (members, group_chunks) in enumerate(groups):
+            if len(members) >= max_questions or not chunks:
+                continue
+            overlap = len(chunks.keys() & group_chunks.keys()) / len(chunks)
+            if overlap < best_overlap or (best is not None and overlap == best_overlap):
+                continue
+            added = sum(t for chunk, t in chunks.items() if chunk not in group_chunks)
+            if group_tokens[i] + added + estimate_tokens(question) > max_context_tokens:
+                continue
+            best, best_overlap = i, overlap
+        if best is None:
+            groups.append(([question], dict(chunks)))
+            group_tokens.append(sum(chunks.values()) + estimate_tokens(question))
+            continue
+        members, group_chunks = groups[best]
+        added = {chunk: t for chunk, t in chunks.items() if chunk not in group_chunks}
+        members.append(question)
+        group_chunks.update(added)
+        group_tokens[best] += sum(added.values()) + estimate_tokens(question)
+    return [members for members, _ in groups]
+
+
+def merge_contexts(docs_per_question: list[list[Document]]) -> list[Document]:
+    """Return the distinct documents of several questions in first-seen order."""
+    merged: dict[str, Document] = {}
+    for docs in docs_per_question:
+        for doc in docs:
+            merged.setdefault(doc.page_content, doc)
+    return list(merged.values())
+
+
+def format_numbered_questions(questions: list[str]) -> str:
+    return "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+
+
+def parse_packed_answers(text: str, count: int) -> list[str] | None:
+    """Parse a JSON list of ``{"id", "answer"}`` objects for ``count`` questions.
+
+    Returns the answers in question order, or None unless there is exactly
+    one non-empty string answer for every id from 1 to ``count``.
+    """
+    text = text.strip()
+    if match := _FENCE_RE.match(text):
+        text = match.group(1)
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(items, list) or len(items) != count:
+        return None
+
+    answers: dict[int, str] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        answer_id, answer = item.get("id"), item.get("answer")
+        if (
+            not isinstance(answer_id, int)
+            or not 1 <= answer_id <= count
+            or answer_id in answers
+            or not isinstance(answer, str)
+            or not answer.strip()
+        ):
+            return None
+        answers[answer_id] = answer.strip()
+    return [answers[i] for i in range(1, count + 1)]
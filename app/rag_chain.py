@@ -1,17 +1,115 @@
+import asyncio
+import functools
+import hashlib
+import logging
 import os
+import threading
+import uuid
+from collections.abc import Callable
 
 from dotenv import load_dotenv
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.vectorstores import VectorStore
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
+from app.answer_cache import AnswerCache, answer_cache_key
+from app.context import assemble_context, get_token_counter
+from app.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.hedging import HedgedRunnable, RequestHedger
+from app.hybrid_store import HybridVectorStore, document_key
+from app.numpy_store import NumpyVectorStore, normalize_rows
+from app.packing import (
+    format_numbered_questions,
+    group_by_context,
+    merge_contexts,
+    parse_packed_answers,
+)
+from app.retrieval import choose_k
+from app.runtime import get_http_clients
+from app.semantic_cache import SemanticAnswerIndex
+
 load_dotenv()
 
-QA_PROMPT = ChatPromptTemplate.from_template(
-    """Use the following pieces of context to answer the question.
+logger = logging.getLogger(__name__)
+
+# Maximum number of questions answered concurrently by answer_questions.
+QA_MAX_CONCURRENCY = int(os.getenv("QA_MAX_CONCURRENCY", "8"))
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Shortened embedding size requested from the model (0 = the model's default).
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0
+RETRIEVAL_K = 6
+# Adaptive top-k: with RETRIEVAL_MAX_K above 0, up to that many chunks are
+# retrieved and k is picked per question from their scores (see choose_k),
+# instead of the fixed RETRIEVAL_K.
+RETRIEVAL_MAX_K = int(os.getenv("RETRIEVAL_MAX_K", "0"))
+RETRIEVAL_MIN_K = int(os.getenv("RETRIEVAL_MIN_K", "2"))
+RETRIEVAL_GAP_FRACTION = float(os.getenv("RETRIEVAL_GAP_FRACTION", "0.25"))
+RETRIEVAL_CUMULATIVE_SCORE = float(os.getenv("RETRIEVAL_CUMULATIVE_SCORE", "0.9"))
+
+# Vector index backend: "chroma", or "numpy" for the in-process exact-search
+# matrix in app/numpy_store.py.
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+VECTOR_STORE_BACKENDS = ("chroma", "numpy")
+
+# Retrieval mode: "vector" (embeddings only), "hybrid" (a BM25 index built at
+# ingest fused with vector search, see app/hybrid_store.py) or "lexical"
+# (BM25 only, no embedding calls at all).
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+RETRIEVAL_MODES = ("vector", "hybrid", "lexical")
+
+# OpenAI-compatible API base URL, e.g. the local stub server in
+# benchmarks/openai_stub.py; the OpenAI API is used when unset.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# On-disk embedding cache; disabled when no path is configured.
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# On-disk answer cache; disabled when no path is configured. Answers older than
+# the TTL (0 = no expiry) are recomputed.
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "100000"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "0"))
+
+# Reuse the answer of an earlier question about the same document when the
+# questions' embeddings have at least this cosine similarity (0 = disabled).
+SEMANTIC_REUSE_THRESHOLD = float(os.getenv("SEMANTIC_REUSE_THRESHOLD", "0"))
+SEMANTIC_REUSE_MAX_ENTRIES = int(os.getenv("SEMANTIC_REUSE_MAX_ENTRIES", "1000"))
+SEMANTIC_REUSE_MAX_DOCUMENTS = int(os.getenv("SEMANTIC_REUSE_MAX_DOCUMENTS", "256"))
+
+# Hedge answer generation slower than this percentile of recent calls
+# (0 disables hedging), capped at HEDGE_MAX_RATIO of calls.
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.05"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Token budget for the retrieved context of one prompt (0 = no limit), and
+# the word-trigram similarity above which a chunk is a near duplicate.
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+CONTEXT_DEDUP_SIMILARITY = float(os.getenv("CONTEXT_DEDUP_SIMILARITY", "0.9"))
+
+# Answer up to QA_PACK_MAX_QUESTIONS questions with overlapping retrieved
+# chunks in one LLM call (1 disables packing).
+QA_PACK_MAX_QUESTIONS = int(os.getenv("QA_PACK_MAX_QUESTIONS", "1"))
+QA_PACK_MAX_CONTEXT_TOKENS = int(os.getenv("QA_PACK_MAX_CONTEXT_TOKENS", "6000"))
+QA_PACK_MIN_OVERLAP = float(os.getenv("QA_PACK_MIN_OVERLAP", "0.5"))
+
+# Questions whose retrieved chunks all have a cosine similarity below this get
+# NOT_FOUND_ANSWER without an LLM call (0 disables the check).
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", "0"))
+NOT_FOUND_ANSWER = "Not found in document."
+
+# Answers for questions that failed start with this and are never cached.
+ANSWER_ERROR_PREFIX = "Error: failed to answer question"
+
+QA_PROMPT_TEMPLATE = """Use the following pieces of context to answer the question.
 If you cannot find a direct answer in the context, provide the most relevant
 information available. Be concise and specific.
 
@@ -21,56 +119,810 @@ Context:
 Question: {question}
 
 Answer:"""
-)
+QA_PROMPT = ChatPromptTemplate.from_template(QA_PROMPT_TEMPLATE)
+
+QA_PACKED_PROMPT_TEMPLATE = """Use the following pieces of context to answer each of
+the numbered questions. If you cannot find a direct answer in the context, provide
+the most relevant information available. Be concise and specific.
+
+Context:
+{context}
+
+Questions:
+{questions}
+
+Reply with only a JSON array holding one object per question, in order:
+[{{"id": 1, "answer": "..."}}, {{"id": 2, "answer": "..."}}]"""
+QA_PACKED_PROMPT = ChatPromptTemplate.from_template(QA_PACKED_PROMPT_TEMPLATE)
+
+# Part of the answer cache key, so editing the prompt invalidates old answers.
+QA_PROMPT_VERSION = hashlib.sha256(
+    (
+        QA_PROMPT_TEMPLATE + QA_PACKED_PROMPT_TEMPLATE
+        if QA_PACK_MAX_QUESTIONS > 1
+        else QA_PROMPT_TEMPLATE
+    ).encode()
+).hexdigest()[:12]
+
+
+@functools.cache
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the process-wide embedding cache, or None if it is disabled."""
+    if not EMBEDDING_CACHE_PATH:
+        return None
+    return EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+
+
+@functools.cache
+def get_answer_cache() -> AnswerCache | None:
+    """Return the process-wide answer cache, or None if it is disabled."""
+    if not ANSWER_CACHE_PATH:
+        return None
+    return AnswerCache(
+        ANSWER_CACHE_PATH,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=ANSWER_CACHE_TTL_SECONDS or None,
+    )
+
+
+@functools.cache
+def get_semantic_answer_index() -> SemanticAnswerIndex | None:
+    """Return the process-wide paraphrase answer index, or None if disabled."""
+    if SEMANTIC_REUSE_THRESHOLD <= 0:
+        return None
+    return SemanticAnswerIndex(
+        SEMANTIC_REUSE_THRESHOLD,
+        max_entries_per_document=SEMANTIC_REUSE_MAX_ENTRIES,
+        max_documents=SEMANTIC_REUSE_MAX_DOCUMENTS,
+    )
+
+
+@functools.cache
+def get_request_hedger() -> RequestHedger | None:
+    """Return the process-wide LLM request hedger, or None if disabled."""
+    if HEDGE_PERCENTILE <= 0:
+        return None
+    return RequestHedger(
+        HEDGE_PERCENTILE,
+        max_hedge_ratio=HEDGE_MAX_RATIO,
+        min_samples=HEDGE_MIN_SAMPLES,
+    )
+
+
+def _http_client_kwargs() -> dict:
+    """Return the shared HTTP clients as OpenAI model kwargs, if they are open.
+
+    Their rate-limited transport retries 429s, 5xx responses and connection
+    errors itself, so the SDK's own retries are turned off: each SDK retry
+    would rerun the whole backoff loop and multiply the attempts per call.
+    """
+    clients = get_http_clients()
+    if clients is None:
+        return {}
+    http_client, http_async_client = clients
+    return {
+        "http_client": http_client,
+        "http_async_client": http_async_client,
+        "max_retries": 0,
+    }
+
 
+def create_embeddings(base_url: str | None = None):
+    """Create the embedding model, behind the embedding cache when enabled.
 
-def create_vector_store(documents: list[Document]) -> Chroma:
-    """Create an in-memory ChromaDB vector store from documents."""
+    ``base_url`` defaults to ``OPENAI_BASE_URL``.
+    """
+    base_url = base_url or OPENAI_BASE_URL
     embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-small",
+        model=EMBEDDING_MODEL,
         openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_api_base=base_url,
+        dimensions=EMBEDDING_DIMENSIONS or None,
+        # Context-length checks tokenize with tiktoken, which downloads its
+        # encodings; compatible servers take plain strings, so skip it there.
+        check_embedding_ctx_length=base_url is None,
+        **_http_client_kwargs(),
     )
-    vector_store = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
+    cache = get_embedding_cache()
+    if cache is not None:
+        # Vectors from another server must not be served as OpenAI's.
+        cache_model = f"{EMBEDDING_MODEL}@{base_url}" if base_url else EMBEDDING_MODEL
+        embeddings = CachedEmbeddings(embeddings, cache, model=cache_model)
+    return embeddings
+
+
+def create_chat_model(base_url: str | None = None):
+    """Create the chat model used to answer questions.
+
+    ``base_url`` defaults to ``OPENAI_BASE_URL``.
+    """
+    return ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_api_base=base_url or OPENAI_BASE_URL,
+        **_http_client_kwargs(),
     )
+
+
+def _resolve_backend(backend: str | None) -> str:
+    backend = backend or VECTOR_STORE_BACKEND
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(
+            f"Unknown vector store backend: {backend!r} "
+            f"(expected one of {', '.join(VECTOR_STORE_BACKENDS)})"
+        )
+    return backend
+
+
+# chromadb sets up its shared in-process client on first use and that setup
+# is not thread-safe; stores are created from pool threads, so serialize it.
+_chroma_lock = threading.Lock()
+
+
+def _new_chroma(embeddings) -> Chroma:
+    """Create a Chroma store in a collection of its own.
+
+    Each store gets its own collection so concurrent requests and registered
+    documents never see each other's chunks.
+    """
+    with _chroma_lock:
+        return Chroma(
+            collection_name=f"qa-{uuid.uuid4().hex}",
+            embedding_function=embeddings,
+        )
+
+
+def _resolve_mode(mode: str | None) -> str:
+    mode = mode or RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(
+            f"Unknown retrieval mode: {mode!r} "
+            f"(expected one of {', '.join(RETRIEVAL_MODES)})"
+        )
+    return mode
+
+
+def create_empty_vector_store(
+    embeddings=None, backend: str | None = None, mode: str | None = None
+) -> VectorStore:
+    """Create an empty in-memory vector store to add documents to.
+
+    ``backend`` defaults to ``VECTOR_STORE_BACKEND`` and ``mode`` to
+    ``RETRIEVAL_MODE``; hybrid and lexical modes return a HybridVectorStore.
+    ``embeddings`` defaults to create_embeddings().
+    """
+    mode = _resolve_mode(mode)
+    backend = _resolve_backend(backend)
+    if mode == "lexical":
+        return HybridVectorStore()
+    embeddings = embeddings or create_embeddings()
+    if backend == "numpy":
+        dense = NumpyVectorStore(embeddings)
+    else:
+        dense = _new_chroma(embeddings)
+    return HybridVectorStore(dense) if mode == "hybrid" else dense
+
+
+def create_vector_store(
+    documents: list[Document],
+    embeddings=None,
+    base_url: str | None = None,
+    backend: str | None = None,
+    mode: str | None = None,
+) -> VectorStore:
+    """Create an in-memory vector store from documents.
+
+    ``backend`` defaults to ``VECTOR_STORE_BACKEND`` and ``mode`` to
+    ``RETRIEVAL_MODE``; hybrid and lexical modes return a HybridVectorStore.
+    ``embeddings`` defaults to create_embeddings(base_url), which serves chunk
+    embeddings from the embedding cache when it is enabled.
+    """
+    mode = _resolve_mode(mode)
+    if mode == "hybrid":
+        embeddings = embeddings or create_embeddings(base_url)
+    if mode != "vector":
+        vector_store = create_empty_vector_store(embeddings, backend, mode)
+        vector_store.add_documents(documents)
+        return vector_store
+    embeddings = embeddings or create_embeddings(base_url)
+    if _resolve_backend(backend) == "numpy":
+        return NumpyVectorStore.from_documents(documents, embeddings)
+    vector_store = _new_chroma(embeddings)
+    vector_store.add_documents(documents)
     return vector_store
 
 
-def _format_docs(docs: list[Document]) -> str:
-    """Format retrieved documents into a single string."""
-    return "\n\n".join(doc.page_content for doc in docs)
+def _format_docs(docs: list[Document], max_tokens: int | None = None) -> str:
+    """Format retrieved documents into the prompt context.
 
+    Overlapping chunks are merged, duplicates dropped and the result packed
+    into ``max_tokens`` (default ``CONTEXT_MAX_TOKENS``); see assemble_context.
+    """
+    return assemble_context(
+        docs,
+        max_tokens=CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens,
+        count_tokens=get_token_counter(LLM_MODEL),
+        max_similarity=CONTEXT_DEDUP_SIMILARITY,
+    )
 
-def create_qa_chain(vector_store: Chroma):
-    """Create a RAG chain using LCEL (LangChain Expression Language)."""
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
+
+def _hedged(llm):
+    hedger = get_request_hedger()
+    return llm if hedger is None else HedgedRunnable(llm, hedger)
+
+
+def create_answer_chain(llm=None, base_url: str | None = None):
+    """Create the generation half of the RAG chain.
+
+    The chain takes ``{"context": str, "question": str}`` and returns the
+    answer. ``llm`` defaults to create_chat_model(base_url). With hedging
+    enabled, slow LLM calls are hedged (see RequestHedger).
+    """
+    return QA_PROMPT | _hedged(llm or create_chat_model(base_url)) | StrOutputParser()
+
+
+def create_packed_answer_chain(llm=None, base_url: str | None = None):
+    """Create the generation chain answering several questions in one call.
+
+    The chain takes ``{"context": str, "questions": str}`` with numbered
+    questions and returns the raw reply, to be checked with
+    parse_packed_answers. ``llm`` defaults to create_chat_model(base_url).
+    """
+    return (
+        QA_PACKED_PROMPT
+        | _hedged(llm or create_chat_model(base_url))
+        | StrOutputParser()
     )
+
+
+def create_qa_chain(vector_store: VectorStore, llm=None, base_url: str | None = None):
+    """Create a RAG chain using LCEL (LangChain Expression Language).
+
+    ``llm`` defaults to create_chat_model(base_url).
+    """
     retriever = vector_store.as_retriever(
         search_type="similarity",
-        search_kwargs={"k": 6},
+        search_kwargs={"k": RETRIEVAL_K},
     )
 
     # LCEL chain: retrieve → format → prompt → llm → parse
-    rag_chain = (
-        {"context": retriever | _format_docs, "question": RunnablePassthrough()}
-        | QA_PROMPT
-        | llm
-        | StrOutputParser()
-    )
+    rag_chain = {
+        "context": retriever | _format_docs,
+        "question": RunnablePassthrough(),
+    } | create_answer_chain(llm, base_url)
     return rag_chain
 
 
+def _search_by_vectors(
+    vector_store, query_embeddings: list[list[float]], k: int
+) -> list[list[Document]]:
+    """Return the top-k documents for each query embedding."""
+    return [
+        [doc for doc, _ in results]
+        for results in _search_by_vectors_with_scores(
+            vector_store, query_embeddings, k, with_scores=False
+        )
+    ]
+
+
+def _search_by_vectors_with_scores(
+    vector_store,
+    query_embeddings: list[list[float]],
+    k: int,
+    with_scores: bool = True,
+) -> list[list[tuple[Document, float | None]]]:
+    """Return the top-k documents and their cosine similarity per query embedding.
+
+    Scores are None when ``with_scores`` is False (NumPy stores score for
+    free anyway) and for vector stores other than NumPy and Chroma.
+    """
+    if isinstance(vector_store, NumpyVectorStore):
+        return vector_store.similarity_search_by_vectors_with_scores(
+            query_embeddings, k
+        )
+    if isinstance(vector_store, Chroma):
+        # One multi-query call instead of one collection query per question.
+        include = ["documents", "metadatas"]
+        if with_scores:
+            # Chroma's default distance is L2; cosine comes from the vectors.
+            include.append("embeddings")
+        results = vector_store._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=include,
+        )
+        scored = []
+        for i, (texts, metadatas) in enumerate(
+            zip(results["documents"], results["metadatas"], strict=True)
+        ):
+            scores = [None] * len(texts)
+            if with_scores and texts:
+                scores = (
+                    normalize_rows(results["embeddings"][i])
+                    @ normalize_rows(query_embeddings[i])[0]
+                ).tolist()
+            scored.append(
+                [
+                    (Document(page_content=text, metadata=metadata or {}), score)
+                    for text, metadata, score in zip(
+                        texts, metadatas, scores, strict=True
+                    )
+                ]
+            )
+        return scored
+    return [
+        [
+            (doc, None)
+            for doc in vector_store.similarity_search_by_vector(embedding, k=k)
+        ]
+        for embedding in query_embeddings
+    ]
+
+
+async def embed_questions(
+    vector_store: VectorStore, questions: list[str]
+) -> list[list[float]]:
+    """Embed questions with the vector store's embeddings in one call."""
+    return await vector_store.embeddings.aembed_documents(questions)
+
+
+async def retrieve_batch(
+    vector_store: VectorStore,
+    questions: list[str],
+    k: int = RETRIEVAL_K,
+    query_embeddings: list[list[float]] | None = None,
+) -> dict[str, list[Document]]:
+    """Retrieve the top-k documents for every question in one pass.
+
+    All questions are embedded with a single embed_documents call (split only
+    by the embedding client's own request size limit) and searched together,
+    instead of one embedding request and one search per question.
+    ``query_embeddings`` may supply embeddings of the deduplicated questions
+    computed earlier.
+    """
+    scored = await retrieve_batch_with_scores(
+        vector_store, questions, k, query_embeddings, with_scores=False
+    )
+    return {
+        question: [doc for doc, _ in results] for question, results in scored.items()
+    }
+
+
+async def retrieve_batch_with_scores(
+    vector_store: VectorStore,
+    questions: list[str],
+    k: int = RETRIEVAL_K,
+    query_embeddings: list[list[float]] | None = None,
+    with_scores: bool = True,
+) -> dict[str, list[tuple[Document, float | None]]]:
+    """Like retrieve_batch, but pair each document with its cosine similarity.
+
+    See _search_by_vectors_with_scores for when scores are None. Hybrid
+    stores fuse BM25 and vector results (see _retrieve_hybrid).
+    """
+    unique_questions = list(dict.fromkeys(questions))
+    if not unique_questions:
+        return {}
+    if isinstance(vector_store, HybridVectorStore):
+        return await _retrieve_hybrid(
+            vector_store, unique_questions, k, query_embeddings, with_scores
+        )
+    if query_embeddings is None:
+        query_embeddings = await embed_questions(vector_store, unique_questions)
+    results = await asyncio.to_thread(
+        _search_by_vectors_with_scores,
+        vector_store,
+        query_embeddings,
+        k,
+        with_scores,
+    )
+    return dict(zip(unique_questions, results, strict=True))
+
+
+async def _retrieve_hybrid(
+    vector_store: HybridVectorStore,
+    questions: list[str],
+    k: int,
+    query_embeddings: list[list[float]] | None,
+    with_scores: bool,
+) -> dict[str, list[tuple[Document, float | None]]]:
+    """Retrieve with BM25 and, unless lexical-only, vector search fused by RRF.
+
+    Documents found by vector search keep their cosine similarity; documents
+    only BM25 found have no comparable score and get None.
+    """
+    lexical = await asyncio.to_thread(vector_store.lexical.search_many, questions, k)
+    if vector_store.dense is None:
+        return {
+            question: [(doc, None) for doc, _ in results]
+            for question, results in zip(questions, lexical, strict=True)
+        }
+    dense = await retrieve_batch_with_scores(
+        vector_store.dense, questions, k, query_embeddings, with_scores
+    )
+    fused = {}
+    for question, lexical_results in zip(questions, lexical, strict=True):
+        scores = {document_key(doc): score for doc, score in dense[question]}
+        docs = vector_store.fuse(
+            [doc for doc, _ in dense[question]],
+            [doc for doc, _ in lexical_results],
+            k,
+        )
+        fused[question] = [(doc, scores.get(document_key(doc))) for doc in docs]
+    return fused
+
+
+def _trim_adaptive(
+    scored: dict[str, list[tuple[Document, float | None]]],
+) -> dict[str, list[tuple[Document, float | None]]]:
+    """Keep a per-question number of results chosen with choose_k."""
+    count_tokens = get_token_counter(LLM_MODEL)
+    trimmed = {}
+    for question, results in scored.items():
+        if any(score is None for _, score in results):
+            # No scores to adapt to.
+            k = RETRIEVAL_K
+        else:
+            k = choose_k(
+                [score for _, score in results],
+                min_k=RETRIEVAL_MIN_K,
+                max_k=RETRIEVAL_MAX_K,
+                gap_fraction=RETRIEVAL_GAP_FRACTION,
+                cumulative=RETRIEVAL_CUMULATIVE_SCORE,
+                token_counts=[count_tokens(doc.page_content) for doc, _ in results],
+                max_tokens=CONTEXT_MAX_TOKENS,
+            )
+        logger.debug(f"Adaptive retrieval kept {k} of {len(results)}: {question!r}")
+        trimmed[question] = results[:k]
+    if trimmed:
+        ks = [len(results) for results in trimmed.values()]
+        logger.info(
+            f"Adaptive retrieval k per question: {ks} "
+            f"(mean {sum(ks) / len(ks):.1f}, max {RETRIEVAL_MAX_K})"
+        )
+    return trimmed
+
+
+def is_relevant(results: list[tuple[Document, float | None]], min_score: float) -> bool:
+    """Return whether any retrieved document clears the relevance floor.
+
+    Results without scores are always treated as relevant.
+    """
+    if any(score is None for _, score in results):
+        return True
+    return any(score >= min_score for _, score in results)
+
+
+async def answer_questions_batched(
+    vector_store: VectorStore,
+    questions: list[str],
+    llm=None,
+    max_concurrency: int | None = None,
+    base_url: str | None = None,
+    query_embeddings: list[list[float]] | None = None,
+    on_answer: Callable[[str, str], None] | None = None,
+    on_token: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Answer questions with batched retrieval ahead of generation.
+
+    Retrieval for the whole list runs through retrieve_batch before any LLM
+    call starts; generation then proceeds as in answer_questions, including
+    ``on_answer`` and ``on_token`` callbacks. With ``RETRIEVAL_MIN_SCORE``
+    set, questions whose retrieved chunks all score below it get
+    ``NOT_FOUND_ANSWER`` without an LLM call. With ``QA_PACK_MAX_QUESTIONS``
+    above 1 and no ``on_token``, questions sharing context are answered
+    together (see answer_questions_packed).
+    """
+    scored = await retrieve_batch_with_scores(
+        vector_store,
+        questions,
+        k=RETRIEVAL_MAX_K or RETRIEVAL_K,
+        query_embeddings=query_embeddings,
+        with_scores=RETRIEVAL_MIN_SCORE > 0 or RETRIEVAL_MAX_K > 0,
+    )
+    if RETRIEVAL_MAX_K > 0:
+        scored = _trim_adaptive(scored)
+    answers: dict[str, str] = {}
+    if RETRIEVAL_MIN_SCORE > 0:
+        for question, results in scored.items():
+            if not is_relevant(results, RETRIEVAL_MIN_SCORE):
+                answers[question] = NOT_FOUND_ANSWER
+                if on_answer:
+                    on_answer(question, NOT_FOUND_ANSWER)
+        if answers:
+            logger.info(
+                f"Skipped the LLM for {len(answers)} question(s) with no chunk "
+                f"scoring at least {RETRIEVAL_MIN_SCORE}"
+            )
+    contexts = {
+        question: [doc for doc, _ in results]
+        for question, results in scored.items()
+        if question not in answers
+    }
+
+    if contexts:
+        llm = llm or create_chat_model(base_url)
+        chain = RunnableLambda(
+            lambda question: {
+                "context": _format_docs(contexts[question]),
+                "question": question,
+            }
+        ) | create_answer_chain(llm)
+        if QA_PACK_MAX_QUESTIONS > 1 and on_token is None:
+            answers.update(
+                await answer_questions_packed(
+                    chain, contexts, llm, max_concurrency, on_answer
+                )
+            )
+        else:
+            answers.update(
+                await answer_questions(
+                    chain, list(contexts), max_concurrency, on_answer, on_token
+                )
+            )
+    return {question: answers[question] for question in scored}
+
+
+async def answer_questions_packed(
+    rag_chain,
+    contexts: dict[str, list[Document]],
+    llm,
+    max_concurrency: int | None = None,
+    on_answer: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Answer questions that share retrieved context in one LLM call per group.
+
+    Questions are grouped with group_by_context (up to
+    ``QA_PACK_MAX_QUESTIONS`` per group within ``QA_PACK_MAX_CONTEXT_TOKENS``)
+    and each group's distinct chunks are sent once with all of its questions,
+    asking for a JSON list of answers. Single-question groups, and groups
+    whose reply fails validation, are answered one by one with ``rag_chain``.
+    At most ``max_concurrency`` LLM calls run at once. The result is keyed and
+    ordered by the questions in ``contexts``.
+    """
+    limit = QA_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+    if limit < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got: {limit}")
+
+    semaphore = asyncio.Semaphore(limit)
+    packed_chain = create_packed_answer_chain(llm)
+    groups = group_by_context(
+        contexts,
+        max_questions=QA_PACK_MAX_QUESTIONS,
+        max_context_tokens=QA_PACK_MAX_CONTEXT_TOKENS,
+        min_overlap=QA_PACK_MIN_OVERLAP,
+    )
+    logger.info(f"Packed {len(contexts)} questions into {len(groups)} LLM calls")
+
+    async def _answer_one(question: str) -> dict[str, str]:
+        async with semaphore:
+            return await answer_questions(rag_chain, [question], 1, on_answer)
+
+    async def _answer_group(group: list[str]) -> dict[str, str]:
+        if len(group) == 1:
+            return await _answer_one(group[0])
+        async with semaphore:
+            try:
+                reply = await packed_chain.ainvoke(
+                    {
+                        "context": _format_docs(
+                            merge_contexts([contexts[q] for q in group]),
+                            max_tokens=QA_PACK_MAX_CONTEXT_TOKENS,
+                        ),
+                        "questions": format_numbered_questions(group),
+                    }
+                )
+                answers = parse_packed_answers(reply, len(group))
+            except Exception:
+                logger.exception(f"Failed to answer {len(group)} packed questions")
+                answers = None
+        if answers is None:
+            logger.warning(
+                f"Packed answer for {len(group)} questions was invalid; "
+                "answering them one by one"
+            )
+            results = await asyncio.gather(*(_answer_one(q) for q in group))
+            return {q: a for result in results for q, a in result.items()}
+        if on_answer:
+            for question, answer in zip(group, answers, strict=True):
+                on_answer(question, answer)
+        return dict(zip(group, answers, strict=True))
+
+    answers: dict[str, str] = {}
+    for result in await asyncio.gather(*(_answer_group(g) for g in groups)):
+        answers.update(result)
+    return {question: answers[question] for question in contexts}
+
+
+async def answer_questions_with_reuse(
+    vector_store: VectorStore,
+    questions: list[str],
+    document_hash: str,
+    llm=None,
+    max_concurrency: int | None = None,
+    base_url: str | None = None,
+    on_answer: Callable[[str, str], None] | None = None,
+    on_token: Callable[[str, str], None] | None = None,
+    on_reused: Callable[[str, str], None] | None = None,
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Answer questions, reusing answers to paraphrases asked before.
+
+    The question embeddings used for retrieval are first matched against
+    earlier questions about the same document in the semantic answer index;
+    questions above ``SEMANTIC_REUSE_THRESHOLD`` get the stored answer without
+    retrieval or an LLM call. Returns the answers and, for each reused answer,
+    the earlier question it came from. ``on_answer`` is called for reused and
+    generated answers alike; ``on_token`` only streams generated ones.
+    ``on_reused`` is called with the question and the earlier question just
+    before ``on_answer`` for each reused answer.
+    """
+    index = get_semantic_answer_index()
+    unique_questions = list(dict.fromkeys(questions))
+    # Lexical-only stores have no embeddings to match paraphrases with.
+    if index is None or not unique_questions or vector_store.embeddings is None:
+        answers = await answer_questions_batched(
+            vector_store,
+            questions,
+            llm,
+            max_concurrency,
+            base_url,
+            on_answer=on_answer,
+            on_token=on_token,
+        )
+        return answers, {}
+
+    query_embeddings = await embed_questions(vector_store, unique_questions)
+    matches = index.lookup(document_hash, query_embeddings)
+    answers = {
+        question: match.answer
+        for question, match in zip(unique_questions, matches, strict=True)
+        if match is not None
+    }
+    reused = {
+        question: match.question
+        for question, match in zip(unique_questions, matches, strict=True)
+        if match is not None
+    }
+    remaining = [
+        (question, embedding)
+        for question, embedding, match in zip(
+            unique_questions, query_embeddings, matches, strict=True
+        )
+        if match is None
+    ]
+    if reused:
+        logger.info(f"Reused {len(reused)} answer(s) for paraphrased questions")
+        for question, earlier_question in reused.items():
+            if on_reused:
+                on_reused(question, earlier_question)
+            if on_answer:
+                on_answer(question, answers[question])
+
+    if remaining:
+        new_answers = await answer_questions_batched(
+            vector_store,
+            [question for question, _ in remaining],
+            llm,
+            max_concurrency,
+            base_url,
+            query_embeddings=[embedding for _, embedding in remaining],
+            on_answer=on_answer,
+            on_token=on_token,
+        )
+        answered = [
+            (question, embedding)
+            for question, embedding in remaining
+            if not new_answers[question].startswith(ANSWER_ERROR_PREFIX)
+        ]
+        index.add(
+            document_hash,
+            [question for question, _ in answered],
+            [embedding for _, embedding in answered],
+            [new_answers[question] for question, _ in answered],
+        )
+        answers.update(new_answers)
+    return {question: answers[question] for question in unique_questions}, reused
+
+
+def _answer_cache_key(document_hash: str, question: str, base_url: str | None) -> str:
+    base_url = base_url or OPENAI_BASE_URL
+    model = f"{LLM_MODEL}@{base_url}" if base_url else LLM_MODEL
+    return answer_cache_key(
+        document_hash,
+        question,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        k=(
+            f"{RETRIEVAL_MIN_K}-{RETRIEVAL_MAX_K}"
+            if RETRIEVAL_MAX_K > 0
+            else RETRIEVAL_K
+        ),
+        # Not-found answers depend on the relevance floor, and all answers on
+        # what retrieval found.
+        prompt_version=(
+            f"{QA_PROMPT_VERSION}@{RETRIEVAL_MIN_SCORE}"
+            if RETRIEVAL_MIN_SCORE > 0
+            else QA_PROMPT_VERSION
+        )
+        + ("" if RETRIEVAL_MODE == "vector" else f"/{RETRIEVAL_MODE}"),
+    )
+
+
+async def lookup_cached_answers(
+    document_hash: str, questions: list[str], base_url: str | None = None
+) -> dict[str, str]:
+    """Return cached answers for the questions about a document.
+
+    Questions match after normalizing case, whitespace and trailing
+    punctuation, for the configured model, temperature, k and prompt version.
+    Returns an empty dict when the answer cache is disabled.
+    """
+    cache = get_answer_cache()
+    if cache is None or not questions:
+        return {}
+    keys = {q: _answer_cache_key(document_hash, q, base_url) for q in questions}
+    found = await asyncio.to_thread(cache.get_many, keys.values())
+    return {q: found[key] for q, key in keys.items() if key in found}
+
+
+async def store_answers(
+    document_hash: str, answers: dict[str, str], base_url: str | None = None
+) -> None:
+    """Store answers about a document in the answer cache, skipping errors."""
+    cache = get_answer_cache()
+    if cache is None:
+        return
+    items = {
+        _answer_cache_key(document_hash, question, base_url): answer
+        for question, answer in answers.items()
+        if not answer.startswith(ANSWER_ERROR_PREFIX)
+    }
+    await asyncio.to_thread(cache.put_many, document_hash, items)
+
+
 async def answer_questions(
     rag_chain,
     questions: list[str],
+    max_concurrency: int | None = None,
+    on_answer: Callable[[str, str], None] | None = None,
+    on_token: Callable[[str, str], None] | None = None,
 ) -> dict[str, str]:
-    """Answer a list of questions using the RAG chain."""
-    answers = {}
-    for question in questions:
-        answer = await rag_chain.ainvoke(question)
-        answers[question] = answer
-    return answers
+    """Answer a list of questions using the RAG chain.
+
+    Questions are answered concurrently with at most ``max_concurrency`` chain
+    calls in flight (defaults to ``QA_MAX_CONCURRENCY``). The result is keyed
+    and ordered by the input questions. A failure on one question is logged and
+    reported as that question's answer without affecting the rest of the batch.
+    ``on_answer`` is called with (question, answer) as each answer completes.
+    With ``on_token``, answers are generated with ``astream`` and it is called
+    with (question, text) for every streamed chunk.
+    """
+    limit = QA_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+    if limit < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got: {limit}")
+
+    semaphore = asyncio.Semaphore(limit)
+    unique_questions = list(dict.fromkeys(questions))
+
+    async def _answer(question: str) -> str:
+        async with semaphore:
+            try:
+                if on_token is None:
+                    answer = await rag_chain.ainvoke(question)
+                else:
+                    parts = []
+                    async for chunk in rag_chain.astream(question):
+                        if chunk:
+                            parts.append(chunk)
+                            on_token(question, chunk)
+                    answer = "".join(parts)
+            except Exception as e:
+                logger.exception(f"Failed to answer question: {question!r}")
+                answer = f"{ANSWER_ERROR_PREFIX} ({type(e).__name__}: {e})"
+        if on_answer:
+            on_answer(question, answer)
+        return answer
+
+    results = await asyncio.gather(*(_answer(q) for q in unique_questions))
+    return dict(zip(unique_questions, results, strict=True))
@@ -0,0 +1,421 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+
+import httpx
+
+from app.context import CHARS_PER_TOKEN
+
+# How long a caller waits before retrying when every concurrency slot is taken.
+CONCURRENCY_POLL_SECONDS = 0.05
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Estimate the tokens an OpenAI request counts against the TPM limit.
+
+    Counts token-id inputs exactly, text at ``CHARS_PER_TOKEN`` characters a
+    token, and reserves ``max_tokens`` (or ``max_completion_tokens``) for the
+    completion, which is how the provider charges requests up front.
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+    except (httpx.RequestNotRead, ValueError):
+        return 1
+    if not isinstance(body, dict):
+        return 1
+
+    chars = 0
+    tokens = 0
+    inputs = body.get("input", [])
+    for item in inputs if isinstance(inputs, list) else [inputs]:
+        if isinstance(item, str):
+            chars += len(item)
+        elif isinstance(item, list):
+            tokens += len(item)
+        elif isinstance(item, int):
+            tokens += 1
+    for message in body.get("messages", []):
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            chars += len(content)
+    tokens += body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return max(1, tokens + chars // CHARS_PER_TOKEN)
+
+
+def _retry_after(headers: httpx.Headers) -> float | None:
+    for name, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) / scale)
+            except ValueError:
+                continue
+    return None
+
+
+class TokenBucket:
+    """Refills at ``rate_per_minute`` units a minute, holding up to a minute's worth.
+
+    Not thread-safe on its own; AdaptiveRateLimiter serializes access.
+    """
+
+    def __init__(self, rate_per_minute: float, now: float):
+        if rate_per_minute <= 0:
+            raise ValueError(
+                f"rate_per_minute must be positive, got: {rate_per_minute}"
+            )
+        self.capacity = float(rate_per_minute)
+        self.level = self.capacity
+        self._rate = rate_per_minute / 60
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self.level = min(self.capacity, self.level + elapsed * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be taken now)."""
+        self._refill(now)
+        # A request larger than the bucket only has to wait for a full bucket.
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self._rate
+
+    def take(self, amount: float) -> None:
+        # Oversized requests leave the bucket in debt, delaying later ones.
+        self.level -= amount
+
+    def cap(self, remaining: float, now: float) -> None:
+        """Lower the level to what the provider reports is left."""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class AdaptiveRateLimiter:
+    """Shared admission control for outbound model API calls.
+
+    A request is admitted when the request and token buckets (for the RPM and
+    TPM limits, either disabled with 0) have room and fewer than
+    ``concurrency`` requests are in flight. Concurrency adapts AIMD-style: it
+    halves on the first 429 of an episode and grows by one after a window of
+    successes, up to ``max_concurrency``. A ``retry-after`` pauses every caller
+    rather than only the one that was throttled, and the provider's
+    ``x-ratelimit-remaining-*`` headers cap the buckets, so limits shared
+    with other workers are respected too. Thread-safe, and usable from sync
+    and async code: admission returns a wait time instead of blocking.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 64,
+        min_concurrency: int = 1,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(
+                f"need 1 <= min_concurrency <= max_concurrency, got: "
+                f"{min_concurrency} and {max_concurrency}"
+            )
+        now = clock()
+        self._requests = (
+            TokenBucket(requests_per_minute, now) if requests_per_minute else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, now) if tokens_per_minute else None
+        )
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.retries = 0
+        self.waited_seconds = 0.0
+        self._clock = clock
+        self._paused_until = 0.0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> float:
+        """Admit a request now and return 0, or return how long to wait first.
+
+        An admitted request holds a concurrency slot until ``release``.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._paused_until > now:
+                return self._paused_until - now
+            if self.in_flight >= self.concurrency:
+                return CONCURRENCY_POLL_SECONDS
+            needs = [
+                (bucket, amount)
+                for bucket, amount in ((self._requests, 1), (self._tokens, tokens))
+                if bucket is not None
+            ]
+            wait = max(
+                (bucket.wait_time(amount, now) for bucket, amount in needs), default=0.0
+            )
+            if wait > 0:
+                return wait
+            for bucket, amount in needs:
+                bucket.take(amount)
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_waited(self, seconds: float) -> None:
+        with self._lock:
+            self.waited_seconds += seconds
+
+    def record_success(self, headers: httpx.Headers) -> None:
+        """Grow concurrency after enough successes and sync to provider headers."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self._cap_buckets(headers)
+
+    def record_rate_limited(self, headers: httpx.Headers, attempt: int) -> float:
+        """Back off after a 429 and return how long this request should wait.
+
+        The delay is the server's ``retry-after`` (if any) plus full jitter
+        over an exponential backoff capped at ``max_delay``. ``attempt``
+        counts the earlier 429s of the same request; it is retried while
+        that is below ``max_retries``.
+        """
+        retry_after = _retry_after(headers)
+        with self._lock:
+            now = self._clock()
+            self.rate_limited += 1
+            if attempt < self.max_retries:
+                self.retries += 1
+            if now >= self._paused_until:
+                # Only the first 429 of an episode shrinks the window.
+                self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+                self._successes = 0
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self._cap_buckets(headers)
+        return (retry_after or 0.0) + self._backoff(attempt)
+
+    def record_failed(self, attempt: int) -> float:
+        """Count a 5xx or connection error and return how long to wait.
+
+        Unlike a 429 it says nothing about load, so concurrency is left
+        alone and only the request itself backs off. ``attempt`` is shared
+        with ``record_rate_limited``.
+        """
+        with self._lock:
+            self.failed += 1
+            if attempt < self.max_retries:
+                self.retries += 1
+        return self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter over an exponential backoff capped at ``max_delay``."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _cap_buckets(self, headers: httpx.Headers) -> None:
+        now = self._clock()
+        for bucket, name in (
+            (self._requests, "x-ratelimit-remaining-requests"),
+            (self._tokens, "x-ratelimit-remaining-tokens"),
+        ):
+            value = headers.get(name)
+            if bucket is not None and value:
+                try:
+                    bucket.cap(float(value), now)
+                except ValueError:
+                    pass
+
+    def stats(self) -> dict[str, int | float]:
+        """Return the current concurrency window and throttling counters."""
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "admitted": self.admitted,
+                "rate_limited": self.rate_limited,
+                "failed": self.failed,
+                "retries": self.retries,
+                "waited_seconds": self.waited_seconds,
+            }
+
+
+def _release_once(limiter: AdaptiveRateLimiter) -> Callable[[], None]:
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            limiter.release()
+
+    return release
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Sends requests through an AdaptiveRateLimiter, retrying failures.
+
+    429s, 5xx responses and connection errors are retried with backoff up to
+    the limiter's ``max_retries``, taking over from the OpenAI SDK's retries.
+
+    The concurrency slot is held until the response body is closed, so
+    streamed completions count as in flight while they stream.
+    """
+
+    def __init__(self, limiter: AdaptiveRateLimiter, transport: httpx.BaseTransport):
+        self.limiter = limiter
+        self._transport = transport
+
+    def _acquire(self, tokens: int) -> None:
+        while (wait := self.limiter.try_acquire(tokens)) > 0:
+            self.limiter.record_waited(wait)
+            time.sleep(wait)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        while True:
+            self._acquire(tokens)
+            release = _release_once(self.limiter)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError:
+                release()
+                delay = self.limiter.record_failed(attempt)
+                if attempt >= self.limiter.max_retries:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                release()
+                raise
+            if response.status_code == 429:
+                delay = self.limiter.record_rate_limited(response.headers, attempt)
+            elif response.status_code >= 500:
+                delay = self.limiter.record_failed(attempt)
+            else:
+                self.limiter.record_success(response.headers)
+                break
+            if attempt >= self.limiter.max_retries:
+                break
+            response.close()
+            release()
+            attempt += 1
+            time.sleep(delay)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RateLimitedTransport sharing the same limiter."""
+
+    def __init__(
+        self, limiter: AdaptiveRateLimiter, transport: httpx.AsyncBaseTransport
+    ):
+        self.limiter = limiter
+        self._transport = transport
+
+    async def _acquire(self, tokens: int) -> None:
+        while (wait := self.limiter.try_acquire(tokens)) > 0:
+            self.limiter.record_waited(wait)
+            await asyncio.sleep(wait)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            release = _release_once(self.limiter)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                release()
+                delay = self.limiter.record_failed(attempt)
+                if attempt >= self.limiter.max_retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                release()
+                raise
+            if response.status_code == 429:
+                delay = self.limiter.record_rate_limited(response.headers, attempt)
+            elif response.status_code >= 500:
+                delay = self.limiter.record_failed(attempt)
+            else:
+                self.limiter.record_success(response.headers)
+                break
+            if attempt >= self.limiter.max_retries:
+                break
+            await response.aclose()
+            release()
+            attempt += 1
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_AsyncReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,65 @@
+def choose_k(
+    scores: list[float],
+    min_k: int = 2,
+    max_k: int = 12,
+    gap_fraction: float = 0.25,
+    cumulative: float = 0.9,
+    token_counts: list[int] | None = None,
+    max_tokens: int = 0,
+) -> int:
+    """Pick how many of the best-first ``scores`` to keep.
+
+    Two cutoffs are computed and the smaller one wins:
+
+    - elbow: cut at the largest drop between consecutive scores, if that drop
+      is at least ``gap_fraction`` of the spread between the best and the
+      worst candidate;
+    - cumulative: keep the fewest results holding ``cumulative`` of the total
+      score above the worst candidate.
+
+    The result is kept within ``min_k`` and ``max_k``, then reduced (but not
+    below 1) until the kept results' ``token_counts`` fit in ``max_tokens``
+    (0 for no cap).
+    """
+    n = min(len(scores), max_k)
+    if n <= min_k:
+        k = n
+    else:
+        scores = scores[:n]
+        spread = scores[0] - scores[-1]
+        k = n
+        if spread > 0:
+            drops = [(scores[i - 1] - scores[i], i) for i in range(min_k, n)]
+            drop, elbow = max(drops)
+            if drop >= gap_fraction * spread:
+                k = elbow
+            weights = [score - scores[-1] for score in scores]
+            total = sum(weights)
+            running = 0.0
+            for i, weight in enumerate(weights, 1):
+                running += weight
+                if running >= cumulative * total:
+                    k = min(k, i)
+                    break
+        k = max(min_k, k)
+
+    if max_tokens and token_counts:
+        while k > 1 and sum(token_counts[:k]) > max_tokens:
+            k -= 1
+    return k
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], k: int = 60
+) -> list[tuple[str, float]]:
+    """Fuse best-first rankings of keys into one, best first.
+
+    Each key scores ``1 / (k + rank)`` (rank counted from 1) in every ranking
+    it appears in. Ranks, not raw scores, are combined, so BM25 and cosine
+    results need no normalization. Ties keep first-seen order.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
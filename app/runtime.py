@@ -0,0 +1,218 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import httpx
+
+from app.rate_limit import (
+    AdaptiveRateLimiter,
+    AsyncRateLimitedTransport,
+    RateLimitedTransport,
+)
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for CPU-bound ingest stages (parsing, chunking).
+# 0 runs those stages in the thread pool instead.
+INGEST_PROCESS_WORKERS = int(
+    os.getenv("INGEST_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Worker threads for blocking I/O stages (embedding and indexing).
+INGEST_THREAD_WORKERS = int(os.getenv("INGEST_THREAD_WORKERS", "8"))
+
+# Outbound connection pool shared by every OpenAI client in this process.
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "32")
+)
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(
+    os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60")
+)
+
+# Provider limits shared by every outbound model call (0 disables a limit).
+# Limits are per process: divide the account's limits by the worker count.
+OPENAI_RPM_LIMIT = float(os.getenv("OPENAI_RPM_LIMIT", "0"))
+OPENAI_TPM_LIMIT = float(os.getenv("OPENAI_TPM_LIMIT", "0"))
+# Retries of 429s, 5xx responses and connection errors before the error is
+# handed back to the OpenAI client, whose own retries are turned off (see
+# rag_chain._http_client_kwargs).
+OPENAI_RATE_LIMIT_MAX_RETRIES = int(os.getenv("OPENAI_RATE_LIMIT_MAX_RETRIES", "4"))
+OPENAI_BACKOFF_BASE_SECONDS = float(os.getenv("OPENAI_BACKOFF_BASE_SECONDS", "0.5"))
+OPENAI_BACKOFF_MAX_SECONDS = float(os.getenv("OPENAI_BACKOFF_MAX_SECONDS", "30"))
+
+_process_pool: ProcessPoolExecutor | None = None
+_thread_pool: ThreadPoolExecutor | None = None
+_http_clients: tuple[httpx.Client, httpx.AsyncClient] | None = None
+_rate_limiter: AdaptiveRateLimiter | None = None
+
+
+def get_process_pool() -> Executor:
+    """Return the shared executor for CPU-bound work."""
+    global _process_pool
+    if INGEST_PROCESS_WORKERS < 1:
+        return get_thread_pool()
+    if _process_pool is None:
+        # spawn avoids forking a process that already runs client threads.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=INGEST_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Return the shared executor for blocking I/O work."""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=INGEST_THREAD_WORKERS,
+            thread_name_prefix="ingest",
+        )
+    return _thread_pool
+
+
+def shutdown_pools() -> None:
+    """Shut down the shared executors; they are recreated on next use."""
+    global _process_pool, _thread_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=True, cancel_futures=True)
+        _thread_pool = None
+
+
+def open_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """Create the shared sync and async HTTP clients for outbound API calls.
+
+    Both use keep-alive and cap open sockets at ``OPENAI_MAX_CONNECTIONS``,
+    and send every request through one AdaptiveRateLimiter that enforces
+    ``OPENAI_RPM_LIMIT``/``OPENAI_TPM_LIMIT`` and backs off on 429s.
+    Call this once the event loop is running (e.g. at application startup):
+    the async client's connections belong to that loop.
+    """
+    global _http_clients, _rate_limiter
+    if _http_clients is None:
+        limits = httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        _rate_limiter = AdaptiveRateLimiter(
+            requests_per_minute=OPENAI_RPM_LIMIT,
+            tokens_per_minute=OPENAI_TPM_LIMIT,
+            max_concurrency=OPENAI_MAX_CONNECTIONS,
+            max_retries=OPENAI_RATE_LIMIT_MAX_RETRIES,
+            base_delay=OPENAI_BACKOFF_BASE_SECONDS,
+            max_delay=OPENAI_BACKOFF_MAX_SECONDS,
+        )
+        _http_clients = (
+            httpx.Client(
+                transport=RateLimitedTransport(
+                    _rate_limiter, httpx.HTTPTransport(limits=limits)
+                )
+            ),
+            httpx.AsyncClient(
+                transport=AsyncRateLimitedTransport(
+                    _rate_limiter, httpx.AsyncHTTPTransport(limits=limits)
+                )
+            ),
+        )
+        logger.info(
+            f"Opened shared HTTP clients (max {OPENAI_MAX_CONNECTIONS} connections, "
+            f"{OPENAI_MAX_KEEPALIVE_CONNECTIONS} keep-alive, "
+            f"RPM limit {OPENAI_RPM_LIMIT or 'off'}, "
+            f"TPM limit {OPENAI_TPM_LIMIT or 'off'})"
+        )
+    return _http_clients
+
+
+def get_http_clients() -> tuple[httpx.Client, httpx.AsyncClient] | None:
+    """Return the shared HTTP clients, or None if they are not open."""
+    return _http_clients
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter | None:
+    """Return the limiter behind the shared HTTP clients, if they are open."""
+    return _rate_limiter
+
+
+async def close_http_clients() -> None:
+    """Close the shared HTTP clients and their pooled connections."""
+    global _http_clients, _rate_limiter
+    if _http_clients is None:
+        return
+    sync_client, async_client = _http_clients
+    _http_clients = None
+    _rate_limiter = None
+    sync_client.close()
+    await async_client.aclose()
+
+
+async def run_in_thread(func: Callable, *args, **kwargs):
+    """Run a blocking function in the I/O thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_thread_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up from a fixed-interval sleep.
+
+    A responsive loop wakes up on time; blocking work on the loop shows up as
+    lag equal to the time the loop was stuck.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> dict[str, float]:
+        """Return lag statistics in milliseconds over the recent window."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {
+                "samples": 0,
+                "last_ms": 0.0,
+                "mean_ms": 0.0,
+                "p99_ms": 0.0,
+                "max_ms": 0.0,
+            }
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return {
+            "samples": len(samples),
+            "last_ms": self._samples[-1] * 1000,
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": self.max_lag * 1000,
+        }
@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.numpy_store import normalize_rows
+
+
+@dataclass(frozen=True)
+class AnswerMatch:
+    """A previously answered question similar enough to reuse its answer."""
+
+    question: str
+    answer: str
+    similarity: float
+
+
+class _DocumentAnswers:
+    """Normalized question embeddings and answers for one document."""
+
+    def __init__(self):
+        self.matrix: np.ndarray | None = None
+        self.questions: list[str] = []
+        self.answers: list[str] = []
+
+    def add(self, questions: list[str], vectors: np.ndarray, answers: list[str]):
+        self.matrix = (
+            vectors if self.matrix is None else np.vstack([self.matrix, vectors])
+        )
+        self.questions.extend(questions)
+        self.answers.extend(answers)
+
+    def truncate_oldest(self, max_entries: int) -> None:
+        excess = len(self.questions) - max_entries
+        if excess > 0:
+            self.matrix = self.matrix[excess:].copy()
+            del self.questions[:excess]
+            del self.answers[:excess]
+
+
+class SemanticAnswerIndex:
+    """In-memory index of answered questions per document for paraphrase reuse.
+
+    A new question reuses the answer of the most similar earlier question
+    about the same document when their embeddings' cosine similarity is at
+    least ``threshold``. Each document keeps its ``max_entries_per_document``
+    most recent questions, and the least recently used documents are evicted
+    beyond ``max_documents``.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_entries_per_document: int = 1000,
+        max_documents: int = 256,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got: {threshold}")
+        self.threshold = threshold
+        self.max_entries_per_document = max_entries_per_document
+        self.max_documents = max_documents
+        self.hits = 0
+        self.misses = 0
+        self._documents: OrderedDict[str, _DocumentAnswers] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, document_hash: str, embeddings: list[list[float]]
+    ) -> list[AnswerMatch | None]:
+        """Return the best reusable earlier answer for each embedding, if any."""
+        if not embeddings:
+            return []
+        queries = normalize_rows(embeddings)
+        with self._lock:
+            entry = self._documents.get(document_hash)
+            if entry is None or entry.matrix is None:
+                self.misses += len(embeddings)
+                return [None] * len(embeddings)
+            self._documents.move_to_end(document_hash)
+            scores = queries @ entry.matrix.T
+            best = scores.argmax(axis=1)
+            matches = [
+                (
+                    AnswerMatch(entry.questions[i], entry.answers[i], float(row[i]))
+                    if row[i] >= self.threshold
+                    else None
+                )
+                for i, row in zip(best, scores, strict=True)
+            ]
+            hits = sum(match is not None for match in matches)
+            self.hits += hits
+            self.misses += len(matches) - hits
+        return matches
+
+    def add(
+        self,
+        document_hash: str,
+        questions: list[str],
+        embeddings: list[list[float]],
+        answers: list[str],
+    ) -> None:
+        """Remember answered questions for a document."""
+        if not questions:
+            return
+        vectors = normalize_rows(embeddings)
+        with self._lock:
+            entry = self._documents.get(document_hash)
+            if entry is None:
+                entry = self._documents[document_hash] = _DocumentAnswers()
+            self._documents.move_to_end(document_hash)
+            entry.add(questions, vectors, answers)
+            entry.truncate_oldest(self.max_entries_per_document)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def invalidate(self, document_hash: str | None = None) -> None:
+        """Forget one document's answers, or everything if None."""
+        with self._lock:
+            if document_hash is None:
+                self._documents.clear()
+            else:
+                self._documents.pop(document_hash, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entry.questions) for entry in self._documents.values())
+
+    def stats(self) -> dict[str, int | float]:
+        """Return hit/miss counters, hit rate and size."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            documents = len(self._documents)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "documents": documents,
+        }
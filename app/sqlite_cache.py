@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+# SQLite limits the number of bound parameters per statement.
+_MAX_BOUND_KEYS = 500
+
+
+class SQLiteLRUCache:
+    """Base for on-disk caches evicting the least recently used entries.
+
+    Entries live in ``table`` of a SQLite database running in WAL mode, so
+    several worker processes on one host can share the same file. ``schema``
+    creates the table, which needs ``key`` and ``last_used`` columns. Once
+    there are more than ``max_entries`` rows the least recently used are
+    evicted. Counting rows scans the table, so that is done only after every
+    1% of ``max_entries`` inserted by this process, and the cache may run
+    over budget by about that much in between.
+    """
+
+    table: str
+    schema: str
+
+    def __init__(self, path: str | Path, max_entries: int):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got: {max_entries}")
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._evict_interval = max(1, max_entries // 100)
+        self._inserted = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_many(
+        self,
+        keys: Iterable[str],
+        column: str,
+        condition: str = "",
+        params: Sequence[Any] = (),
+    ) -> dict[str, Any]:
+        """Return ``column`` of the rows with the given keys and mark them used.
+
+        ``condition`` is an extra SQL filter (e.g. ``"AND created_at >= ?"``)
+        with its ``params``. Counts hits and misses.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, Any] = {}
+        if not keys:
+            return found
+
+        conn = self._connect()
+        try:
+            for start in range(0, len(keys), _MAX_BOUND_KEYS):
+                batch = keys[start : start + _MAX_BOUND_KEYS]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, {column} FROM {self.table} "
+                    f"WHERE key IN ({placeholders}) {condition}",
+                    [*batch, *params],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                with conn:
+                    conn.executemany(
+                        f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                        ((now, key) for key in found),
+                    )
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _put_many(self, columns: Sequence[str], rows: list[tuple]) -> None:
+        """Insert or replace ``rows`` and evict entries over budget."""
+        if not rows:
+            return
+
+        with self._lock:
+            self._inserted += len(rows)
+            check = self._inserted >= self._evict_interval
+            if check:
+                self._inserted = 0
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    rows,
+                )
+                if check:
+                    self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute(f"SELECT count(*) FROM {self.table}").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            (count,) = conn.execute(f"SELECT count(*) FROM {self.table}").fetchone()
+        finally:
+            conn.close()
+        return count
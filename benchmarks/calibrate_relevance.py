@@ -0,0 +1,115 @@
+"""Report how many LLM calls a RETRIEVAL_MIN_SCORE would have saved.
+
+Indexes a document, retrieves context for a questions file and writes, as
+JSON, every question's best chunk similarity plus, for each candidate
+threshold, the questions that would get the not-found answer without an LLM
+call. Check those questions by hand before picking a threshold: the
+embedding model decides what scores mean.
+
+    uv run python -m benchmarks.calibrate_relevance \\
+        example_input/soc2-type2.pdf example_input/questions.json \\
+        --thresholds 0.2 0.25 0.3 0.35 0.4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app import rag_chain
+from app.document_loader import chunk_documents, load_document, load_questions
+from benchmarks.run_benchmarks import _git_commit
+
+
+def summarize(
+    best_scores: dict[str, float | None], thresholds: list[float]
+) -> list[dict]:
+    """Count the questions each threshold would answer without the LLM."""
+    summaries = []
+    for threshold in thresholds:
+        skipped = [
+            question
+            for question, score in best_scores.items()
+            if score is not None and score < threshold
+        ]
+        summaries.append(
+            {
+                "threshold": threshold,
+                "saved_calls": len(skipped),
+                "saved_fraction": (
+                    len(skipped) / len(best_scores) if best_scores else 0.0
+                ),
+                "skipped_questions": skipped,
+            }
+        )
+    return summaries
+
+
+async def calibrate(
+    document: Path,
+    questions_file: Path,
+    thresholds: list[float],
+    k: int = rag_chain.RETRIEVAL_K,
+    base_url: str | None = None,
+) -> dict:
+    """Score every question against the document and summarize thresholds."""
+    chunks = chunk_documents(load_document(str(document)))
+    questions = list(dict.fromkeys(load_questions(str(questions_file))))
+    vector_store = await asyncio.to_thread(
+        rag_chain.create_vector_store, chunks, base_url=base_url
+    )
+    try:
+        scored = await rag_chain.retrieve_batch_with_scores(
+            vector_store, questions, k=k
+        )
+    finally:
+        vector_store.delete_collection()
+
+    best_scores = {
+        question: max(
+            (score for _, score in results if score is not None), default=None
+        )
+        for question, results in scored.items()
+    }
+    return {
+        "git_commit": _git_commit(),
+        "timestamp": time.time(),
+        "document": str(document),
+        "chunks": len(chunks),
+        "k": k,
+        "best_scores": dict(
+            sorted(best_scores.items(), key=lambda item: item[1] or 0.0)
+        ),
+        "thresholds": summarize(best_scores, thresholds),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("document", type=Path)
+    parser.add_argument("questions_file", type=Path)
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5],
+    )
+    parser.add_argument("--k", type=int, default=rag_chain.RETRIEVAL_K)
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL")
+    parser.add_argument("--output", type=Path, help="write JSON here, not stdout")
+    return vars(parser.parse_args(argv))
+
+
+def main(argv: list[str] | None = None) -> None:
+    config = parse_args(argv)
+    output = config.pop("output")
+    report = json.dumps(asyncio.run(calibrate(**config)), indent=2)
+    if output:
+        output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _bucket(token: str, size: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % size, 1.0 if value & (1 << 63) else -1.0
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words embeddings with configurable injected latency.
+
+    Texts sharing words get similar vectors, so retrieval over them behaves
+    plausibly. Each call sleeps ``latency + latency_per_text * len(texts)``.
+    """
+
+    def __init__(
+        self,
+        size: int = 256,
+        latency: float = 0.0,
+        latency_per_text: float = 0.0,
+    ):
+        self.size = size
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+        self.calls = 0
+        self.texts_embedded = 0
+        self._lock = threading.Lock()
+
+    def _delay(self, count: int) -> float:
+        with self._lock:
+            self.calls += 1
+            self.texts_embedded += count
+        return self.latency + self.latency_per_text * count
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.size
+        for token in _TOKEN_RE.findall(text.lower()):
+            index, sign = _bucket(token, self.size)
+            vector[index] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        delay = self._delay(len(texts))
+        if delay:
+            time.sleep(delay)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        delay = self._delay(len(texts))
+        if delay:
+            await asyncio.sleep(delay)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers from the prompt with simulated generation time.
+
+    The answer is the first ``answer_tokens`` words of the prompt's context
+    section. A call takes ``first_token_latency`` plus ``answer_tokens /
+    tokens_per_second`` seconds (no generation delay when the rate is 0), and
+    streaming emits one word at that rate.
+    """
+
+    first_token_latency: float = 0.0
+    tokens_per_second: float = 0.0
+    answer_tokens: int = 30
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer_words(self, messages: list[BaseMessage]) -> list[str]:
+        prompt = str(messages[-1].content)
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0]
+        words = context.split() or prompt.split()
+        return words[: self.answer_tokens]
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _result(self, words: list[str]) -> ChatResult:
+        message = AIMessage(
+            content=" ".join(words),
+            usage_metadata={
+                "input_tokens": 0,
+                "output_tokens": len(words),
+                "total_tokens": len(words),
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        words = self._answer_words(messages)
+        time.sleep(self.first_token_latency + self._token_delay() * len(words))
+        return self._result(words)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        words = self._answer_words(messages)
+        await asyncio.sleep(self.first_token_latency + self._token_delay() * len(words))
+        return self._result(words)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        time.sleep(self.first_token_latency)
+        for i, word in enumerate(self._answer_words(messages)):
+            time.sleep(self._token_delay())
+            token = word if i == 0 else f" {word}"
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        await asyncio.sleep(self.first_token_latency)
+        for i, word in enumerate(self._answer_words(messages)):
+            await asyncio.sleep(self._token_delay())
+            token = word if i == 0 else f" {word}"
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
@@ -0,0 +1,287 @@
+"""Local OpenAI-compatible stub server for load and latency testing.
+
+Implements the embeddings and chat-completions endpoints that langchain_openai
+calls, with configurable latency distributions, 429 rate limiting, streaming
+token rate and error injection. Point the app at it with OPENAI_BASE_URL:
+
+    uv run python -m benchmarks.openai_stub --port 8100 --latency lognormal:0.4:0.6
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=stub \\
+        uv run uvicorn app.main:app --port 8008
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fakes import FakeEmbeddings
+
+
+@dataclass
+class LatencyModel:
+    """Samples per-request latency in seconds.
+
+    ``spec`` is one of ``constant:S``, ``uniform:LOW:HIGH`` or
+    ``lognormal:MEDIAN:SIGMA``. With probability ``tail_probability`` the
+    sample is multiplied by ``tail_multiplier`` to reproduce slow outliers.
+    """
+
+    spec: str = "constant:0"
+    tail_probability: float = 0.0
+    tail_multiplier: float = 10.0
+
+    def __post_init__(self):
+        kind, *params = self.spec.split(":")
+        self._kind = kind
+        self._params = [float(p) for p in params]
+        expected = {"constant": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(self._params):
+            raise ValueError(f"Invalid latency spec: {self.spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self._kind == "constant":
+            value = self._params[0]
+        elif self._kind == "uniform":
+            value = rng.uniform(*self._params)
+        else:
+            median, sigma = self._params
+            value = median * rng.lognormvariate(0, sigma)
+        if self.tail_probability and rng.random() < self.tail_probability:
+            value *= self.tail_multiplier
+        return value
+
+
+@dataclass
+class StubConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    tokens_per_second: float = 0.0
+    answer_tokens: int = 40
+    embedding_dimensions: int = 1536
+    requests_per_minute: int = 0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    seed: int | None = None
+
+
+class _RequestWindow:
+    """Sliding one-minute window of accepted request times."""
+
+    def __init__(self):
+        self._times: list[float] = []
+        self._lock = threading.Lock()
+
+    def try_acquire(self, limit: int) -> float | None:
+        """Record a request; return seconds to wait instead if over the limit."""
+        now = time.monotonic()
+        with self._lock:
+            self._times = [t for t in self._times if now - t < 60]
+            if len(self._times) >= limit:
+                return 60 - (now - self._times[0])
+            self._times.append(now)
+        return None
+
+
+def _error(status: int, message: str, kind: str, headers: dict | None = None):
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": kind, "code": kind}},
+        headers=headers,
+    )
+
+
+def create_stub_app(config: StubConfig) -> FastAPI:
+    """Create the stub FastAPI app for the given behaviour."""
+    app = FastAPI(title="OpenAI stub")
+    rng = random.Random(config.seed)
+    window = _RequestWindow()
+    embedder = FakeEmbeddings(size=config.embedding_dimensions)
+    stats = {"requests": 0, "rate_limited": 0, "errors": 0, "tokens_streamed": 0}
+    app.state.stats = stats
+
+    def _injected_failure():
+        stats["requests"] += 1
+        if config.requests_per_minute:
+            wait = window.try_acquire(config.requests_per_minute)
+            if wait is not None:
+                stats["rate_limited"] += 1
+                return _error(
+                    429,
+                    "Rate limit reached for requests",
+                    "rate_limit_exceeded",
+                    {"retry-after": f"{max(wait, 0.001):.3f}"},
+                )
+        if config.rate_limit_rate and rng.random() < config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return _error(
+                429,
+                "Rate limit reached for requests",
+                "rate_limit_exceeded",
+                {"retry-after": f"{config.retry_after:.3f}"},
+            )
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return _error(500, "The server had an error", "server_error")
+        return None
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return stats
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        if (failure := _injected_failure()) is not None:
+            return failure
+        body = await request.json()
+        inputs = body["input"]
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        # Token id arrays (sent when langchain checks context length) are
+        # embedded by their ids, which is still deterministic.
+        texts = [
+            text if isinstance(text, str) else " ".join(map(str, text))
+            for text in inputs
+        ]
+        await asyncio.sleep(config.latency.sample(rng))
+        embedder.size = int(body.get("dimensions") or config.embedding_dimensions)
+        vectors = await embedder.aembed_documents(texts)
+        tokens = sum(len(text.split()) for text in texts)
+        return {
+            "object": "list",
+            "model": body.get("model", "stub-embedding"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": vector}
+                for i, vector in enumerate(vectors)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        if (failure := _injected_failure()) is not None:
+            return failure
+        body = await request.json()
+        prompt = str(body["messages"][-1].get("content", ""))
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0]
+        words = (context.split() or prompt.split())[: config.answer_tokens]
+        model = body.get("model", "stub-chat")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(words),
+            "total_tokens": len(prompt.split()) + len(words),
+        }
+        token_delay = (
+            1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        )
+        first_token_latency = config.latency.sample(rng)
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_latency + token_delay * len(words))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def _chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def _stream():
+            await asyncio.sleep(first_token_latency)
+            yield _chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                await asyncio.sleep(token_delay)
+                stats["tokens_streamed"] += 1
+                yield _chunk({"content": word if i == 0 else f" {word}"})
+            yield _chunk({}, finish_reason="stop")
+            if include_usage:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument(
+        "--latency",
+        default="constant:0.2",
+        help="constant:S | uniform:LOW:HIGH | lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument("--tail-probability", type=float, default=0.0)
+    parser.add_argument("--tail-multiplier", type=float, default=10.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--answer-tokens", type=int, default=40)
+    parser.add_argument("--embedding-dimensions", type=int, default=1536)
+    parser.add_argument(
+        "--rpm", type=int, default=0, help="requests/minute before 429s (0 = off)"
+    )
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0, help="random 429 probability"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    args = parse_args(argv)
+    config = StubConfig(
+        latency=LatencyModel(args.latency, args.tail_probability, args.tail_multiplier),
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        embedding_dimensions=args.embedding_dimensions,
+        requests_per_minute=args.rpm,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
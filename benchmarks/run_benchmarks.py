@@ -0,0 +1,234 @@
+"""Offline end-to-end benchmarks for the Q&A pipeline.
+
+Runs parse, chunk, embed, index, retrieve and generate against synthetic PDFs
+using deterministic fake models with injected latency, measures /qa
+throughput through the FastAPI app, and writes machine-readable JSON.
+
+    uv run python -m benchmarks.run_benchmarks --pages 10 100 1000 \\
+        --output bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
+
+from app import rag_chain
+from app.document_loader import chunk_documents, load_pdf
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from benchmarks.synthetic import synthetic_questions, write_synthetic_pdf
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that accumulates the time spent embedding."""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.seconds = 0.0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        start = time.perf_counter()
+        try:
+            return self.embeddings.embed_documents(texts)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
+
+
+def make_fake_models(config: dict) -> tuple[FakeEmbeddings, FakeChatModel]:
+    embeddings = FakeEmbeddings(
+        size=config["embedding_size"],
+        latency=config["embed_latency"],
+        latency_per_text=config["embed_latency_per_text"],
+    )
+    llm = FakeChatModel(
+        first_token_latency=config["llm_first_token_latency"],
+        tokens_per_second=config["llm_tokens_per_second"],
+        answer_tokens=config["answer_tokens"],
+    )
+    return embeddings, llm
+
+
+@contextlib.contextmanager
+def use_fake_models(config: dict):
+    """Make the app's model factories return fake models."""
+    embeddings, llm = make_fake_models(config)
+    with (
+        mock.patch.object(
+            rag_chain, "create_embeddings", lambda base_url=None: embeddings
+        ),
+        mock.patch.object(rag_chain, "create_chat_model", lambda base_url=None: llm),
+    ):
+        yield embeddings, llm
+
+
+@contextlib.contextmanager
+def _timed(stages: dict[str, float], name: str):
+    start = time.perf_counter()
+    yield
+    stages[name] = time.perf_counter() - start
+
+
+async def _run_pipeline(pdf_path: Path, questions: list[str], config: dict) -> dict:
+    stages: dict[str, float] = {}
+    embeddings, llm = make_fake_models(config)
+
+    with _timed(stages, "parse"):
+        documents = load_pdf(str(pdf_path))
+    with _timed(stages, "chunk"):
+        chunks = chunk_documents(documents)
+
+    timed_embeddings = TimedEmbeddings(embeddings)
+    with _timed(stages, "embed_index"):
+        vector_store = rag_chain.create_vector_store(
+            chunks, embeddings=timed_embeddings
+        )
+    stages["embed"] = timed_embeddings.seconds
+    stages["index"] = stages.pop("embed_index") - timed_embeddings.seconds
+
+    with _timed(stages, "retrieve"):
+        contexts = await rag_chain.retrieve_batch(vector_store, questions)
+
+    generate_chain = (
+        RunnableLambda(
+            lambda q: {"context": rag_chain._format_docs(contexts[q]), "question": q}
+        )
+        | rag_chain.QA_PROMPT
+        | llm
+        | StrOutputParser()
+    )
+    with _timed(stages, "generate"):
+        await rag_chain.answer_questions(generate_chain, questions)
+
+    vector_store.delete_collection()
+    return {"pages": len(documents), "chunks": len(chunks), "stages": stages}
+
+
+def _measure_qa_throughput(
+    pdf_path: Path, questions: list[str], config: dict, requests: int
+) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    questions_json = json.dumps(questions).encode()
+    pdf_bytes = pdf_path.read_bytes()
+    latencies = []
+    with use_fake_models(config), TestClient(app) as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.post(
+                "/qa",
+                files={
+                    "questions_file": ("questions.json", questions_json),
+                    "document_file": (pdf_path.name, pdf_bytes),
+                },
+            )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    return {
+        "requests": requests,
+        "requests_per_sec": requests / total if total else 0.0,
+        "mean_latency": total / requests if requests else 0.0,
+    }
+
+
+def run_scenario(pages: int, config: dict) -> dict:
+    """Benchmark one synthetic document size; meant to run in a fresh process."""
+    questions = synthetic_questions(config["questions"])
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = write_synthetic_pdf(Path(tmp) / f"synthetic-{pages}.pdf", pages)
+        result = asyncio.run(_run_pipeline(pdf_path, questions, config))
+        if config["qa_requests"] > 0:
+            result["qa"] = _measure_qa_throughput(
+                pdf_path, questions, config, config["qa_requests"]
+            )
+    result["questions"] = len(questions)
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024**2 if sys.platform == "darwin" else 1024
+    result["peak_rss_mb"] = max_rss / divisor
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(config: dict) -> dict:
+    """Run every configured scenario, each in its own process for clean RSS."""
+    results = []
+    for pages in config["pages"]:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results.append(executor.submit(run_scenario, pages, config).result())
+        print(f"benchmarked {pages} pages", file=sys.stderr)
+    return {
+        "git_commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--qa-requests", type=int, default=3)
+    parser.add_argument("--embedding-size", type=int, default=256)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--embed-latency-per-text", type=float, default=0.0005)
+    parser.add_argument("--llm-first-token-latency", type=float, default=0.3)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--answer-tokens", type=int, default=40)
+    parser.add_argument("--output", type=Path, help="write JSON here, not stdout")
+    return vars(parser.parse_args(argv))
+
+
+def main(argv: list[str] | None = None) -> None:
+    config = parse_args(argv)
+    output = config.pop("output")
+    report = json.dumps(run_benchmarks(config), indent=2)
+    if output:
+        output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
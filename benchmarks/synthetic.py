@@ -0,0 +1,136 @@
+import random
+from pathlib import Path
+
+_SUBJECTS = [
+    "The organization",
+    "Management",
+    "The security team",
+    "The service provider",
+    "Access control procedures",
+    "The incident response plan",
+    "Encryption key management",
+    "The data center operator",
+    "Change management",
+    "The vendor risk program",
+]
+_VERBS = [
+    "reviews",
+    "documents",
+    "monitors",
+    "restricts",
+    "approves",
+    "tests",
+    "encrypts",
+    "maintains",
+    "logs",
+    "evaluates",
+]
+_OBJECTS = [
+    "user access rights on a quarterly basis",
+    "the installation of unauthorized software",
+    "backups of production databases every 24 hours",
+    "firewall rules for non-standard ports",
+    "anti-malware signature updates across endpoints",
+    "physical access to the data centres in Frankfurt and Dublin",
+    "hypervisor accounts after five invalid login attempts",
+    "business continuity plans with authorized stakeholders",
+    "IoT devices in the asset inventory",
+    "private keys provisioned for a unique purpose",
+]
+
+HEADER = "Acme Corp - SOC 2 Type II Report - Confidential"
+FOOTER = "Proprietary and confidential. Do not distribute."
+
+
+def synthetic_sentences(rng: random.Random, count: int) -> list[str]:
+    """Return deterministic compliance-style sentences."""
+    return [
+        f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+        for _ in range(count)
+    ]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(lines: list[str]) -> bytes:
+    ops = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+    ops.extend(f"({_escape(line)}) '" for line in lines)
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_synthetic_pdf(
+    path: str | Path,
+    pages: int,
+    lines_per_page: int = 60,
+    seed: int = 0,
+) -> Path:
+    """Write a text-only PDF of ``pages`` pages and return its path.
+
+    Every page carries the same header and footer plus a page number, like a
+    real audit report. Pages are streamed to disk one at a time, so large
+    documents do not need to fit in memory.
+    """
+    path = Path(path)
+    rng = random.Random(seed)
+    # Object ids: 1 catalog, 2 page tree, 3 font, then (page, content) pairs.
+    page_ids = [4 + 2 * i for i in range(pages)]
+    offsets: dict[int, int] = {}
+
+    with open(path, "wb") as f:
+
+        def _write_object(object_id: int, body: bytes) -> None:
+            offsets[object_id] = f.tell()
+            f.write(f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        _write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        _write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+        _write_object(
+            3,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+            b"/Encoding /WinAnsiEncoding >>",
+        )
+        for number, page_id in enumerate(page_ids, start=1):
+            lines = [HEADER, ""]
+            lines.extend(synthetic_sentences(rng, lines_per_page))
+            lines.extend(["", FOOTER, f"Page {number} of {pages}"])
+            stream = _page_stream(lines)
+            _write_object(
+                page_id,
+                (
+                    f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                    f"/Resources << /Font << /F1 3 0 R >> >> "
+                    f"/Contents {page_id + 1} 0 R >>"
+                ).encode(),
+            )
+            _write_object(
+                page_id + 1,
+                f"<< /Length {len(stream)} >>\nstream\n".encode()
+                + stream
+                + b"\nendstream",
+            )
+
+        xref_offset = f.tell()
+        object_count = 3 + 2 * pages
+        f.write(f"xref\n0 {object_count + 1}\n0000000000 65535 f \n".encode())
+        for object_id in range(1, object_count + 1):
+            f.write(f"{offsets[object_id]:010d} 00000 n \n".encode())
+        f.write(
+            f"trailer\n<< /Size {object_count + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+    return path
+
+
+def synthetic_questions(count: int, seed: int = 1) -> list[str]:
+    """Return deterministic questionnaire-style questions."""
+    rng = random.Random(seed)
+    return [
+        f"Does {rng.choice(_SUBJECTS).lower()} {rng.choice(_VERBS).rstrip('s')} "
+        f"{rng.choice(_OBJECTS)}?"
+        for _ in range(count)
+    ]
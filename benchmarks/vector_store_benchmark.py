@@ -0,0 +1,148 @@
+"""Compare vector store backends on build time, query latency and memory.
+
+Indexes random unit vectors (so embedding cost is excluded) into each backend
+from app.rag_chain, each size and backend in a fresh process, and writes
+machine-readable JSON.
+
+    uv run python -m benchmarks.vector_store_benchmark --chunks 1000 10000 100000
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app import rag_chain
+from benchmarks.run_benchmarks import _git_commit
+
+
+class _IndexedEmbeddings(Embeddings):
+    """Embeds the text ``"<n>"`` as row ``n`` of a fixed random matrix."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.vectors[[int(text) for text in texts]].tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def _rss_peak_mb() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def _rss_mb() -> float:
+    # Current resident set size from /proc where available, else peak RSS.
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024**2
+    except OSError:
+        return _rss_peak_mb()
+
+
+def run_case(backend: str, chunks: int, config: dict) -> dict:
+    """Benchmark one backend at one index size; meant for a fresh process."""
+    rng = np.random.default_rng(0)
+    dimensions = config["dimensions"]
+    queries = config["queries"]
+    vectors = rng.standard_normal((chunks + queries, dimensions), dtype=np.float32)
+    embeddings = _IndexedEmbeddings(vectors)
+    documents = [Document(page_content=str(i)) for i in range(chunks)]
+    query_vectors = vectors[chunks:].tolist()
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    vector_store = rag_chain.create_vector_store(
+        documents, embeddings=embeddings, backend=backend
+    )
+    build_seconds = time.perf_counter() - start
+    rss_after_build = _rss_mb()
+
+    latencies = []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        vector_store.similarity_search_by_vector(vector, k=config["k"])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    rag_chain._search_by_vectors(vector_store, query_vectors, config["k"])
+    batch_seconds = time.perf_counter() - start
+
+    vector_store.delete_collection()
+    latencies.sort()
+    return {
+        "backend": backend,
+        "chunks": chunks,
+        "build_seconds": build_seconds,
+        "query_mean_ms": statistics.fmean(latencies) * 1000,
+        "query_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        "batch_query_seconds": batch_seconds,
+        "index_rss_mb": rss_after_build - rss_before,
+        "peak_rss_mb": _rss_peak_mb(),
+    }
+
+
+def run_benchmarks(config: dict) -> dict:
+    """Run every backend at every size, each in its own process."""
+    results = []
+    for chunks in config["chunks"]:
+        for backend in config["backends"]:
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results.append(
+                    executor.submit(run_case, backend, chunks, config).result()
+                )
+            print(f"benchmarked {backend} with {chunks} chunks", file=sys.stderr)
+    return {
+        "git_commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(rag_chain.VECTOR_STORE_BACKENDS),
+        choices=rag_chain.VECTOR_STORE_BACKENDS,
+    )
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=rag_chain.RETRIEVAL_K)
+    parser.add_argument("--output", type=Path, help="write JSON here, not stdout")
+    return vars(parser.parse_args(argv))
+
+
+def main(argv: list[str] | None = None) -> None:
+    config = parse_args(argv)
+    output = config.pop("output")
+    report = json.dumps(run_benchmarks(config), indent=2)
+    if output:
+        output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
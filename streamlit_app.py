@@ -1,3 +1,5 @@
+import json
+
 import requests
 import streamlit as st
 
@@ -9,7 +11,32 @@ st.markdown(
     "to get answers."
 )
 
-API_URL = "http://localhost:8008/qa"
+API_URL = "http://localhost:8008/qa/stream"
+
+
+def render_answer_stream(response: requests.Response) -> None:
+    """Render NDJSON answer records as they arrive, in completion order."""
+    status = st.empty()
+    for line in response.iter_lines():
+        if not line:
+            continue
+        record = json.loads(line)
+        if record["type"] == "answer":
+            number = record["index"] + 1
+            question = record["question"]
+            status.info(f"Answered Q{number} after {record['elapsed_seconds']:.1f}s")
+            with st.expander(f"Q{number}: {question[:80]}...", expanded=True):
+                st.markdown(f"**Question:** {question}")
+                st.markdown(f"**Answer:** {record['answer']}")
+        elif record["type"] == "summary":
+            status.success(
+                f"Found {record['answered']} answers in "
+                f"{record['total_seconds']:.1f}s "
+                f"(first after {record['first_answer_seconds'] or 0:.1f}s)"
+            )
+        elif record["type"] == "error":
+            status.error(f"Error: {record['detail']}")
+
 
 col1, col2 = st.columns(2)
 
@@ -50,18 +77,13 @@ if st.button(
                     ),
                 ),
             }
-            response = requests.post(API_URL, files=files, timeout=300)
-
-            if response.status_code == 200:
-                answers = response.json()
-                st.success(f"Found {len(answers)} answers!")
-
-                for i, (question, answer) in enumerate(answers.items(), 1):
-                    with st.expander(f"Q{i}: {question[:80]}...", expanded=True):
-                        st.markdown(f"**Question:** {question}")
-                        st.markdown(f"**Answer:** {answer}")
-            else:
-                st.error(f"Error: {response.status_code} - {response.text}")
+            with requests.post(
+                API_URL, files=files, stream=True, timeout=(10, 300)
+            ) as response:
+                if response.status_code == 200:
+                    render_answer_stream(response)
+                else:
+                    st.error(f"Error: {response.status_code} - {response.text}")
 
         except requests.exceptions.ConnectionError:
             st.error(
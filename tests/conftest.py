@@ -3,6 +3,10 @@ from pathlib import Path
 
 import pytest
 from dotenv import load_dotenv
+from fastapi.testclient import TestClient
+
+from app import main
+from benchmarks.run_benchmarks import use_fake_models
 
 # Load .env file
 load_dotenv()
@@ -13,6 +17,16 @@ QUESTIONS_FILE = EXAMPLE_INPUT_DIR / "questions.json"
 PDF_FILE = EXAMPLE_INPUT_DIR / "soc2-type2.pdf"
 CSV_FILE = EXAMPLE_INPUT_DIR / "Sample JSON.xlsx - Sheet1.csv"
 
+# Offline fake models without injected latency, for API-level tests.
+FAKE_MODELS = {
+    "embedding_size": 64,
+    "embed_latency": 0.0,
+    "embed_latency_per_text": 0.0,
+    "llm_first_token_latency": 0.0,
+    "llm_tokens_per_second": 0.0,
+    "answer_tokens": 5,
+}
+
 
 def has_openai_api_key() -> bool:
     """Check if OpenAI API key is available."""
@@ -48,3 +62,17 @@ def pdf_file() -> Path:
 def csv_file() -> Path:
     """Path to example CSV file."""
     return CSV_FILE
+
+
+@pytest.fixture
+def fake_models():
+    """Swap the OpenAI models for fast offline fakes."""
+    with use_fake_models(FAKE_MODELS):
+        yield
+
+
+@pytest.fixture
+def client(fake_models) -> TestClient:
+    """Test client for the app running on fake models."""
+    with TestClient(main.app) as client:
+        yield client
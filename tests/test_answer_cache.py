@@ -0,0 +1,135 @@
+import json
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, rag_chain
+from app.answer_cache import AnswerCache, answer_cache_key, normalize_question
+
+
+def _key(question: str, **overrides) -> str:
+    params = {
+        "document_hash": "doc",
+        "question": question,
+        "model": "gpt-4o-mini",
+        "temperature": 0,
+        "k": 6,
+        "prompt_version": "v1",
+    }
+    params.update(overrides)
+    return answer_cache_key(**params)
+
+
+class TestAnswerCacheKey:
+    def test_question_is_normalized(self):
+        """Test that case, whitespace and trailing punctuation are ignored."""
+        assert normalize_question("  Where are   your data centres?  ") == (
+            "where are your data centres"
+        )
+        assert _key("Where are your data centres?") == _key(
+            "where are your DATA centres"
+        )
+
+    def test_key_depends_on_generation_settings(self):
+        """Test that every part of the generation config changes the key."""
+        base = _key("Q?")
+
+        assert base != _key("Q?", document_hash="other")
+        assert base != _key("Q?", model="gpt-4o")
+        assert base != _key("Q?", temperature=0.7)
+        assert base != _key("Q?", k=4)
+        assert base != _key("Q?", prompt_version="v2")
+
+
+class TestAnswerCache:
+    def test_round_trip_and_hit_rate(self, tmp_path: Path):
+        """Test that stored answers come back and lookups are counted."""
+        cache = AnswerCache(tmp_path / "answers.db")
+
+        cache.put_many("doc", {"k": "Frankfurt and Dublin."})
+
+        assert cache.get_many(["k", "missing"]) == {"k": "Frankfurt and Dublin."}
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+    def test_invalidate_by_document(self, tmp_path: Path):
+        """Test that invalidation removes only the given document's answers."""
+        cache = AnswerCache(tmp_path / "answers.db")
+        cache.put_many("doc-a", {"a1": "x", "a2": "y"})
+        cache.put_many("doc-b", {"b1": "z"})
+
+        assert cache.invalidate("doc-a") == 2
+        assert set(cache.get_many(["a1", "a2", "b1"])) == {"b1"}
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+
+    def test_expired_entries_are_misses(self, tmp_path: Path):
+        """Test that answers older than the TTL are not returned."""
+        cache = AnswerCache(tmp_path / "answers.db", ttl_seconds=0.05)
+        cache.put_many("doc", {"k": "answer"})
+
+        time.sleep(0.1)
+
+        assert cache.get_many(["k"]) == {}
+
+    def test_evicts_least_recently_used(self, tmp_path: Path):
+        """Test that the cache stays within max_entries."""
+        cache = AnswerCache(tmp_path / "answers.db", max_entries=2)
+
+        cache.put_many("doc", {"a": "1"})
+        cache.put_many("doc", {"b": "2"})
+        cache.get_many(["a"])
+        cache.put_many("doc", {"c": "3"})
+
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+    def test_invalid_max_entries_raises_error(self, tmp_path: Path):
+        """Test that a non-positive max_entries is rejected."""
+        with pytest.raises(ValueError, match="max_entries"):
+            AnswerCache(tmp_path / "answers.db", max_entries=0)
+
+
+class TestCachedQaEndpoint:
+    @pytest.fixture
+    def client(self, client: TestClient, tmp_path: Path):
+        cache = AnswerCache(tmp_path / "answers.db")
+        with (
+            mock.patch.object(rag_chain, "get_answer_cache", lambda: cache),
+            mock.patch.object(main, "get_answer_cache", lambda: cache),
+        ):
+            yield client
+
+    @staticmethod
+    def _post_qa(client: TestClient, questions: list[str]):
+        document = [{"content": "Our data centres are in Frankfurt and Dublin."}]
+        return client.post(
+            "/qa",
+            files={
+                "questions_file": ("questions.json", json.dumps(questions)),
+                "document_file": ("document.json", json.dumps(document)),
+            },
+        )
+
+    def test_repeat_questions_skip_ingest_and_generation(self, client: TestClient):
+        """Test that a fully cached questionnaire is answered without ingest."""
+        questions = ["Where are your data centres?"]
+        first = self._post_qa(client, questions)
+
+        with mock.patch.object(main, "_ingest_document") as ingest:
+            second = self._post_qa(client, ["where are your data centres"])
+
+        ingest.assert_not_called()
+        assert second.json() == {
+            "where are your data centres": first.json()[questions[0]]
+        }
+        assert client.get("/metrics").json()["answer_cache"]["hits"] == 1
+
+    def test_invalidate_endpoint(self, client: TestClient):
+        """Test that DELETE /answer-cache removes cached answers."""
+        self._post_qa(client, ["Q1?", "Q2?"])
+
+        response = client.delete("/answer-cache")
+
+        assert response.json()["deleted"] == 2
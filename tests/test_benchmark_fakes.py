@@ -0,0 +1,86 @@
+import time
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.document_loader import load_pdf
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from benchmarks.synthetic import HEADER, synthetic_questions, write_synthetic_pdf
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b, strict=True))
+
+
+class TestFakeEmbeddings:
+    def test_deterministic_and_normalized(self):
+        """Test that the same text always maps to the same unit vector."""
+        embeddings = FakeEmbeddings(size=64)
+
+        first = embeddings.embed_query("encryption at rest")
+        second = FakeEmbeddings(size=64).embed_query("encryption at rest")
+
+        assert first == second
+        assert _dot(first, first) == pytest.approx(1.0)
+
+    def test_shared_words_are_more_similar(self):
+        """Test that lexical overlap yields higher similarity."""
+        embeddings = FakeEmbeddings(size=256)
+        query = embeddings.embed_query("Where are the data centres located?")
+        related, unrelated = embeddings.embed_documents(
+            ["Our data centres are located in Frankfurt.", "Lunch is at noon."]
+        )
+
+        assert _dot(query, related) > _dot(query, unrelated)
+
+    def test_injected_latency(self):
+        """Test that embedding calls sleep for the configured latency."""
+        embeddings = FakeEmbeddings(latency=0.05)
+
+        start = time.perf_counter()
+        embeddings.embed_documents(["a", "b"])
+
+        assert time.perf_counter() - start >= 0.05
+        assert embeddings.calls == 1
+        assert embeddings.texts_embedded == 2
+
+
+class TestFakeChatModel:
+    @pytest.mark.asyncio
+    async def test_answers_from_context(self):
+        """Test that the answer is drawn from the prompt's context section."""
+        llm = FakeChatModel(answer_tokens=3)
+        prompt = "Context:\nalpha beta gamma delta\n\nQuestion: why?\n\nAnswer:"
+
+        response = await llm.ainvoke([HumanMessage(content=prompt)])
+
+        assert response.content == "alpha beta gamma"
+
+    @pytest.mark.asyncio
+    async def test_streams_at_token_rate(self):
+        """Test that streaming emits one word per token at the configured rate."""
+        llm = FakeChatModel(answer_tokens=5, tokens_per_second=100)
+
+        start = time.perf_counter()
+        tokens = [chunk.content async for chunk in llm.astream("Context: a b c d e")]
+
+        assert "".join(tokens) == "a b c d e"
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestSyntheticPdf:
+    def test_pages_are_parseable(self, tmp_path: Path):
+        """Test that synthetic PDFs load with pypdf page by page."""
+        path = write_synthetic_pdf(tmp_path / "doc.pdf", pages=3, lines_per_page=5)
+
+        documents = load_pdf(str(path))
+
+        assert len(documents) == 3
+        assert documents[0].page_content.startswith(HEADER)
+        assert "Page 3 of 3" in documents[2].page_content
+
+    def test_questions_are_deterministic(self):
+        """Test that synthetic questions are reproducible."""
+        assert synthetic_questions(5) == synthetic_questions(5)
+        assert all(question.endswith("?") for question in synthetic_questions(5))
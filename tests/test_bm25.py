@@ -0,0 +1,110 @@
+from langchain_core.documents import Document
+
+from app.bm25 import BM25Index, tokenize
+from app.hybrid_store import HybridVectorStore
+from app.numpy_store import NumpyVectorStore
+from benchmarks.fakes import FakeEmbeddings
+
+TEXTS = [
+    "Backups of production databases run every 24 hours.",
+    "Physical access to the data centres is restricted.",
+    "Firewall rules are reviewed quarterly by the security team.",
+    "Control CC6.1 covers logical access to production systems.",
+]
+
+
+def _index(texts: list[str] = TEXTS) -> BM25Index:
+    index = BM25Index()
+    index.add([Document(page_content=text) for text in texts])
+    return index
+
+
+class TestTokenize:
+    def test_case_folds_words_and_identifiers(self):
+        """Test that tokens are case-folded and identifiers stay whole."""
+        assert tokenize("Control CC6.1, SOC-2") == ["control", "cc6", "1", "soc", "2"]
+
+
+class TestBM25Index:
+    def test_ranks_matching_document_first(self):
+        """Test that the document holding the query's rare terms ranks first."""
+        results = _index().search("How often do backups run?", k=2)
+
+        assert results[0][0].page_content == TEXTS[0]
+        assert results[0][1] > 0
+
+    def test_exact_identifier_match(self):
+        """Test that an identifier like a control number finds its chunk."""
+        results = _index().search("CC6.1", k=1)
+
+        assert [doc.page_content for doc, _ in results] == [TEXTS[3]]
+
+    def test_only_returns_documents_sharing_a_term(self):
+        """Test that documents scoring zero are left out."""
+        assert _index().search("encryption keys", k=4) == []
+        assert len(_index().search("production", k=4)) == 2
+
+    def test_rare_terms_outweigh_common_ones(self):
+        """Test that idf favours the document with the rarer query term."""
+        results = _index().search("access restricted", k=2)
+
+        assert results[0][0].page_content == TEXTS[1]
+
+    def test_search_many_matches_search(self):
+        """Test that batched queries return the same results as single ones."""
+        index = _index()
+        queries = ["backups", "firewall review", "unknown"]
+
+        assert index.search_many(queries, k=2) == [
+            index.search(query, k=2) for query in queries
+        ]
+
+    def test_incremental_adds_and_clear(self):
+        """Test that documents added in batches are all searchable."""
+        index = _index(TEXTS[:2])
+        index.add([Document(page_content=text) for text in TEXTS[2:]])
+
+        assert len(index) == len(TEXTS)
+        assert index.search("firewall", k=1)[0][0].page_content == TEXTS[2]
+
+        index.clear()
+        assert len(index) == 0
+        assert index.search("firewall") == []
+
+
+class TestHybridVectorStore:
+    def test_lexical_only_store_never_embeds(self):
+        """Test that a store without a dense index searches BM25 alone."""
+        store = HybridVectorStore.from_texts(TEXTS)
+
+        assert store.embeddings is None
+        assert store.similarity_search("backups", k=1)[0].page_content == TEXTS[0]
+
+    def test_adds_to_both_indexes_with_shared_ids(self):
+        """Test that chunks get the same id in the BM25 and vector indexes."""
+        embeddings = FakeEmbeddings(size=64)
+        store = HybridVectorStore.from_texts(TEXTS, embeddings)
+
+        assert isinstance(store.dense, NumpyVectorStore)
+        assert len(store.dense) == len(store) == len(TEXTS)
+        dense_ids = {doc.id for doc in store.dense.similarity_search("x", k=4)}
+        lexical_ids = {doc.id for doc, _ in store.lexical.search("the", k=4)}
+        assert lexical_ids <= dense_ids
+
+    def test_fusion_keeps_each_chunk_once(self):
+        """Test that chunks found by both searches appear once, ranked first."""
+        store = HybridVectorStore.from_texts(TEXTS, FakeEmbeddings(size=64))
+
+        results = store.similarity_search("How often do backups run?", k=3)
+
+        assert results[0].page_content == TEXTS[0]
+        assert len({doc.page_content for doc in results}) == len(results)
+
+    def test_delete_collection_clears_both_indexes(self):
+        """Test that deleting the store empties the BM25 index too."""
+        store = HybridVectorStore.from_texts(TEXTS, FakeEmbeddings(size=64))
+
+        store.delete_collection()
+
+        assert len(store) == 0
+        assert len(store.dense) == 0
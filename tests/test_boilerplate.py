@@ -0,0 +1,107 @@
+from langchain_core.documents import Document
+
+from app.boilerplate import BoilerplateStripper, normalize_line, strip_boilerplate
+
+
+def _page(number: int, body: str) -> Document:
+    return Document(
+        page_content=(
+            f"ACME Corp SOC 2 Type II Report\n{body}\n"
+            f"Confidential - do not distribute\nPage {number} of 10"
+        ),
+        metadata={"page": number},
+    )
+
+
+TOPICS = [
+    "backups",
+    "encryption",
+    "access reviews",
+    "incident response",
+    "vendor management",
+    "change management",
+    "logging",
+    "onboarding",
+    "risk assessment",
+    "business continuity",
+]
+
+
+def _body(number: int) -> str:
+    return f"The controls over {TOPICS[number]} operated effectively in the period."
+
+
+class TestNormalizeLine:
+    def test_ignores_case_spacing_and_numbers(self):
+        """Test that running page numbers normalize to the same line."""
+        assert normalize_line("  Page 3 of  10 ") == normalize_line("page 4 of 10")
+
+
+class TestBoilerplateStripper:
+    def test_strips_repeated_headers_and_footers(self):
+        """Test that lines repeated at page edges are removed from every page."""
+        stripper = BoilerplateStripper(sample_pages=4)
+
+        pages = list(
+            strip_boilerplate([_page(i, _body(i)) for i in range(10)], stripper)
+        )
+
+        assert [page.page_content for page in pages] == [_body(i) for i in range(10)]
+        assert [page.metadata["page"] for page in pages] == list(range(10))
+        assert stripper.stats.lines_removed == 30
+        assert stripper.stats.chars_removed > 0
+
+    def test_keeps_repeated_phrases_in_the_body(self):
+        """Test that a repeated line is only removed at the edge it repeats at."""
+        body = "\n".join(
+            [_body(1), _body(2), "Confidential - do not distribute", _body(3), _body(4)]
+        )
+        pages = [_page(i, _body(i)) for i in range(4)] + [_page(4, body)]
+
+        stripped = list(strip_boilerplate(pages))
+
+        assert stripped[-1].page_content == body
+
+    def test_keeps_lines_below_the_page_fraction(self):
+        """Test that a line on fewer than min_fraction of pages is kept."""
+        pages = [
+            Document(page_content=f"Section A\n{_body(i)}\nEnd of body {i}")
+            for i in range(3)
+        ] + [Document(page_content=f"{_body(i)}\nEnd of body {i}") for i in range(3, 6)]
+
+        stripped = list(strip_boilerplate(pages, BoilerplateStripper(min_fraction=0.6)))
+
+        assert stripped[0].page_content.startswith("Section A")
+
+    def test_drops_near_empty_pages(self):
+        """Test that pages with almost nothing left after stripping are dropped."""
+        pages = [_page(i, _body(i)) for i in range(4)] + [_page(4, "SECTION 2")]
+        stripper = BoilerplateStripper()
+
+        stripped = list(strip_boilerplate(pages, stripper))
+
+        assert len(stripped) == 4
+        assert stripper.stats.pages_dropped == 1
+
+    def test_never_drops_the_only_page(self):
+        """Test that a short single-page document is kept whole."""
+        page = Document(page_content="Encryption: AES-256 at rest")
+
+        assert list(strip_boilerplate([page])) == [page]
+
+    def test_single_page_documents_are_left_alone(self):
+        """Test that too few pages never count as boilerplate."""
+        page = Document(page_content="Header\n" + _body(1))
+
+        assert list(strip_boilerplate([page])) == [page]
+
+    def test_later_pages_are_judged_against_earlier_ones(self):
+        """Test that pages after the sample are stripped as they arrive."""
+        stripper = BoilerplateStripper(sample_pages=3)
+
+        ready = [stripper.feed(_page(i, _body(i))) for i in range(5)]
+
+        assert [len(pairs) for pairs in ready] == [0, 0, 0, 4, 1]
+        original, stripped = ready[-1][0]
+        assert original.metadata["page"] == 4
+        assert stripped.page_content == _body(4)
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from benchmarks.calibrate_relevance import calibrate, summarize
+
+
+class TestSummarize:
+    def test_counts_saved_calls_per_threshold(self):
+        """Test that each threshold skips the questions scoring below it."""
+        best_scores = {"a": 0.1, "b": 0.3, "c": 0.5, "d": None}
+
+        summaries = summarize(best_scores, [0.2, 0.4])
+
+        assert [s["saved_calls"] for s in summaries] == [1, 2]
+        assert summaries[1]["skipped_questions"] == ["a", "b"]
+        assert summaries[1]["saved_fraction"] == 0.5
+
+
+class TestCalibrate:
+    @pytest.mark.asyncio
+    async def test_reports_scores_for_every_question(self, tmp_path, fake_models):
+        """Test a calibration run end to end with fake models."""
+        document = tmp_path / "document.json"
+        document.write_text(json.dumps([{"content": "Backups run daily."}]))
+        questions = tmp_path / "questions.json"
+        questions.write_text(json.dumps(["Do backups run?", "Who is the CISO?"]))
+
+        report = await calibrate(document, questions, [0.0, 1.01])
+
+        assert set(report["best_scores"]) == {"Do backups run?", "Who is the CISO?"}
+        assert report["thresholds"][-1]["saved_calls"] == 2
@@ -0,0 +1,73 @@
+from langchain_core.documents import Document
+
+from app.context import assemble_context, get_token_counter
+from app.document_loader import chunk_documents
+
+PAGE = " ".join(f"Sentence number {i} describes control {i}." for i in range(60))
+
+
+def _count_words(text: str) -> int:
+    return len(text.split())
+
+
+def _chunks() -> list[Document]:
+    page = Document(page_content=PAGE, metadata={"source": "report.pdf", "page": 3})
+    return chunk_documents([page], chunk_size=200, chunk_overlap=50)
+
+
+class TestAssembleContext:
+    def test_merges_overlapping_chunks_of_a_page(self):
+        """Test that consecutive overlapping chunks become one contiguous span."""
+        chunks = _chunks()[:3]
+
+        context = assemble_context(list(reversed(chunks)))
+
+        assert context == PAGE[: chunks[2].metadata["start_index"] + 200].rstrip()
+        assert "\n\n" not in context
+
+    def test_keeps_separate_pages_apart(self):
+        """Test that chunks of different pages are not merged."""
+        first, second = _chunks()[:2]
+        second.metadata["page"] = 4
+
+        context = assemble_context([first, second])
+
+        assert context.split("\n\n") == [first.page_content, second.page_content]
+
+    def test_drops_exact_and_near_duplicates(self):
+        """Test that repeated text without positions is only included once."""
+        text = "Backups run every 24 hours and are retained for 30 days."
+        docs = [
+            Document(page_content=text),
+            Document(page_content=text.upper()),
+            Document(page_content=text[:30]),
+            Document(page_content="Firewall rules are reviewed quarterly."),
+        ]
+
+        context = assemble_context(docs)
+
+        assert context.split("\n\n") == [text, docs[3].page_content]
+
+    def test_respects_token_budget_in_rank_order(self):
+        """Test that lower-ranked spans are dropped once the budget is used."""
+        docs = [Document(page_content=f"{word} " * 40) for word in ("a", "b", "c")]
+
+        context = assemble_context(docs, max_tokens=85, count_tokens=_count_words)
+
+        assert context.split("\n\n") == [doc.page_content for doc in docs[:2]]
+
+    def test_best_span_is_cut_to_budget(self):
+        """Test that the best span is truncated rather than dropped."""
+        docs = [Document(page_content="word " * 100)]
+
+        context = assemble_context(docs, max_tokens=10, count_tokens=_count_words)
+
+        assert 0 < len(context.split()) <= 10
+
+
+class TestTokenCounter:
+    def test_counts_tokens(self):
+        """Test that the counter returns a plausible positive token count."""
+        count = get_token_counter("gpt-4o-mini")
+
+        assert 0 < count("Backups run every 24 hours.") < 20
@@ -1,15 +1,25 @@
+import hashlib
+import io
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 from langchain_core.documents import Document
+from starlette.datastructures import UploadFile
 
 from app.document_loader import (
+    UploadTooLargeError,
+    _extract_pdf_pages,
     chunk_documents,
+    estimate_chunk_count,
     load_document,
     load_json_document,
     load_pdf,
     load_questions,
+    save_upload,
+    save_upload_file_temp,
 )
 
 
@@ -30,6 +40,36 @@ class TestLoadPdf:
             assert doc.page_content is not None
             assert len(doc.page_content) > 0
 
+    def test_load_pdf_from_memory_matches_file(self, pdf_file: Path):
+        """Test that parsing PDF bytes gives the same pages as the file."""
+        from_file = load_pdf(str(pdf_file))
+        from_memory = load_pdf("report.pdf", pdf_file.read_bytes())
+
+        assert [d.page_content for d in from_memory] == [
+            d.page_content for d in from_file
+        ]
+        assert from_memory[0].metadata["source"] == "report.pdf"
+        assert from_memory[0].metadata["page"] == 0
+
+    def test_load_pdf_with_executor_matches_serial(self, pdf_file: Path):
+        """Test that page-parallel extraction returns the same documents."""
+        serial = load_pdf(str(pdf_file))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel = load_pdf(str(pdf_file), executor=executor, pages_per_task=5)
+
+        assert len(parallel) == len(serial)
+        for expected, actual in zip(serial, parallel, strict=True):
+            assert actual.page_content == expected.page_content
+            assert actual.metadata == expected.metadata
+
+    def test_slow_pages_are_skipped(self, pdf_file: Path):
+        """Test that pages exceeding the timeout come back without text."""
+        pages = _extract_pdf_pages(str(pdf_file), None, range(3), page_timeout=1e-6)
+
+        assert [page_number for page_number, _ in pages] == [0, 1, 2]
+        assert all(text is None for _, text in pages)
+
 
 class TestLoadJsonDocument:
     def test_load_json_dict(self, tmp_path: Path):
@@ -55,6 +95,13 @@ class TestLoadJsonDocument:
         assert len(documents) == 1
         assert "item" in documents[0].page_content
 
+    def test_load_json_from_memory(self):
+        """Test loading JSON content without a file on disk."""
+        documents = load_json_document("data.json", b'{"key": "value"}')
+
+        assert len(documents) == 1
+        assert "key" in documents[0].page_content
+
 
 class TestLoadDocument:
     def test_load_pdf_document(self, pdf_file: Path):
@@ -104,6 +151,16 @@ class TestChunkDocuments:
         assert len(chunks) == 1
         assert chunks[0].page_content == short_content
 
+    @pytest.mark.parametrize("words", [0, 10, 300, 1000, 3000])
+    def test_estimate_chunk_count_is_close_to_splitter(self, words: int):
+        """Test that the chunk estimate is within one of the splitter's count."""
+        text = "word " * words
+
+        estimate = estimate_chunk_count(text)
+
+        actual = len(chunk_documents([Document(page_content=text)]))
+        assert abs(estimate - actual) <= 1
+
 
 class TestLoadQuestions:
     def test_load_questions_from_example_file(self, questions_file: Path):
@@ -144,3 +201,54 @@ class TestLoadQuestions:
 
         with pytest.raises(ValueError, match="Questions file must be JSON"):
             load_questions(str(txt_file))
+
+
+class TestSaveUpload:
+    @staticmethod
+    def _upload(data: bytes, filename: str = "doc.pdf") -> UploadFile:
+        return UploadFile(file=io.BytesIO(data), filename=filename)
+
+    @pytest.mark.asyncio
+    async def test_small_upload_stays_in_memory(self):
+        """Test that uploads under the spool size are not written to disk."""
+        data = b"small upload"
+
+        saved = await save_upload(self._upload(data), suffix=".pdf", spool_bytes=1024)
+
+        assert saved.in_memory
+        assert saved.content == data
+        assert saved.path == "doc.pdf"
+        assert saved.size == len(data)
+        assert saved.sha256 == hashlib.sha256(data).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_large_upload_streams_to_disk(self):
+        """Test that uploads over the spool size are written to a temp file."""
+        data = os.urandom(3 * 1024 * 1024 + 17)
+
+        saved = await save_upload(self._upload(data), suffix=".pdf", spool_bytes=1024)
+        try:
+            assert not saved.in_memory
+            assert saved.path.endswith(".pdf")
+            assert Path(saved.path).read_bytes() == data
+            assert saved.sha256 == hashlib.sha256(data).hexdigest()
+        finally:
+            saved.cleanup()
+        assert not os.path.exists(saved.path)
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_raises_error(self):
+        """Test that uploads over max_bytes are rejected."""
+        upload = self._upload(b"x" * 5000)
+
+        with pytest.raises(UploadTooLargeError):
+            await save_upload(upload, max_bytes=4096, spool_bytes=0)
+
+    @pytest.mark.asyncio
+    async def test_save_upload_file_temp_returns_path(self):
+        """Test that save_upload_file_temp always writes a file."""
+        path = await save_upload_file_temp(self._upload(b"{}"), suffix=".json")
+        try:
+            assert Path(path).read_bytes() == b"{}"
+        finally:
+            os.unlink(path)
@@ -0,0 +1,127 @@
+import pytest
+from langchain_core.documents import Document
+
+from app.document_store import (
+    DocumentRegistry,
+    IndexedDocument,
+    embedding_dimensions,
+    estimate_index_bytes,
+)
+from app.rag_chain import create_empty_vector_store
+from benchmarks.fakes import FakeEmbeddings
+
+
+class FakeVectorStore:
+    """Stand-in vector store that records when it is released."""
+
+    def __init__(self):
+        self.deleted = False
+
+    def delete_collection(self):
+        self.deleted = True
+
+
+def _make_document(document_id: str, size_bytes: int = 100) -> IndexedDocument:
+    return IndexedDocument(
+        document_id=document_id,
+        filename=f"{document_id}.pdf",
+        vector_store=FakeVectorStore(),
+        num_pages=1,
+        num_chunks=1,
+        size_bytes=size_bytes,
+    )
+
+
+class TestEstimateIndexBytes:
+    def test_grows_with_chunk_count(self):
+        """Test that the size estimate accounts for text and embeddings."""
+        one = estimate_index_bytes([Document(page_content="abc")], dimensions=8)
+        two = estimate_index_bytes([Document(page_content="abc")] * 2, dimensions=8)
+
+        assert one == 3 + 8 * 4
+        assert two == 2 * one
+
+    def test_lexical_index_counts_text_only(self):
+        """Test that an index without vectors is sized by its text."""
+        assert estimate_index_bytes([Document(page_content="abc")], dimensions=0) == 3
+
+
+class TestEmbeddingDimensions:
+    @pytest.mark.parametrize("backend", ["chroma", "numpy"])
+    def test_reads_width_of_stored_vectors(self, backend: str):
+        """Test that the width comes from the vectors actually stored."""
+        store = create_empty_vector_store(
+            FakeEmbeddings(size=12), backend=backend, mode="hybrid"
+        )
+        store.add_documents([Document(page_content="abc")])
+
+        try:
+            assert embedding_dimensions(store) == 12
+        finally:
+            store.delete_collection()
+
+    def test_lexical_store_has_no_vectors(self):
+        """Test that a lexical-only store reports no embedding width."""
+        assert embedding_dimensions(create_empty_vector_store(mode="lexical")) == 0
+
+
+class TestDocumentRegistry:
+    def test_add_and_get(self):
+        """Test that registered documents can be retrieved by id."""
+        registry = DocumentRegistry()
+        document = _make_document("doc-1")
+
+        registry.add(document)
+
+        assert registry.get("doc-1") is document
+        assert "doc-1" in registry
+        assert registry.get("missing") is None
+
+    def test_delete_releases_vector_store(self):
+        """Test that deleting a document frees its vector store."""
+        registry = DocumentRegistry()
+        document = _make_document("doc-1")
+        registry.add(document)
+
+        assert registry.delete("doc-1") is True
+        assert registry.delete("doc-1") is False
+        assert document.vector_store.deleted
+        assert len(registry) == 0
+
+    def test_expired_documents_are_purged(self):
+        """Test that documents past their TTL are dropped."""
+        registry = DocumentRegistry(ttl_seconds=60)
+        document = _make_document("doc-1")
+        document.last_accessed -= 120
+        registry._documents["doc-1"] = document
+
+        assert registry.get("doc-1") is None
+        assert document.vector_store.deleted
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test that the registry stays within its byte budget."""
+        registry = DocumentRegistry(max_bytes=250)
+        registry.add(_make_document("doc-1"))
+        registry.add(_make_document("doc-2"))
+        registry.get("doc-1")
+
+        registry.add(_make_document("doc-3"))
+
+        assert "doc-1" in registry
+        assert "doc-2" not in registry
+        assert "doc-3" in registry
+        assert registry.total_bytes <= 250
+
+    def test_releases_with_given_callback(self):
+        """Test that removed stores go to the release callback, not deleted inline."""
+        released = []
+        registry = DocumentRegistry(max_bytes=150, release=released.append)
+        first = _make_document("doc-1")
+        registry.add(first)
+        second = _make_document("doc-2")
+
+        registry.add(second)
+        registry.delete("doc-2")
+
+        assert released == [first.vector_store, second.vector_store]
+        assert not first.vector_store.deleted
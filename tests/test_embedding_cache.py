@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from app import rag_chain
+from app.embedding_cache import CachedEmbeddings, EmbeddingCache, embedding_cache_key
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic fake embeddings that record every text sent to them."""
+
+    calls: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+
+class SizedEmbeddings(Embeddings):
+    """Constant vectors of a configurable size, like a shortened OpenAI model."""
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [[1.0] * self.dimensions for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def counting_embeddings() -> CountingEmbeddings:
+    return CountingEmbeddings(size=8, calls=[])
+
+
+class TestEmbeddingCacheKey:
+    def test_key_depends_on_model_and_dimensions(self):
+        """Test that the same text maps to different keys per model config."""
+        base = embedding_cache_key("hello", "model-a")
+
+        assert base == embedding_cache_key("hello", "model-a")
+        assert base != embedding_cache_key("hello", "model-b")
+        assert base != embedding_cache_key("hello", "model-a", dimensions=256)
+        assert base != embedding_cache_key("hello!", "model-a")
+
+
+class TestEmbeddingCache:
+    def test_round_trip_as_float32(self, tmp_path: Path):
+        """Test that stored vectors come back with float32 precision."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+
+        cache.put_many({"k": [0.5, -1.25, 3.0]})
+
+        assert cache.get_many(["k", "missing"]) == {"k": [0.5, -1.25, 3.0]}
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_evicts_least_recently_used(self, tmp_path: Path):
+        """Test that the cache stays within max_entries."""
+        cache = EmbeddingCache(tmp_path / "cache.db", max_entries=2)
+
+        cache.put_many({"a": [1.0]})
+        cache.put_many({"b": [2.0]})
+        cache.get_many(["a"])
+        cache.put_many({"c": [3.0]})
+
+        assert len(cache) == 2
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+    def test_shared_between_instances(self, tmp_path: Path):
+        """Test that separate cache instances see the same file contents."""
+        path = tmp_path / "cache.db"
+        EmbeddingCache(path).put_many({"k": [1.0, 2.0]})
+
+        assert EmbeddingCache(path).get_many(["k"]) == {"k": [1.0, 2.0]}
+
+
+class TestCachedEmbeddings:
+    def test_repeat_chunks_do_not_hit_model(
+        self, tmp_path: Path, counting_embeddings: CountingEmbeddings
+    ):
+        """Test that only cache misses are sent to the wrapped embeddings."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        embeddings = CachedEmbeddings(counting_embeddings, cache, model="fake")
+
+        first = embeddings.embed_documents(["a", "b", "a"])
+        second = embeddings.embed_documents(["b", "c"])
+
+        assert counting_embeddings.calls == ["a", "b", "c"]
+        assert first[0] == first[2]
+        assert second[0] == first[1]
+        assert len(first[0]) == 8
+
+    @pytest.mark.asyncio
+    async def test_async_embedding_uses_cache(
+        self, tmp_path: Path, counting_embeddings: CountingEmbeddings
+    ):
+        """Test that the async path reads from and writes to the cache."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        embeddings = CachedEmbeddings(counting_embeddings, cache, model="fake")
+
+        vectors = await embeddings.aembed_documents(["x", "y"])
+        query = await embeddings.aembed_query("x")
+
+        assert query == vectors[0]
+        assert cache.stats()["hits"] == 1
+
+    def test_changed_dimensions_miss_the_cache(self, tmp_path: Path):
+        """Test that vectors cached at one size are not served at another."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        CachedEmbeddings(SizedEmbeddings(8), cache, model="m").embed_documents(["a"])
+        shortened = SizedEmbeddings(4)
+
+        vectors = CachedEmbeddings(shortened, cache, model="m").embed_documents(["a"])
+
+        assert shortened.calls == 1
+        assert len(vectors[0]) == 4
+
+    def test_create_embeddings_keys_on_configured_dimensions(
+        self, tmp_path: Path, monkeypatch
+    ):
+        """Test that EMBEDDING_DIMENSIONS reaches the model and the cache key."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setattr(rag_chain, "EMBEDDING_DIMENSIONS", 256)
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        monkeypatch.setattr(rag_chain, "get_embedding_cache", lambda: cache)
+
+        embeddings = rag_chain.create_embeddings()
+
+        assert embeddings.embeddings.dimensions == 256
+        assert embeddings.dimensions == 256
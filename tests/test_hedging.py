@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from langchain_core.output_parsers import StrOutputParser
+
+from app.hedging import HedgedRunnable, RequestHedger
+from benchmarks.fakes import FakeChatModel
+
+
+def _warm(hedger: RequestHedger, latency: float = 0.01, count: int = 20) -> None:
+    """Seed the hedger with ``count`` observed latencies."""
+    hedger._latencies.extend([latency] * count)
+    hedger.requests += count
+
+
+def _calls(*delays: float, fail: tuple[int, ...] = ()):
+    """Return a call factory whose n-th call sleeps ``delays[n]`` seconds."""
+    state = {"started": 0, "cancelled": 0}
+
+    def call():
+        index = state["started"]
+        state["started"] += 1
+
+        async def _run():
+            try:
+                await asyncio.sleep(delays[index])
+            except asyncio.CancelledError:
+                state["cancelled"] += 1
+                raise
+            if index in fail:
+                raise RuntimeError(f"call {index} failed")
+            return f"result {index}"
+
+        return _run()
+
+    return call, state
+
+
+class TestRequestHedger:
+    @pytest.mark.asyncio
+    async def test_no_hedge_while_warming_up(self):
+        """Test that calls are not hedged before enough latencies are known."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=1.0)
+        call, state = _calls(0.05)
+
+        assert await hedger.run(call) == "result 0"
+        assert state["started"] == 1
+        assert hedger.hedge_delay() is None
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_and_loser_cancelled(self):
+        """Test that the faster duplicate wins and the slow call is cancelled."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=1.0)
+        _warm(hedger)
+        call, state = _calls(5.0, 0.01)
+
+        assert await asyncio.wait_for(hedger.run(call), 1.0) == "result 1"
+        await asyncio.sleep(0)
+        assert state["cancelled"] == 1
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_call_is_not_hedged(self):
+        """Test that calls finishing before the deadline are sent once."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=1.0)
+        _warm(hedger, latency=0.5)
+        call, state = _calls(0.01)
+
+        assert await hedger.run(call) == "result 0"
+        assert state["started"] == 1
+
+    @pytest.mark.asyncio
+    async def test_spend_cap(self):
+        """Test that hedges stop once they reach the allowed share of calls."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=0.05)
+        _warm(hedger, latency=0.001)
+        call, state = _calls(*[0.02] * 40)
+
+        for _ in range(10):
+            await hedger.run(call)
+
+        # 30 calls so far allow one hedge at 5%.
+        assert hedger.hedged == 1
+        assert state["started"] == 11
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back_to_hedge(self):
+        """Test that a failure does not win while the other call may succeed."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=1.0)
+        _warm(hedger)
+        call, _ = _calls(0.05, 0.1, fail=(0,))
+
+        assert await hedger.run(call) == "result 1"
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raises(self):
+        """Test that the error is raised when every attempt fails."""
+        hedger = RequestHedger(percentile=50, max_hedge_ratio=1.0)
+        _warm(hedger)
+        call, _ = _calls(0.05, 0.05, fail=(0, 1))
+
+        with pytest.raises(RuntimeError, match="failed"):
+            await hedger.run(call)
+
+
+class TestHedgedRunnable:
+    @pytest.mark.asyncio
+    async def test_invoke_and_stream_in_chain(self):
+        """Test that a hedged model still invokes and streams inside a chain."""
+        hedger = RequestHedger(percentile=50)
+        llm = HedgedRunnable(FakeChatModel(answer_tokens=3), hedger)
+        chain = llm | StrOutputParser()
+        prompt = "Context:\nalpha beta gamma delta\n\nQuestion: q"
+
+        answer = await chain.ainvoke(prompt)
+        chunks = [chunk async for chunk in chain.astream(prompt)]
+
+        assert answer == "".join(chunks)
+        assert len([chunk for chunk in chunks if chunk]) == 3
+        assert hedger.requests == 1
@@ -0,0 +1,210 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from chromadb.api.client import SharedSystemClient
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app import rag_chain, runtime
+from app.boilerplate import BoilerplateStripper
+from app.document_loader import chunk_documents, load_pdf
+from app.ingest_pipeline import (
+    aiter_in_thread,
+    ingest_documents_streaming,
+    ingest_file_streaming,
+)
+from benchmarks.fakes import FakeEmbeddings
+
+
+class RecordingVectorStore:
+    """Minimal vector store that records when each batch was added."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches: list[tuple[float, int]] = []
+
+    def add_documents(self, documents: list[Document]) -> list[str]:
+        time.sleep(self.delay)
+        self.batches.append((time.perf_counter(), len(documents)))
+        return [str(i) for i in range(len(documents))]
+
+
+async def _pages(count: int, delay: float = 0.0, events: list | None = None):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        if events is not None:
+            events.append(("page", i, time.perf_counter()))
+        yield Document(page_content=f"page {i} " + "text " * 300, metadata={"page": i})
+
+
+class TestAiterInThread:
+    @pytest.mark.asyncio
+    async def test_yields_items_in_order(self):
+        """Test that a blocking iterator is consumed in order."""
+        items = [item async for item in aiter_in_thread(lambda: iter(range(20)))]
+
+        assert items == list(range(20))
+
+    @pytest.mark.asyncio
+    async def test_propagates_producer_errors(self):
+        """Test that errors raised by the iterator reach the consumer."""
+
+        def _failing():
+            yield 1
+            raise ValueError("bad page")
+
+        with pytest.raises(ValueError, match="bad page"):
+            async for _ in aiter_in_thread(_failing):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_producer_is_bounded_by_queue(self):
+        """Test that the producer cannot run far ahead of the consumer."""
+        produced = []
+
+        def _counting():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        stream = aiter_in_thread(_counting, maxsize=2)
+        assert await anext(stream) == 0
+        await asyncio.sleep(0.05)
+
+        assert len(produced) <= 5
+        await stream.aclose()
+
+
+class TestIngestDocumentsStreaming:
+    @pytest.mark.asyncio
+    async def test_chunk_count_matches_staged_pipeline(self, pdf_file: Path):
+        """Test that streaming ingest indexes the same chunks as staged ingest."""
+        pages = load_pdf(str(pdf_file))
+        expected_chunks = chunk_documents(pages)
+        vector_store = Chroma(
+            collection_name=f"test-{uuid.uuid4().hex}",
+            embedding_function=DeterministicFakeEmbedding(size=8),
+        )
+
+        async def _from_list():
+            for page in pages:
+                yield page
+
+        result = await ingest_documents_streaming(
+            _from_list(), vector_store, batch_size=32
+        )
+
+        assert result.num_pages == len(pages)
+        assert result.num_chunks == len(expected_chunks)
+        assert vector_store._collection.count() == len(expected_chunks)
+        vector_store.delete_collection()
+
+    @pytest.mark.asyncio
+    async def test_single_thread_pool_does_not_deadlock(self, monkeypatch):
+        """Test that a blocked page producer never starves the index stage."""
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(runtime, "_thread_pool", pool)
+
+        def _page_iterator():
+            for i in range(40):
+                yield Document(page_content=f"page {i} " + "text " * 300)
+
+        vector_store = RecordingVectorStore()
+        try:
+            result = await asyncio.wait_for(
+                ingest_documents_streaming(
+                    aiter_in_thread(_page_iterator, maxsize=2),
+                    vector_store,
+                    batch_size=2,
+                    embed_concurrency=1,
+                    queue_size=1,
+                ),
+                timeout=10,
+            )
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        assert result.num_pages == 40
+        assert len(vector_store.batches) > 1
+
+    @pytest.mark.asyncio
+    async def test_indexing_overlaps_parsing(self):
+        """Test that the first batch is indexed before the last page arrives."""
+        events: list = []
+        vector_store = RecordingVectorStore()
+
+        await ingest_documents_streaming(
+            _pages(20, delay=0.01, events=events), vector_store, batch_size=4
+        )
+
+        last_page_at = events[-1][2]
+        first_batch_at = vector_store.batches[0][0]
+        assert first_batch_at < last_page_at
+
+    @pytest.mark.asyncio
+    async def test_reports_progress(self):
+        """Test that progress callbacks report pages and chunks."""
+        progress: dict[str, int] = {}
+
+        result = await ingest_documents_streaming(
+            _pages(5),
+            RecordingVectorStore(),
+            batch_size=3,
+            on_progress=lambda stage, count: progress.__setitem__(stage, count),
+        )
+
+        assert progress == {"pages": 5, "chunks": result.num_chunks}
+        assert result.size_bytes > 0
+
+    @pytest.mark.asyncio
+    async def test_strips_boilerplate_before_chunking(self):
+        """Test that repeated headers are not indexed and savings are reported."""
+        footer = "This report is confidential and intended solely for customers. " * 2
+
+        async def _report_pages():
+            for i in range(6):
+                body = f"section {i} " + "finding " * 110
+                yield Document(
+                    page_content=f"Example Co. SOC 2 Report\n{body}\n{footer}\n{i + 1}",
+                    metadata={"page": i},
+                )
+
+        vector_store = RecordingVectorStore()
+        result = await ingest_documents_streaming(
+            _report_pages(), vector_store, stripper=BoilerplateStripper(sample_pages=2)
+        )
+
+        assert result.num_pages == 6
+        assert result.num_chunks == 6
+        assert result.boilerplate.chunks_removed == 6
+        assert result.boilerplate.lines_removed == 18
+        assert sum(count for _, count in vector_store.batches) == 6
+
+
+class TestIngestFileStreaming:
+    @pytest.mark.asyncio
+    async def test_concurrent_ingests_on_cold_chroma_client(
+        self, tmp_path: Path, monkeypatch
+    ):
+        """Test that concurrent ingests can all create Chroma stores at startup."""
+        monkeypatch.setattr(rag_chain, "VECTOR_STORE_BACKEND", "chroma")
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MODE", "vector")
+        monkeypatch.setattr(rag_chain, "create_embeddings", lambda: FakeEmbeddings(8))
+        document = tmp_path / "policy.json"
+        document.write_text(
+            '{"encryption": "Customer data is encrypted with AES-256 at rest."}'
+        )
+        SharedSystemClient.clear_system_cache()
+
+        results = await asyncio.gather(
+            *(ingest_file_streaming(str(document)) for _ in range(6))
+        )
+
+        for result in results:
+            assert result.num_chunks == 1
+            result.vector_store.delete_collection()
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.jobs import CANCELLED, FAILED, RUNNING, SUCCEEDED, Job, JobManager
+
+
+class TestJobManager:
+    @pytest.mark.asyncio
+    async def test_runs_job_and_records_answers(self):
+        """Test that a job runs in the background and keeps its results."""
+        manager = JobManager()
+        cleaned = []
+
+        async def _run(job: Job) -> None:
+            job.record_progress("pages", 3)
+            job.record_answer("Q1", "A1")
+
+        job = manager.submit(_run, questions_total=1, cleanup=lambda: cleaned.append(1))
+        await asyncio.wait_for(job.task, 1)
+        await asyncio.sleep(0)
+
+        data = job.to_dict()
+        assert data["status"] == SUCCEEDED
+        assert data["progress"]["pages"] == 3
+        assert data["progress"]["questions_answered"] == 1
+        assert data["answers"] == {"Q1": "A1"}
+        assert cleaned == [1]
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        """Test that no more than max_concurrent_jobs run at once."""
+        manager = JobManager(max_concurrent_jobs=2)
+        tracker = {"in_flight": 0, "peak": 0}
+
+        async def _run(job: Job) -> None:
+            tracker["in_flight"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["in_flight"])
+            await asyncio.sleep(0.02)
+            tracker["in_flight"] -= 1
+
+        jobs = [manager.submit(_run, questions_total=0) for _ in range(5)]
+        await asyncio.gather(*(job.task for job in jobs))
+
+        assert tracker["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_and_queued_jobs(self):
+        """Test that cancellation stops running jobs and drops queued ones."""
+        manager = JobManager(max_concurrent_jobs=1)
+        cleaned = []
+
+        async def _run(job: Job) -> None:
+            job.record_answer("Q1", "A1")
+            await asyncio.sleep(10)
+
+        running = manager.submit(_run, 2, cleanup=lambda: cleaned.append("running"))
+        queued = manager.submit(_run, 2, cleanup=lambda: cleaned.append("queued"))
+        await asyncio.sleep(0.01)
+        assert running.status == RUNNING
+
+        manager.cancel(queued.job_id)
+        manager.cancel(running.job_id)
+        await asyncio.gather(running.task, queued.task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert running.status == CANCELLED
+        assert running.answers == {"Q1": "A1"}
+        assert queued.status == CANCELLED
+        assert sorted(cleaned) == ["queued", "running"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded(self):
+        """Test that an exception marks the job failed with its error."""
+        manager = JobManager()
+
+        async def _run(job: Job) -> None:
+            raise RuntimeError("boom")
+
+        job = manager.submit(_run, questions_total=1)
+        await job.task
+
+        assert job.status == FAILED
+        assert job.error == "RuntimeError: boom"
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire(self):
+        """Test that finished jobs are purged after the retention period."""
+        manager = JobManager(retention_seconds=0)
+
+        async def _run(job: Job) -> None:
+            return None
+
+        job = manager.submit(_run, questions_total=0)
+        await job.task
+        await asyncio.sleep(0.01)
+
+        assert manager.get(job.job_id) is None
+
+
+class TestJobEndpoints:
+    def test_submit_poll_and_fetch_results(self, client: TestClient):
+        """Test that a job returns immediately and exposes progress and answers."""
+        questions = ["Where are the data centres?", "Who reviews access?"]
+        document = [{"content": "Our data centres are in Frankfurt and Dublin."}]
+
+        response = client.post(
+            "/jobs",
+            files={
+                "questions_file": ("questions.json", json.dumps(questions)),
+                "document_file": ("document.json", json.dumps(document)),
+            },
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        deadline = time.monotonic() + 10
+        while (job := client.get(f"/jobs/{job_id}").json())["status"] not in (
+            SUCCEEDED,
+            FAILED,
+        ):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert job["status"] == SUCCEEDED
+        assert list(job["answers"]) == questions
+        assert job["progress"]["pages"] == 1
+        assert job["progress"]["chunks"] == 1
+        assert job["progress"]["questions_answered"] == 2
+
+    def test_unknown_job_returns_404(self, client: TestClient):
+        """Test that unknown job ids are reported as not found."""
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.post("/jobs/missing/cancel").status_code == 404
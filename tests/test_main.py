@@ -0,0 +1,199 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import rag_chain
+from app.semantic_cache import SemanticAnswerIndex
+
+QUESTIONS = ["Where are the data centres?", "Who reviews access?"]
+DOCUMENT = [{"content": "Our data centres are in Frankfurt and Dublin."}]
+
+
+def _files(
+    document: str = json.dumps(DOCUMENT), questions: list[str] = QUESTIONS
+) -> dict:
+    return {
+        "questions_file": ("questions.json", json.dumps(questions)),
+        "document_file": ("document.json", document),
+    }
+
+
+@pytest.fixture
+def semantic_reuse(monkeypatch):
+    index = SemanticAnswerIndex(threshold=0.8)
+    monkeypatch.setattr(rag_chain, "get_semantic_answer_index", lambda: index)
+    return index
+
+
+def _stream_answers(client: TestClient, questions: list[str]) -> list[dict]:
+    with client.stream(
+        "POST", "/qa/stream", files=_files(questions=questions)
+    ) as response:
+        records = [json.loads(line) for line in response.iter_lines() if line]
+    return [record for record in records if record["type"] == "answer"]
+
+
+class TestQaStream:
+    def test_streams_answers_then_summary(self, client: TestClient):
+        """Test that each answer is a record followed by a summary record."""
+        with client.stream("POST", "/qa/stream", files=_files()) as response:
+            assert response.headers["content-type"] == "application/x-ndjson"
+            records = [json.loads(line) for line in response.iter_lines() if line]
+
+        answers, summary = records[:-1], records[-1]
+        assert sorted(record["question"] for record in answers) == sorted(QUESTIONS)
+        assert {record["index"] for record in answers} == {0, 1}
+        assert summary["type"] == "summary"
+        assert summary["answered"] == 2
+        assert summary["failed"] == 0
+        assert summary["first_answer_seconds"] <= summary["total_seconds"]
+
+    def test_indexes_refer_to_input_positions(self, client: TestClient):
+        """Test that a repeated question gets a record for each input index."""
+        questions = [QUESTIONS[0], QUESTIONS[1], QUESTIONS[0]]
+
+        records = _stream_answers(client, questions)
+
+        by_index = {record["index"]: record["question"] for record in records}
+        assert by_index == dict(enumerate(questions))
+
+    def test_server_sent_events(self, client: TestClient):
+        """Test that SSE framing is used when the client asks for it."""
+        with client.stream(
+            "POST",
+            "/qa/stream",
+            files=_files(),
+            headers={"Accept": "text/event-stream"},
+        ) as response:
+            body = response.read().decode()
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert body.count("event: answer\n") == 2
+        assert "event: summary\n" in body
+
+    def test_token_records_interleave_by_index(self, client: TestClient):
+        """Test that token mode streams deltas that add up to each answer."""
+        with client.stream(
+            "POST", "/qa/stream", params={"tokens": "true"}, files=_files()
+        ) as response:
+            records = [json.loads(line) for line in response.iter_lines() if line]
+
+        answers = {r["index"]: r["answer"] for r in records if r["type"] == "answer"}
+        deltas: dict[int, list[str]] = {}
+        for record in records:
+            if record["type"] == "token":
+                deltas.setdefault(record["index"], []).append(record["delta"])
+        assert set(deltas) == {0, 1}
+        for index, parts in deltas.items():
+            assert "".join(parts) == answers[index]
+        assert records[-1]["type"] == "summary"
+
+    def test_marks_reused_answers(self, client: TestClient, semantic_reuse):
+        """Test that answers reused from a paraphrase are flagged as reused."""
+        first = _stream_answers(client, ["Where are the data centres?"])
+        again = _stream_answers(
+            client, ["Where are the data centres located?", "Who reviews access?"]
+        )
+
+        assert [record["reused"] for record in first] == [False]
+        reused = {record["question"]: record["reused"] for record in again}
+        assert reused == {
+            "Where are the data centres located?": True,
+            "Who reviews access?": False,
+        }
+
+    def test_processing_error_is_a_record(self, client: TestClient):
+        """Test that a failure after streaming starts ends with an error record."""
+        with client.stream("POST", "/qa/stream", files=_files("{")) as response:
+            records = [json.loads(line) for line in response.iter_lines() if line]
+
+        assert response.status_code == 200
+        assert [record["type"] for record in records] == ["error", "summary"]
+        assert records[-1]["answered"] == 0
+
+
+class TestJobs:
+    def _wait(self, client: TestClient, job_id: str) -> dict:
+        for _ in range(200):
+            job = client.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("succeeded", "failed", "cancelled"):
+                return job
+            time.sleep(0.02)
+        raise AssertionError(f"Job {job_id} did not finish")
+
+    def test_job_marks_reused_answers(self, client: TestClient, semantic_reuse):
+        """Test that job results list answers reused from a paraphrase."""
+        _stream_answers(client, ["Where are the data centres?"])
+
+        response = client.post(
+            "/jobs", files=_files(questions=["Where are the data centres located?"])
+        )
+        job = self._wait(client, response.json()["job_id"])
+
+        assert job["status"] == "succeeded"
+        assert job["reused"] == {
+            "Where are the data centres located?": "Where are the data centres?"
+        }
+
+
+class TestRegisterDocument:
+    def test_small_json_document_is_indexed(self, client: TestClient):
+        """Test that a short JSON document is kept as one chunk."""
+        response = client.post(
+            "/documents",
+            files={
+                "document_file": (
+                    "policy.json",
+                    json.dumps({"encryption": "AES-256 at rest"}),
+                )
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.json()["chunks"] == 1
+
+    def test_document_without_content_is_rejected(self, client: TestClient):
+        """Test that a document yielding no chunks is a 400, not an empty index."""
+        response = client.post(
+            "/documents", files={"document_file": ("empty.json", json.dumps(""))}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "No content found in document"
+
+    def test_lifecycle(self, client: TestClient):
+        """Test register, metadata, Q&A and delete of a registered document."""
+        registered = client.post(
+            "/documents",
+            files={"document_file": ("document.json", json.dumps(DOCUMENT))},
+        ).json()
+        document_id = registered["document_id"]
+        questions = {"questions_file": ("questions.json", json.dumps(QUESTIONS))}
+
+        metadata = client.get(f"/documents/{document_id}")
+        answered = client.post(f"/documents/{document_id}/qa", files=questions)
+        deleted = client.delete(f"/documents/{document_id}")
+
+        assert metadata.status_code == 200
+        assert metadata.json()["filename"] == "document.json"
+        assert answered.status_code == 200
+        assert list(answered.json()["answers"]) == QUESTIONS
+        assert deleted.json() == {"document_id": document_id, "deleted": True}
+        assert client.get(f"/documents/{document_id}").status_code == 404
+        assert (
+            client.post(f"/documents/{document_id}/qa", files=questions).status_code
+            == 404
+        )
+        assert client.delete(f"/documents/{document_id}").status_code == 404
+
+    def test_unknown_document_is_404(self, client: TestClient):
+        """Test that Q&A against an id that was never registered is a 404."""
+        response = client.post(
+            "/documents/missing/qa",
+            files={"questions_file": ("questions.json", json.dumps(QUESTIONS))},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Document not found"
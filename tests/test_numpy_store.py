@@ -0,0 +1,131 @@
+import asyncio
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from app.numpy_store import NumpyVectorStore, top_k
+from app.rag_chain import create_empty_vector_store, create_vector_store
+from benchmarks.fakes import FakeEmbeddings
+
+TEXTS = [
+    "Backups of production databases run every 24 hours.",
+    "Physical access to the data centres is restricted.",
+    "Firewall rules are reviewed quarterly.",
+    "Anti-malware signatures update daily on endpoints.",
+]
+
+
+@pytest.fixture
+def store() -> NumpyVectorStore:
+    return NumpyVectorStore.from_texts(
+        TEXTS,
+        FakeEmbeddings(size=64),
+        metadatas=[{"page": i} for i in range(len(TEXTS))],
+    )
+
+
+class TestTopK:
+    def test_returns_best_first(self):
+        """Test that top_k returns the highest scores in descending order."""
+        scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.4, 0.3, 0.2, 0.1]])
+
+        assert top_k(scores, 2).tolist() == [[1, 3], [0, 1]]
+
+    def test_k_larger_than_columns(self):
+        """Test that k is clamped to the number of stored vectors."""
+        scores = np.array([[0.2, 0.8]])
+
+        assert top_k(scores, 5).tolist() == [[1, 0]]
+
+
+class TestNumpyVectorStore:
+    def test_similarity_search(self, store: NumpyVectorStore):
+        """Test that the most lexically similar chunk ranks first."""
+        results = store.similarity_search("How often do backups run?", k=2)
+
+        assert len(results) == 2
+        assert results[0].page_content == TEXTS[0]
+        assert results[0].metadata == {"page": 0}
+
+    def test_matches_brute_force_ranking(self):
+        """Test that search returns the exact cosine top-k."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((200, 16))
+        store = NumpyVectorStore(FakeEmbeddings(size=16))
+        store._append(vectors.tolist(), [str(i) for i in range(200)], None, None)
+        query = rng.standard_normal(16)
+
+        results = store.similarity_search_by_vector(query.tolist(), k=5)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ query))[:5]
+        assert [int(doc.page_content) for doc in results] == expected.tolist()
+
+    def test_batched_search_matches_single(self, store: NumpyVectorStore):
+        """Test that one batched search equals per-vector searches."""
+        embeddings = store.embeddings.embed_documents(["backups", "firewall rules"])
+
+        batched = store.similarity_search_by_vectors(embeddings, k=3)
+
+        assert batched == [
+            store.similarity_search_by_vector(embedding, k=3)
+            for embedding in embeddings
+        ]
+
+    def test_matrix_grows_contiguously(self):
+        """Test that repeated adds keep one contiguous float32 matrix."""
+        store = NumpyVectorStore(FakeEmbeddings(size=8))
+        for i in range(10):
+            store.add_texts([f"text {i}", f"more {i}"])
+
+        assert len(store) == 20
+        assert store._matrix.dtype == np.float32
+        assert store._matrix.flags["C_CONTIGUOUS"]
+
+    @pytest.mark.asyncio
+    async def test_async_retriever(self, store: NumpyVectorStore):
+        """Test that the retriever works natively in async code."""
+        retriever = store.as_retriever(search_kwargs={"k": 1})
+
+        results = await retriever.ainvoke("Who reviews firewall rules?")
+
+        assert results[0].page_content == TEXTS[2]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_adds(self):
+        """Test that concurrent adds keep documents and rows aligned."""
+        store = NumpyVectorStore(FakeEmbeddings(size=64, latency=0.01))
+
+        await asyncio.gather(
+            *(store.aadd_documents([Document(page_content=text)]) for text in TEXTS)
+        )
+
+        assert len(store) == len(TEXTS)
+        for text in TEXTS:
+            assert store.similarity_search(text, k=1)[0].page_content == text
+
+    def test_delete_collection(self, store: NumpyVectorStore):
+        """Test that delete_collection empties the store."""
+        store.delete_collection()
+
+        assert len(store) == 0
+        assert store.similarity_search("backups") == []
+
+
+class TestBackendSelection:
+    def test_create_vector_store_with_numpy_backend(self):
+        """Test that the numpy backend is selectable by name."""
+        documents = [Document(page_content=text) for text in TEXTS]
+
+        store = create_vector_store(
+            documents, embeddings=FakeEmbeddings(size=32), backend="numpy"
+        )
+
+        assert isinstance(store, NumpyVectorStore)
+        assert len(store) == len(TEXTS)
+
+    def test_unknown_backend_raises_error(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError, match="Unknown vector store backend"):
+            create_empty_vector_store(FakeEmbeddings(), backend="faiss")
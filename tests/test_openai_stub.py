@@ -0,0 +1,118 @@
+import random
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.rag_chain import create_chat_model, create_embeddings
+from benchmarks.openai_stub import LatencyModel, StubConfig, create_stub_app
+
+
+@pytest.fixture
+def stub_url(monkeypatch):
+    """Serve the stub on a free local port and yield its base URL."""
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_stub_app(StubConfig(embedding_dimensions=32, answer_tokens=3)),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+class TestLatencyModel:
+    def test_parses_distributions(self):
+        """Test that each latency spec samples within its range."""
+        rng = random.Random(0)
+
+        assert LatencyModel("constant:0.2").sample(rng) == 0.2
+        assert 0.1 <= LatencyModel("uniform:0.1:0.3").sample(rng) <= 0.3
+        assert LatencyModel("lognormal:0.2:0.5").sample(rng) > 0
+
+    def test_tail_multiplier(self):
+        """Test that tail samples are scaled by the multiplier."""
+        model = LatencyModel("constant:0.1", tail_probability=1.0, tail_multiplier=20)
+
+        assert model.sample(random.Random(0)) == pytest.approx(2.0)
+
+    def test_rejects_invalid_spec(self):
+        """Test that malformed latency specs raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid latency spec"):
+            LatencyModel("pareto:1")
+
+
+class TestStubEndpoints:
+    def test_embeddings_accept_strings_and_token_arrays(self):
+        """Test that embeddings are returned for both input encodings."""
+        client = TestClient(create_stub_app(StubConfig(embedding_dimensions=8)))
+
+        response = client.post(
+            "/v1/embeddings", json={"model": "m", "input": ["hello", [1, 2, 3]]}
+        )
+
+        data = response.json()["data"]
+        assert response.status_code == 200
+        assert [item["index"] for item in data] == [0, 1]
+        assert all(len(item["embedding"]) == 8 for item in data)
+
+    def test_rate_limit_injection(self):
+        """Test that requests over the per-minute limit get 429 and retry-after."""
+        client = TestClient(create_stub_app(StubConfig(requests_per_minute=1)))
+        body = {"model": "m", "input": "hello"}
+
+        assert client.post("/v1/embeddings", json=body).status_code == 200
+        response = client.post("/v1/embeddings", json=body)
+
+        assert response.status_code == 429
+        assert float(response.headers["retry-after"]) > 0
+        assert client.get("/stats").json()["rate_limited"] == 1
+
+    def test_error_injection(self):
+        """Test that the configured error rate produces 500 responses."""
+        client = TestClient(create_stub_app(StubConfig(error_rate=1.0)))
+
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "m", "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+        assert response.status_code == 500
+        assert response.json()["error"]["type"] == "server_error"
+
+
+class TestAppAgainstStub:
+    def test_embeddings_use_base_url(self, stub_url):
+        """Test that create_embeddings talks to the configured base URL."""
+        embeddings = create_embeddings(base_url=stub_url)
+
+        vectors = embeddings.embed_documents(["access reviews", "backups"])
+
+        assert len(vectors) == 2
+        assert len(vectors[0]) == 32
+
+    @pytest.mark.asyncio
+    async def test_chat_model_streams_from_base_url(self, stub_url):
+        """Test that create_chat_model streams tokens from the stub."""
+        llm = create_chat_model(base_url=stub_url)
+
+        tokens = [
+            chunk.content
+            async for chunk in llm.astream("Context:\nalpha beta gamma delta")
+        ]
+
+        assert "".join(tokens) == "alpha beta gamma"
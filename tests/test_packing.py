@@ -0,0 +1,77 @@
+import json
+
+from langchain_core.documents import Document
+
+from app.packing import group_by_context, merge_contexts, parse_packed_answers
+
+
+def _docs(*texts: str) -> list[Document]:
+    return [Document(page_content=text) for text in texts]
+
+
+class TestGroupByContext:
+    def test_groups_questions_with_shared_chunks(self):
+        """Test that questions retrieving the same chunks share a group."""
+        contexts = {
+            "Is data encrypted at rest?": _docs("crypto", "keys", "tls"),
+            "Who manages backups?": _docs("backups", "retention", "restore"),
+            "Is data encrypted in transit?": _docs("tls", "crypto", "ciphers"),
+        }
+
+        groups = group_by_context(contexts, min_overlap=0.5)
+
+        assert groups == [
+            ["Is data encrypted at rest?", "Is data encrypted in transit?"],
+            ["Who manages backups?"],
+        ]
+
+    def test_respects_max_questions(self):
+        """Test that a full group is not extended."""
+        contexts = {f"Q{i}": _docs("shared") for i in range(5)}
+
+        groups = group_by_context(contexts, max_questions=2)
+
+        assert [len(group) for group in groups] == [2, 2, 1]
+
+    def test_respects_token_budget(self):
+        """Test that a question whose new chunks overflow the budget starts a group."""
+        shared = "s" * 400
+        contexts = {
+            "Q1": _docs(shared, "a" * 400),
+            "Q2": _docs(shared, "b" * 400),
+        }
+
+        assert len(group_by_context(contexts, max_context_tokens=300)) == 1 + 1
+        assert len(group_by_context(contexts, max_context_tokens=400)) == 1
+
+    def test_merge_contexts_deduplicates_in_order(self):
+        """Test that shared chunks are sent once, in first-seen order."""
+        merged = merge_contexts([_docs("a", "b"), _docs("b", "c")])
+
+        assert [doc.page_content for doc in merged] == ["a", "b", "c"]
+
+
+class TestParsePackedAnswers:
+    def test_parses_answers_in_id_order(self):
+        """Test that answers are returned in question order."""
+        reply = json.dumps([{"id": 2, "answer": "two"}, {"id": 1, "answer": "one"}])
+
+        assert parse_packed_answers(reply, 2) == ["one", "two"]
+
+    def test_accepts_code_fence(self):
+        """Test that a reply wrapped in a JSON code fence is accepted."""
+        reply = '```json\n[{"id": 1, "answer": "yes"}]\n```'
+
+        assert parse_packed_answers(reply, 1) == ["yes"]
+
+    def test_rejects_invalid_replies(self):
+        """Test that malformed, incomplete or duplicated answers are rejected."""
+        assert parse_packed_answers("The answer is yes.", 1) is None
+        assert parse_packed_answers('[{"id": 1, "answer": "a"}]', 2) is None
+        assert (
+            parse_packed_answers(
+                '[{"id": 1, "answer": "a"}, {"id": 1, "answer": "b"}]', 2
+            )
+            is None
+        )
+        assert parse_packed_answers('[{"id": 1, "answer": ""}]', 1) is None
@@ -1,12 +1,25 @@
+import asyncio
+import json
 import os
+import time
 from pathlib import Path
 
 import pytest
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 
+from app import rag_chain
 from app.document_loader import chunk_documents, load_document, load_questions
-from app.rag_chain import answer_questions, create_qa_chain, create_vector_store
+from app.rag_chain import (
+    answer_questions,
+    answer_questions_batched,
+    create_qa_chain,
+    create_vector_store,
+    retrieve_batch,
+    retrieve_batch_with_scores,
+)
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
 from tests.conftest import requires_openai_api_key
 
 
@@ -86,6 +99,63 @@ REASON: <brief explanation>"""
     return {"is_valid": is_valid, "reason": reason}
 
 
+class TestRetrievalModes:
+    TEXTS = [
+        "Backups of production databases run every 24 hours.",
+        "Physical access to the data centres is restricted.",
+        "Control CC6.1 covers logical access to production systems.",
+    ]
+
+    def _documents(self) -> list[Document]:
+        return [
+            Document(page_content=text, metadata={"page": i})
+            for i, text in enumerate(self.TEXTS)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_lexical_mode_makes_no_embedding_calls(self, monkeypatch):
+        """Test that lexical retrieval answers without embedding anything."""
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MODE", "lexical")
+        monkeypatch.setattr(
+            rag_chain,
+            "create_embeddings",
+            lambda *args: pytest.fail("lexical mode created embeddings"),
+        )
+        store = create_vector_store(self._documents())
+        llm = FakeChatModel(answer_tokens=2)
+
+        answers = await answer_questions_batched(
+            store, ["What does CC6.1 cover?"], llm=llm
+        )
+
+        assert store.embeddings is None
+        assert answers == {"What does CC6.1 cover?": "Control CC6.1"}
+
+    @pytest.mark.asyncio
+    async def test_hybrid_mode_fuses_chroma_and_bm25(self, monkeypatch):
+        """Test that hybrid retrieval returns each chunk once with its cosine."""
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MODE", "hybrid")
+        store = create_vector_store(
+            self._documents(), embeddings=FakeEmbeddings(size=64)
+        )
+        try:
+            scored = await retrieve_batch_with_scores(
+                store, ["What does CC6.1 cover?"], k=3
+            )
+        finally:
+            store.delete_collection()
+
+        results = scored["What does CC6.1 cover?"]
+        assert results[0][0].page_content == self.TEXTS[2]
+        assert len({doc.page_content for doc, _ in results}) == len(results) == 3
+        assert all(score is not None for _, score in results)
+
+    def test_unknown_mode_raises_error(self):
+        """Test that an unknown retrieval mode is rejected."""
+        with pytest.raises(ValueError, match="Unknown retrieval mode"):
+            create_vector_store(self._documents(), mode="sparse")
+
+
 @requires_openai_api_key
 class TestCreateVectorStore:
     def test_create_vector_store_from_documents(self):
@@ -190,6 +260,258 @@ class TestAnswerQuestions:
         assert all(q in answers for q in questions)
 
 
+class TestAnswerQuestionsConcurrency:
+    """Tests for concurrent answering using a fake chain (no API key needed)."""
+
+    @staticmethod
+    def _make_slow_chain(delay: float, tracker: dict | None = None):
+        async def _answer(question: str) -> str:
+            if tracker is not None:
+                tracker["in_flight"] += 1
+                tracker["peak"] = max(tracker["peak"], tracker["in_flight"])
+            try:
+                await asyncio.sleep(delay)
+                if "fail" in question:
+                    raise RuntimeError("boom")
+                return f"answer to {question}"
+            finally:
+                if tracker is not None:
+                    tracker["in_flight"] -= 1
+
+        return RunnableLambda(_answer)
+
+    @pytest.mark.asyncio
+    async def test_answers_keyed_and_ordered_by_input(self):
+        """Test that answers keep the order of the input questions."""
+        chain = self._make_slow_chain(0.01)
+        questions = [f"Question {i}?" for i in range(10)]
+
+        answers = await answer_questions(chain, questions, max_concurrency=4)
+
+        assert list(answers) == questions
+        assert answers["Question 3?"] == "answer to Question 3?"
+
+    @pytest.mark.asyncio
+    async def test_respects_max_concurrency(self):
+        """Test that no more than max_concurrency calls run at once."""
+        tracker = {"in_flight": 0, "peak": 0}
+        chain = self._make_slow_chain(0.02, tracker)
+
+        await answer_questions(chain, [f"Q{i}" for i in range(12)], max_concurrency=3)
+
+        assert tracker["peak"] == 3
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_scales_with_concurrency(self):
+        """Test that concurrent answering is faster than serial answering."""
+        chain = self._make_slow_chain(0.05)
+        questions = [f"Q{i}" for i in range(8)]
+
+        start = time.perf_counter()
+        await answer_questions(chain, questions, max_concurrency=8)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.05 * len(questions) / 2
+
+    @pytest.mark.asyncio
+    async def test_failure_is_isolated_to_its_question(self):
+        """Test that one failing question does not discard the others."""
+        chain = self._make_slow_chain(0.0)
+        questions = ["Q1", "please fail", "Q3"]
+
+        answers = await answer_questions(chain, questions, max_concurrency=2)
+
+        assert answers["Q1"] == "answer to Q1"
+        assert answers["Q3"] == "answer to Q3"
+        assert answers["please fail"].startswith("Error:")
+
+    @pytest.mark.asyncio
+    async def test_invalid_max_concurrency_raises_error(self):
+        """Test that a non-positive concurrency limit is rejected."""
+        chain = self._make_slow_chain(0.0)
+
+        with pytest.raises(ValueError, match="max_concurrency"):
+            await answer_questions(chain, ["Q1"], max_concurrency=-1)
+
+
+class TestBatchedRetrieval:
+    """Tests for batched retrieval using fake embeddings (no API key needed)."""
+
+    @pytest.fixture
+    def vector_store(self):
+        texts = [
+            "Backups of production databases run every 24 hours.",
+            "Physical access to the data centres is restricted.",
+            "Firewall rules are reviewed quarterly.",
+            "Anti-malware signatures update daily on endpoints.",
+        ]
+        store = create_vector_store(
+            [
+                Document(page_content=text, metadata={"page": i})
+                for i, text in enumerate(texts)
+            ],
+            embeddings=FakeEmbeddings(size=64),
+        )
+        yield store
+        store.delete_collection()
+
+    @pytest.mark.asyncio
+    async def test_single_embedding_call_for_all_questions(self, vector_store):
+        """Test that every question is embedded in one embedding call."""
+        embeddings = vector_store.embeddings
+        calls_before = embeddings.calls
+        questions = ["How often do backups run?", "Who reviews firewall rules?"]
+
+        contexts = await retrieve_batch(vector_store, questions, k=2)
+
+        assert embeddings.calls - calls_before == 1
+        assert list(contexts) == questions
+        assert all(len(docs) == 2 for docs in contexts.values())
+
+    @pytest.mark.asyncio
+    async def test_matches_per_question_search(self, vector_store):
+        """Test that batched results equal one similarity search per question."""
+        questions = ["How often do backups run?", "Is physical access restricted?"]
+
+        contexts = await retrieve_batch(vector_store, questions, k=2)
+
+        for question in questions:
+            expected = vector_store.similarity_search(question, k=2)
+            assert contexts[question] == expected
+
+    @pytest.mark.asyncio
+    async def test_answer_questions_batched(self, vector_store):
+        """Test that batched answering generates from the retrieved context."""
+        llm = FakeChatModel(answer_tokens=2)
+        questions = ["How often do backups run?", "How often do backups run?"]
+
+        answers = await answer_questions_batched(vector_store, questions, llm=llm)
+
+        assert list(answers) == ["How often do backups run?"]
+        assert answers["How often do backups run?"] == "Backups of"
+        assert llm.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens_per_question(self, vector_store):
+        """Test that on_token receives chunks that add up to each answer."""
+        llm = FakeChatModel(answer_tokens=3)
+        questions = ["How often do backups run?", "Who reviews firewall rules?"]
+        tokens: dict[str, list[str]] = {question: [] for question in questions}
+
+        answers = await answer_questions_batched(
+            vector_store,
+            questions,
+            llm=llm,
+            on_token=lambda question, delta: tokens[question].append(delta),
+        )
+
+        for question in questions:
+            assert len(tokens[question]) == 3
+            assert "".join(tokens[question]) == answers[question]
+
+    @pytest.mark.asyncio
+    async def test_chroma_scores_are_cosine_similarities(self, vector_store):
+        """Test that Chroma and NumPy stores report the same similarity scores."""
+        documents = vector_store.similarity_search("backups", k=4)
+        numpy_store = create_vector_store(
+            documents, embeddings=FakeEmbeddings(size=64), backend="numpy"
+        )
+        questions = ["How often do backups run?"]
+
+        chroma_scores = await retrieve_batch_with_scores(vector_store, questions, k=2)
+        numpy_scores = await retrieve_batch_with_scores(numpy_store, questions, k=2)
+
+        assert [score for _, score in chroma_scores[questions[0]]] == pytest.approx(
+            [score for _, score in numpy_scores[questions[0]]], abs=1e-5
+        )
+
+    @pytest.mark.asyncio
+    async def test_irrelevant_questions_skip_the_llm(self, vector_store, monkeypatch):
+        """Test that questions below the relevance floor get the not-found answer."""
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MIN_SCORE", 1.01)
+        llm = FakeChatModel(answer_tokens=2)
+        seen = []
+
+        answers = await answer_questions_batched(
+            vector_store,
+            ["How often do backups run?"],
+            llm=llm,
+            on_answer=lambda question, answer: seen.append(answer),
+        )
+
+        assert answers == {"How often do backups run?": rag_chain.NOT_FOUND_ANSWER}
+        assert seen == [rag_chain.NOT_FOUND_ANSWER]
+        assert llm.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_relevant_questions_are_answered(self, vector_store, monkeypatch):
+        """Test that questions clearing the relevance floor reach the LLM."""
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MIN_SCORE", -1.0 + 1e-9)
+        llm = FakeChatModel(answer_tokens=2)
+
+        answers = await answer_questions_batched(
+            vector_store, ["How often do backups run?"], llm=llm
+        )
+
+        assert answers["How often do backups run?"] != rag_chain.NOT_FOUND_ANSWER
+        assert llm.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_adaptive_k_trims_context(self, vector_store, monkeypatch):
+        """Test that adaptive retrieval passes at most RETRIEVAL_MAX_K chunks."""
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MAX_K", 3)
+        monkeypatch.setattr(rag_chain, "RETRIEVAL_MIN_K", 1)
+        prompts = []
+
+        def _reply(prompt) -> str:
+            prompts.append(prompt.to_string())
+            return "answer"
+
+        await answer_questions_batched(
+            vector_store, ["How often do backups run?"], llm=RunnableLambda(_reply)
+        )
+
+        context = prompts[0].split("Context:")[1].split("Question:")[0]
+        assert 1 <= len(context.strip().split("\n\n")) <= 3
+
+    @pytest.mark.asyncio
+    async def test_packs_questions_sharing_context(self, vector_store, monkeypatch):
+        """Test that questions with the same chunks are answered in one call."""
+        monkeypatch.setattr(rag_chain, "QA_PACK_MAX_QUESTIONS", 8)
+        prompts = []
+
+        def _reply(prompt) -> str:
+            prompts.append(prompt.to_string())
+            return json.dumps(
+                [{"id": 1, "answer": "daily"}, {"id": 2, "answer": "every 24 hours"}]
+            )
+
+        questions = ["How often do backups run?", "How often are backups run?"]
+        answers = await answer_questions_batched(
+            vector_store, questions, llm=RunnableLambda(_reply)
+        )
+
+        assert answers == {
+            "How often do backups run?": "daily",
+            "How often are backups run?": "every 24 hours",
+        }
+        assert len(prompts) == 1
+        assert "2. How often are backups run?" in prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_invalid_packed_reply_falls_back(self, vector_store, monkeypatch):
+        """Test that an unparseable packed reply is retried per question."""
+        monkeypatch.setattr(rag_chain, "QA_PACK_MAX_QUESTIONS", 8)
+        llm = FakeChatModel(answer_tokens=2)
+        questions = ["How often do backups run?", "How often are backups run?"]
+
+        answers = await answer_questions_batched(vector_store, questions, llm=llm)
+
+        assert list(answers) == questions
+        assert all(answer == "Backups of" for answer in answers.values())
+        assert llm.calls == 3
+
+
 @requires_openai_api_key
 class TestEndToEndWithExampleInput:
     """End-to-end tests using the example_input files."""
@@ -0,0 +1,201 @@
+import json
+
+import httpx
+import pytest
+
+from app.rate_limit import (
+    AdaptiveRateLimiter,
+    AsyncRateLimitedTransport,
+    RateLimitedTransport,
+    TokenBucket,
+    estimate_request_tokens,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _responses(*statuses: int, headers: dict | None = None):
+    """Return a MockTransport handler replying with ``statuses`` in turn."""
+    remaining = list(statuses)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        return httpx.Response(
+            status, headers=headers if status == 429 else None, json={"ok": True}
+        )
+
+    handler.requests = requests
+    return handler
+
+
+class TestTokenBucket:
+    def test_waits_for_refill(self):
+        """Test that an empty bucket reports the time until it has room."""
+        bucket = TokenBucket(60, now=0.0)
+        bucket.take(60)
+
+        assert bucket.wait_time(1, now=0.0) == pytest.approx(1.0)
+        assert bucket.wait_time(1, now=1.0) == 0.0
+
+    def test_oversized_amount_waits_for_full_bucket(self):
+        """Test that a request bigger than the bucket is not blocked forever."""
+        bucket = TokenBucket(60, now=0.0)
+
+        assert bucket.wait_time(600, now=0.0) == 0.0
+
+
+class TestAdaptiveRateLimiter:
+    def test_request_limit_spaces_requests(self):
+        """Test that the RPM bucket delays requests beyond the limit."""
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(requests_per_minute=2, clock=clock)
+
+        assert limiter.try_acquire(1) == 0.0
+        assert limiter.try_acquire(1) == 0.0
+        assert limiter.try_acquire(1) == pytest.approx(30.0)
+        clock.now += 30
+        assert limiter.try_acquire(1) == 0.0
+
+    def test_token_limit_uses_estimate(self):
+        """Test that the TPM bucket is charged with the request's tokens."""
+        limiter = AdaptiveRateLimiter(tokens_per_minute=600, clock=FakeClock())
+
+        assert limiter.try_acquire(500) == 0.0
+        assert limiter.try_acquire(200) == pytest.approx(10.0)
+
+    def test_concurrency_slots(self):
+        """Test that requests wait while every concurrency slot is held."""
+        limiter = AdaptiveRateLimiter(max_concurrency=1, clock=FakeClock())
+
+        assert limiter.try_acquire(1) == 0.0
+        assert limiter.try_acquire(1) > 0
+        limiter.release()
+        assert limiter.try_acquire(1) == 0.0
+
+    def test_429_halves_concurrency_once_per_episode(self):
+        """Test multiplicative decrease on the first 429 of a retry-after pause."""
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_concurrency=16, clock=clock)
+        headers = httpx.Headers({"retry-after": "2"})
+
+        delay = limiter.record_rate_limited(headers, attempt=0)
+        limiter.record_rate_limited(headers, attempt=0)
+
+        assert limiter.concurrency == 8
+        assert 2.0 <= delay <= 2.5
+        assert limiter.try_acquire(1) == pytest.approx(2.0)
+        clock.now += 2
+        limiter.record_rate_limited(headers, attempt=0)
+        assert limiter.concurrency == 4
+
+    def test_successes_grow_concurrency(self):
+        """Test additive increase after a window of successful requests."""
+        limiter = AdaptiveRateLimiter(max_concurrency=4, clock=FakeClock())
+        limiter.record_rate_limited(httpx.Headers(), attempt=0)
+        assert limiter.concurrency == 2
+
+        for _ in range(2):
+            limiter.record_success(httpx.Headers())
+        assert limiter.concurrency == 3
+        for _ in range(10):
+            limiter.record_success(httpx.Headers())
+        assert limiter.concurrency == 4
+
+    def test_provider_remaining_caps_buckets(self):
+        """Test that remaining-requests headers from the provider are respected."""
+        limiter = AdaptiveRateLimiter(requests_per_minute=60, clock=FakeClock())
+
+        limiter.record_success(httpx.Headers({"x-ratelimit-remaining-requests": "0"}))
+
+        assert limiter.try_acquire(1) == pytest.approx(1.0)
+
+
+class TestEstimateRequestTokens:
+    def test_chat_request(self):
+        """Test that prompt characters and the completion budget are counted."""
+        body = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 50}
+        request = httpx.Request("POST", "http://api/chat", json=body)
+
+        assert estimate_request_tokens(request) == 150
+
+    def test_embedding_token_ids(self):
+        """Test that pre-tokenized embedding inputs are counted exactly."""
+        body = {"input": [[1, 2, 3], [4, 5]], "model": "m"}
+        request = httpx.Request("POST", "http://api/embeddings", json=body)
+
+        assert estimate_request_tokens(request) == 5
+
+
+class TestTransports:
+    @pytest.mark.asyncio
+    async def test_async_retries_429_then_succeeds(self):
+        """Test that 429s are retried after retry-after and slots are released."""
+        limiter = AdaptiveRateLimiter(max_concurrency=4)
+        handler = _responses(429, 429, 200, headers={"retry-after-ms": "10"})
+        transport = AsyncRateLimitedTransport(limiter, httpx.MockTransport(handler))
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post("http://api/v1/chat", json={"messages": []})
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert len(handler.requests) == 3
+        assert limiter.stats()["retries"] == 2
+        assert limiter.in_flight == 0
+
+    def test_sync_gives_up_after_max_retries(self):
+        """Test that a persistent 429 is returned once retries are exhausted."""
+        limiter = AdaptiveRateLimiter(max_retries=2, base_delay=0.001)
+        handler = _responses(429, headers={"retry-after-ms": "1"})
+        transport = RateLimitedTransport(limiter, httpx.MockTransport(handler))
+
+        with httpx.Client(transport=transport) as client:
+            response = client.post("http://api/v1/embeddings", content=json.dumps({}))
+
+        assert response.status_code == 429
+        assert len(handler.requests) == 3
+        assert limiter.rate_limited == 3
+        assert limiter.in_flight == 0
+
+    def test_sync_retries_server_error_then_succeeds(self):
+        """Test that a 500 is retried without shrinking concurrency."""
+        limiter = AdaptiveRateLimiter(max_concurrency=4, base_delay=0.001)
+        handler = _responses(500, 200)
+        transport = RateLimitedTransport(limiter, httpx.MockTransport(handler))
+
+        with httpx.Client(transport=transport) as client:
+            response = client.post("http://api/v1/embeddings", content=json.dumps({}))
+
+        assert response.status_code == 200
+        assert len(handler.requests) == 2
+        assert limiter.stats()["failed"] == 1
+        assert limiter.concurrency == 4
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_async_retries_connection_errors(self):
+        """Test that transport errors are retried and re-raised when exhausted."""
+        limiter = AdaptiveRateLimiter(max_retries=2, base_delay=0.001)
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        transport = AsyncRateLimitedTransport(limiter, httpx.MockTransport(handler))
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.post("http://api/v1/chat", json={"messages": []})
+
+        assert len(attempts) == 3
+        assert limiter.retries == 2
+        assert limiter.in_flight == 0
@@ -0,0 +1,59 @@
+from app.retrieval import choose_k, reciprocal_rank_fusion
+
+
+class TestChooseK:
+    def test_cuts_at_elbow(self):
+        """Test that a sharp drop after a few strong matches ends the list."""
+        scores = [0.62, 0.60, 0.58, 0.31, 0.30, 0.29, 0.28, 0.27]
+
+        assert choose_k(scores, min_k=2, max_k=8) == 3
+
+    def test_flat_scores_keep_up_to_cumulative_cutoff(self):
+        """Test that evenly spread scores keep most candidates."""
+        scores = [0.50 - 0.01 * i for i in range(10)]
+
+        k = choose_k(scores, min_k=2, max_k=10, cumulative=0.9)
+
+        assert 6 <= k <= 10
+
+    def test_identical_scores_keep_everything(self):
+        """Test that a zero spread keeps max_k results."""
+        assert choose_k([0.4] * 12, min_k=2, max_k=8) == 8
+
+    def test_respects_min_k(self):
+        """Test that a single dominant match still keeps min_k results."""
+        scores = [0.9, 0.2, 0.19, 0.18, 0.17]
+
+        assert choose_k(scores, min_k=2, max_k=5) == 2
+
+    def test_token_cap(self):
+        """Test that k shrinks until the kept chunks fit the token cap."""
+        scores = [0.5] * 6
+
+        k = choose_k(scores, min_k=2, max_k=6, token_counts=[400] * 6, max_tokens=1000)
+
+        assert k == 2
+
+    def test_fewer_candidates_than_min_k(self):
+        """Test that short result lists are returned whole."""
+        assert choose_k([0.5], min_k=2, max_k=6) == 1
+        assert choose_k([], min_k=2, max_k=6) == 0
+
+
+class TestReciprocalRankFusion:
+    def test_items_in_both_rankings_win(self):
+        """Test that an item ranked well by both lists beats single-list tops."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]])
+
+        assert [key for key, _ in fused][:3] == ["b", "a", "d"]
+
+    def test_scores_are_summed_reciprocal_ranks(self):
+        """Test the 1 / (k + rank) scoring."""
+        fused = dict(reciprocal_rank_fusion([["a"], ["b", "a"]], k=10))
+
+        assert fused["a"] == 1 / 11 + 1 / 12
+        assert fused["b"] == 1 / 11
+
+    def test_empty_rankings(self):
+        """Test that fusing nothing returns nothing."""
+        assert reciprocal_rank_fusion([[], []]) == []
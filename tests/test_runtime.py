@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import runtime
+from app.rag_chain import create_chat_model, create_embeddings
+from app.runtime import EventLoopLagMonitor, run_in_thread
+
+
+class TestExecutors:
+    @pytest.mark.asyncio
+    async def test_run_in_thread_uses_worker_thread(self):
+        """Test that blocking functions run off the event loop thread."""
+        loop_thread = threading.get_ident()
+
+        worker_thread = await run_in_thread(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+
+class TestEventLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_reports_blocking_on_the_loop(self):
+        """Test that blocking the event loop shows up as lag."""
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.03)
+
+        time.sleep(0.1)  # Block the loop on purpose.
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["samples"] > 0
+        assert stats["max_ms"] >= 80
+
+    @pytest.mark.asyncio
+    async def test_offloaded_work_keeps_lag_low(self):
+        """Test that blocking work in the thread pool does not stall the loop."""
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+
+        await run_in_thread(time.sleep, 0.1)
+        await monitor.stop()
+
+        assert monitor.stats()["max_ms"] < 80
+
+
+class TestHttpClients:
+    @pytest.mark.asyncio
+    async def test_shared_clients_are_reused_and_closed(self):
+        """Test that open returns one shared pair until the clients are closed."""
+        sync_client, async_client = runtime.open_http_clients()
+        try:
+            assert runtime.open_http_clients() == (sync_client, async_client)
+            assert runtime.get_http_clients() == (sync_client, async_client)
+            assert runtime.get_rate_limiter() is not None
+        finally:
+            await runtime.close_http_clients()
+
+        assert runtime.get_http_clients() is None
+        assert runtime.get_rate_limiter() is None
+        assert sync_client.is_closed
+        assert async_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_models_use_shared_clients(self, monkeypatch):
+        """Test that OpenAI models are built on the shared HTTP clients."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        sync_client, async_client = runtime.open_http_clients()
+        try:
+            embeddings = create_embeddings()
+            llm = create_chat_model()
+        finally:
+            await runtime.close_http_clients()
+
+        assert embeddings.http_client is sync_client
+        assert embeddings.http_async_client is async_client
+        assert llm.http_async_client is async_client
+
+    @pytest.mark.asyncio
+    async def test_sdk_retries_are_off_behind_the_limiter(self, monkeypatch):
+        """Test that only the rate-limited transport retries, not the SDK too."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        assert create_chat_model().max_retries != 0
+
+        runtime.open_http_clients()
+        try:
+            embeddings = create_embeddings()
+            llm = create_chat_model()
+        finally:
+            await runtime.close_http_clients()
+
+        assert embeddings.max_retries == 0
+        assert llm.max_retries == 0
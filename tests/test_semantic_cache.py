@@ -0,0 +1,89 @@
+from unittest import mock
+
+import pytest
+from langchain_core.documents import Document
+
+from app import rag_chain
+from app.semantic_cache import SemanticAnswerIndex
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+
+
+class TestSemanticAnswerIndex:
+    def test_reuses_answer_above_threshold(self):
+        """Test that a near-identical embedding reuses the stored answer."""
+        index = SemanticAnswerIndex(threshold=0.9)
+        index.add("doc", ["Q1"], [[1.0, 0.0]], ["A1"])
+
+        close, far = index.lookup("doc", [[0.99, 0.05], [0.0, 1.0]])
+
+        assert close.question == "Q1"
+        assert close.answer == "A1"
+        assert close.similarity > 0.9
+        assert far is None
+        assert index.stats()["hits"] == 1
+        assert index.stats()["misses"] == 1
+
+    def test_scoped_to_document(self):
+        """Test that answers are only reused for the same document."""
+        index = SemanticAnswerIndex(threshold=0.9)
+        index.add("doc-a", ["Q1"], [[1.0, 0.0]], ["A1"])
+
+        assert index.lookup("doc-b", [[1.0, 0.0]]) == [None]
+
+    def test_evicts_oldest_entries_and_documents(self):
+        """Test per-document and per-index eviction."""
+        index = SemanticAnswerIndex(
+            threshold=0.9, max_entries_per_document=1, max_documents=1
+        )
+        index.add("doc-a", ["Q1", "Q2"], [[1.0, 0.0], [0.0, 1.0]], ["A1", "A2"])
+
+        assert index.lookup("doc-a", [[1.0, 0.0]]) == [None]
+        assert len(index) == 1
+
+        index.add("doc-b", ["Q3"], [[1.0, 0.0]], ["A3"])
+
+        assert index.lookup("doc-a", [[0.0, 1.0]]) == [None]
+        assert index.stats()["documents"] == 1
+
+    def test_invalid_threshold_raises_error(self):
+        """Test that thresholds outside (0, 1] are rejected."""
+        with pytest.raises(ValueError, match="threshold"):
+            SemanticAnswerIndex(threshold=1.5)
+
+
+class TestAnswerQuestionsWithReuse:
+    @pytest.fixture
+    def vector_store(self):
+        store = rag_chain.create_vector_store(
+            [
+                Document(
+                    page_content="Installation of unauthorized software is restricted."
+                )
+            ],
+            embeddings=FakeEmbeddings(size=256),
+            backend="numpy",
+        )
+        index = SemanticAnswerIndex(threshold=0.8)
+        with mock.patch.object(rag_chain, "get_semantic_answer_index", lambda: index):
+            yield store
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_reuses_answer(self, vector_store):
+        """Test that a paraphrased question is answered without an LLM call."""
+        llm = FakeChatModel(answer_tokens=3)
+        first = "Do you monitor and restrict the installation of unauthorized software?"
+        paraphrase = (
+            "Do you restrict and monitor installation of unauthorized software?"
+        )
+
+        answers, reused = await rag_chain.answer_questions_with_reuse(
+            vector_store, [first], "doc", llm=llm
+        )
+        answers_again, reused_again = await rag_chain.answer_questions_with_reuse(
+            vector_store, [paraphrase, "Who approves firewall changes?"], "doc", llm=llm
+        )
+
+        assert reused == {}
+        assert reused_again == {paraphrase: first}
+        assert answers_again[paraphrase] == answers[first]
+        assert llm.calls == 2
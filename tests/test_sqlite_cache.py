@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from app.sqlite_cache import SQLiteLRUCache
+
+
+class TextCache(SQLiteLRUCache):
+    table = "texts"
+    schema = """
+    CREATE TABLE IF NOT EXISTS texts (
+        key TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        last_used REAL NOT NULL
+    );
+    """
+
+    def put(self, *keys: str) -> None:
+        self._put_many(("key", "text", "last_used"), [(k, k, 0.0) for k in keys])
+
+
+class TestSQLiteLRUCache:
+    def test_get_many_batches_keys(self, tmp_path: Path):
+        """Test that lookups beyond SQLite's parameter limit are split up."""
+        cache = TextCache(tmp_path / "cache.db", max_entries=10_000)
+        keys = [str(i) for i in range(1200)]
+        cache.put(*keys)
+
+        found = cache._get_many([*keys, "missing"], "text")
+
+        assert found == {key: key for key in keys}
+        assert (cache.hits, cache.misses) == (1200, 1)
+
+    def test_evicts_after_every_percent_of_inserts(self, tmp_path: Path):
+        """Test that rows are counted only every max_entries // 100 inserts."""
+        cache = TextCache(tmp_path / "cache.db", max_entries=200)
+        cache.put(*(str(i) for i in range(201)))
+        assert len(cache) == 200
+
+        cache.put("a")
+        assert len(cache) == 201
+
+        cache.put("b")
+        assert len(cache) == 200
+
+    def test_invalid_max_entries_raises_error(self, tmp_path: Path):
+        """Test that a non-positive max_entries is rejected."""
+        with pytest.raises(ValueError, match="max_entries"):
+            TextCache(tmp_path / "cache.db", max_entries=0)